@@ -21,7 +21,9 @@ dag = DAG(
 )
 
 def run_main_script(**context):
-    subprocess.run(['python', '-m', 'src.main'], check=True)
+    # Retries of the same DAG run share its run_id, so the pipeline resumes from its checkpoints
+    env = {**os.environ, 'PIPELINE_RUN_ID': context['run_id']}
+    subprocess.run(['python', '-m', 'src.main'], check=True, env=env)
 
 run_script_task = PythonOperator(
     task_id='run_main_script',
@@ -0,0 +1,35 @@
+"""add_collection_watermarks
+
+Revision ID: 3f6c2d9a1b47
+Revises: 225032fb9e20
+Create Date: 2026-10-18 09:12:41.220914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2d9a1b47'
+down_revision: Union[str, None] = '225032fb9e20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collection_watermarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('currency', sa.String(), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source', 'currency', name='unique_watermark_source_currency')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_watermarks')
@@ -0,0 +1,37 @@
+"""add_watermark_interval
+
+Revision ID: 5d2a7e91c4b3
+Revises: 8b1e4f7c2a90
+Create Date: 2026-10-18 14:37:52.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a7e91c4b3'
+down_revision: Union[str, None] = '8b1e4f7c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing marks were kept for the daily REST collection
+    op.add_column('collection_watermarks', sa.Column('interval', sa.String(), nullable=False, server_default='1d'))
+    op.drop_constraint('unique_watermark_source_currency', 'collection_watermarks', type_='unique')
+    op.create_unique_constraint(
+        'unique_watermark_source_currency_interval', 'collection_watermarks', ['source', 'currency', 'interval']
+    )
+
+
+def downgrade() -> None:
+    # Keep the daily marks; the others can't fit the (source, currency) key
+    op.execute("DELETE FROM collection_watermarks WHERE interval <> '1d'")
+    op.drop_constraint('unique_watermark_source_currency_interval', 'collection_watermarks', type_='unique')
+    op.create_unique_constraint(
+        'unique_watermark_source_currency', 'collection_watermarks', ['source', 'currency']
+    )
+    op.drop_column('collection_watermarks', 'interval')
@@ -0,0 +1,28 @@
+"""add_consensus_columns
+
+Revision ID: 8b1e4f7c2a90
+Revises: 3f6c2d9a1b47
+Create Date: 2026-10-18 11:02:17.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4f7c2a90'
+down_revision: Union[str, None] = '3f6c2d9a1b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('btc_prices', sa.Column('spread', sa.Float(), nullable=True))
+    op.add_column('btc_prices', sa.Column('source_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('btc_prices', 'source_count')
+    op.drop_column('btc_prices', 'spread')
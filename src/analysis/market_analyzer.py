@@ -1,72 +1,37 @@
 # src/services/market_analyzer.py
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict
 from src.storage.models import BitcoinNews, BTCPrice
 from src.storage.analytics import PriceNewsAnalysis
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 from src.utils.logger import logger
 
 class MarketAnalyzer:
+    """
+    Price/news analysis over a session. Pass a Session for the plain methods or
+    an AsyncSession (AsyncDatabaseManager.get_session()) for the *_async ones.
+    """
     def __init__(self, db):
         self.session = db
     
     def get_price_with_news(self, days: int = 1, currency: str = 'eur') -> List[PriceNewsAnalysis]:
         """Get prices and corresponding news for the specified timeframe"""
         try:
-            # Get start date
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-
-            # Get prices
-            prices = self.session.query(BTCPrice).filter(
-                and_(
-                    BTCPrice.price_timestamp >= start_date,
-                    BTCPrice.price_timestamp <= end_date,
-                    BTCPrice.currency == currency
-                )
-            ).order_by(BTCPrice.price_timestamp).all()
-
-            # Get news
-            news = self.session.query(BitcoinNews).filter(
-                and_(
-                    BitcoinNews.published_at >= start_date,
-                    BitcoinNews.published_at <= end_date,
-                )
-            ).order_by(BitcoinNews.published_at).all()
-
-            # Group news by date
-            news_by_date = {}
-            for news_item in news:
-                date_key = news_item.published_at.date()
-                if date_key not in news_by_date:
-                    news_by_date[date_key] = []
-                news_by_date[date_key].append(news_item)
-            
-            # Calculate daily analysis
-            analysis_results = []
-            for i in range(1, len(prices)):
-                current_price = prices[i]
-                prev_price = prices[i-1]
-
-                # Calculate price change
-                price_change = current_price.price - prev_price.price
-                price_change_percentage = (price_change / prev_price.price) * 100
-
-                # Get news for this date
-                date_key = current_price.price_timestamp.date()
-                relevant_news = news_by_date.get(date_key, [])
-
-                analysis = PriceNewsAnalysis(
-                    date=current_price.price_timestamp,
-                    price_data=current_price,
-                    news_items=relevant_news,
-                    price_change=price_change,
-                    price_change_percentage=price_change_percentage
-                )
-                analysis_results.append(analysis)
-            return analysis_results
+            price_query, news_query = _price_news_queries(days, currency)
+            prices = self.session.execute(price_query).scalars().all()
+            news = self.session.execute(news_query).scalars().all()
+            return _analyse(prices, news)
+        except Exception as e:
+            logger.error(f"Error in market analysis: {e}")
+            raise
 
+    async def get_price_with_news_async(self, days: int = 1, currency: str = 'eur') -> List[PriceNewsAnalysis]:
+        try:
+            price_query, news_query = _price_news_queries(days, currency)
+            prices = (await self.session.execute(price_query)).scalars().all()
+            news = (await self.session.execute(news_query)).scalars().all()
+            return _analyse(prices, news)
         except Exception as e:
             logger.error(f"Error in market analysis: {e}")
             raise
@@ -75,37 +40,106 @@ class MarketAnalyzer:
         """Get today's market summary"""
         try:
             today = datetime.now().date()
+            price_query, news_query = _daily_queries(today, currency)
+            price_data = self.session.execute(price_query).first()
+            news_items = self.session.execute(news_query).scalars().all()
+            return _summary(today, price_data, news_items)
+        except Exception as e:
+            logger.error(f"Error getting daily summary: {e}")
+            raise
 
-            # Get today's price range
-            price_data = self.session.query(
-                func.min(BTCPrice.price).label('low'),
-                func.max(BTCPrice.price).label('high'),
-                func.avg(BTCPrice.price).label('average')
-            ).filter(
-                and_(
-                    func.date(BTCPrice.price_timestamp) == today,
-                    BTCPrice.currency == currency
-                )
-            ).first()
-
-            # Get today's news
-            news_items = self.session.query(BitcoinNews).filter(
-                func.date(BitcoinNews.published_at) == today
-            ).all()
-
-            return {
-                'date': today,
-                'price_summary': {
-                    'low': price_data.low if price_data else None,
-                    'high': price_data.high if price_data else None,
-                    'average': price_data.average if price_data else None
-                },
-                'news_count': len(news_items),
-                'latest_news': [
-                    {'title': news.title, 'published_at': news.published_at}
-                    for news in news_items[:5]  # Last 5 news items
-                ]
-            }
+    async def get_daily_summary_async(self, currency: str = 'eur') -> Dict:
+        try:
+            today = datetime.now().date()
+            price_query, news_query = _daily_queries(today, currency)
+            price_data = (await self.session.execute(price_query)).first()
+            news_items = (await self.session.execute(news_query)).scalars().all()
+            return _summary(today, price_data, news_items)
         except Exception as e:
             logger.error(f"Error getting daily summary: {e}")
-            raise
\ No newline at end of file
+            raise
+
+def _price_news_queries(days: int, currency: str):
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+
+    prices = select(BTCPrice).where(
+        and_(
+            BTCPrice.price_timestamp >= start_date,
+            BTCPrice.price_timestamp <= end_date,
+            BTCPrice.currency == currency
+        )
+    ).order_by(BTCPrice.price_timestamp)
+
+    news = select(BitcoinNews).where(
+        and_(
+            BitcoinNews.published_at >= start_date,
+            BitcoinNews.published_at <= end_date,
+        )
+    ).order_by(BitcoinNews.published_at)
+    return prices, news
+
+def _analyse(prices: List[BTCPrice], news: List[BitcoinNews]) -> List[PriceNewsAnalysis]:
+    # Group news by date
+    news_by_date = {}
+    for news_item in news:
+        date_key = news_item.published_at.date()
+        if date_key not in news_by_date:
+            news_by_date[date_key] = []
+        news_by_date[date_key].append(news_item)
+
+    # Calculate daily analysis
+    analysis_results = []
+    for i in range(1, len(prices)):
+        current_price = prices[i]
+        prev_price = prices[i-1]
+
+        # Calculate price change
+        price_change = current_price.price - prev_price.price
+        price_change_percentage = (price_change / prev_price.price) * 100
+
+        # Get news for this date
+        date_key = current_price.price_timestamp.date()
+        relevant_news = news_by_date.get(date_key, [])
+
+        analysis = PriceNewsAnalysis(
+            date=current_price.price_timestamp,
+            price_data=current_price,
+            news_items=relevant_news,
+            price_change=price_change,
+            price_change_percentage=price_change_percentage
+        )
+        analysis_results.append(analysis)
+    return analysis_results
+
+def _daily_queries(today: date, currency: str):
+    # Today's price range
+    prices = select(
+        func.min(BTCPrice.price).label('low'),
+        func.max(BTCPrice.price).label('high'),
+        func.avg(BTCPrice.price).label('average')
+    ).where(
+        and_(
+            func.date(BTCPrice.price_timestamp) == today,
+            BTCPrice.currency == currency
+        )
+    )
+
+    # Today's news
+    news = select(BitcoinNews).where(func.date(BitcoinNews.published_at) == today)
+    return prices, news
+
+def _summary(today: date, price_data, news_items: List[BitcoinNews]) -> Dict:
+    return {
+        'date': today,
+        'price_summary': {
+            'low': price_data.low if price_data else None,
+            'high': price_data.high if price_data else None,
+            'average': price_data.average if price_data else None
+        },
+        'news_count': len(news_items),
+        'latest_news': [
+            {'title': news.title, 'published_at': news.published_at}
+            for news in news_items[:5]  # Last 5 news items
+        ]
+    }
@@ -1,26 +1,30 @@
 # src/analysis/price_analyzer.py
-from typing import List, Dict, Tuple
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 from functools import lru_cache
+from src.storage.archive import PriceArchive, read_price_history
+from src.storage.backends import StorageBackend
 
 class PriceAnalyzer:
-    def __init__(self, db_session) -> None:
-        self.session = db_session
-    
+    """
+    Price statistics over the hot table and, for older ranges, the Parquet archive.
+    Takes a storage backend (databases.get_backend()); it used to take a database session.
+    """
+    def __init__(self, storage: StorageBackend, archive: Optional[PriceArchive] = None) -> None:
+        if not hasattr(storage, 'read_prices'):
+            raise TypeError(
+                f"PriceAnalyzer needs a StorageBackend such as databases.get_backend(), got {type(storage).__name__}"
+            )
+        self.storage = storage
+        self.archive = archive or PriceArchive()
+
     @lru_cache(maxsize=64)
     def get_price_history(self, currency: str, days: int = 30) -> pd.DataFrame:
         """Get price history for analysis"""
-        query = f"""
-        SELECT price, price_timestamp, currency
-        FROM btc_prices
-        WHERE currency = %s
-        AND price_timestamp >= NOW() - INTERVAL '{days} DAY'
-        ORDER BY price_timestamp
-        """
-        params = (currency,)  # Use a tuple for positional parameters
-        return pd.read_sql(query, self.session.bind, params=params)
-    
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)  # btc_prices stores naive UTC
+        return read_price_history(self.storage, self.archive, currency, since=since)
+
     @lru_cache(maxsize=32)
     def calculate_daily_stats(self, currency: str) -> Dict:
         df = self.get_price_history(currency)
@@ -31,7 +35,7 @@ class PriceAnalyzer:
             'max': df['price'].max(),
             'last_price': df['price'].iloc[-1]
         }
-    
+
     @lru_cache(maxsize=32)
     def compare_currencies(self, currency1: str, currency2: str) -> Dict:
         """Compare prices between currencies"""
@@ -42,4 +46,4 @@ class PriceAnalyzer:
         return {
             'correlation': df1['price'].corr(df2['price']),
             'ratio_mean': (df1['price'] / df2['price']).mean()
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,33 @@
+# src/archive.py
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from src.backfill import parse_date
+from src.config.settings import settings
+from src.pipelines.archive_pipeline import ArchivePipeline
+from src.storage.archive import month_start
+from src.storage.registry import databases
+from src.utils.logger import logger
+
+def parse_args(argv=None) -> argparse.Namespace:
+    default_before = month_start(datetime.now(timezone.utc) - timedelta(days=settings.ARCHIVE_AFTER_DAYS))
+    parser = argparse.ArgumentParser(description="Move closed ranges of btc_prices into the Parquet archive")
+    parser.add_argument('--before', type=parse_date, default=default_before,
+                        help="Archive rows older than this (exclusive), defaults to the start of the month "
+                             "ARCHIVE_AFTER_DAYS ago")
+    parser.add_argument('--currencies', nargs='+', default=settings.SUPPORTED_CURRENCIES)
+    parser.add_argument('--drop', action='store_true', help="Delete archived rows from the hot table")
+    parser.add_argument('--no-compact', dest='compact', action='store_false', help="Skip compacting small files")
+    return parser.parse_args(argv)
+
+async def main(argv=None):
+    args = parse_args(argv)
+    pipeline = ArchivePipeline(currencies=args.currencies)
+    try:
+        logger.info(f"Archiving {args.currencies} before {args.before} (drop={args.drop})")
+        await asyncio.to_thread(pipeline.run, args.before, drop=args.drop, compact=args.compact)
+    finally:
+        await databases.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
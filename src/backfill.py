@@ -0,0 +1,72 @@
+# src/backfill.py
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from src.pipelines.backfill_pipeline import BackfillPipeline
+from src.pipelines.btc_pipeline import BTCPipeline
+from src.config.settings import settings
+from src.storage.registry import databases
+from src.utils.intervals import INTERVAL_SECONDS
+from src.utils.logger import logger
+
+def parse_date(value: str) -> datetime:
+    """ISO date or datetime, taken as UTC when no offset is given"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill historical BTC prices")
+    parser.add_argument('--start', type=parse_date, required=True, help="Start date (inclusive), e.g. 2023-01-01")
+    parser.add_argument('--end', type=parse_date, default=datetime.now(timezone.utc),
+                        help="End date (exclusive), defaults to now")
+    parser.add_argument('--sources', nargs='+', default=['binance'], choices=['coingecko', 'binance', 'kraken'])
+    parser.add_argument('--currencies', nargs='+', default=settings.SUPPORTED_CURRENCIES)
+    parser.add_argument('--interval', default='1h', choices=list(INTERVAL_SECONDS))
+    parser.add_argument('--concurrency', type=int, default=settings.BACKFILL_CONCURRENCY,
+                        help="Windows fetched in parallel")
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file used to resume an interrupted run")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Validate, quality-check and write window by window with bounded memory (for large "
+                             "ranges; no checkpoint file)")
+    return parser.parse_args(argv)
+
+async def main(argv=None):
+    args = parse_args(argv)
+    if args.start >= args.end:
+        raise SystemExit("--start must be before --end")
+
+    if args.streaming:
+        await run_streaming(args)
+        return
+
+    pipeline = BackfillPipeline(
+        sources=args.sources,
+        currencies=args.currencies,
+        interval=args.interval,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint
+    )
+    try:
+        logger.info(f"Backfilling {args.sources} {args.currencies} at {args.interval} from {args.start} to {args.end}")
+        await pipeline.run(args.start, args.end)
+    finally:
+        await pipeline.close()
+        await databases.dispose()
+
+async def run_streaming(args: argparse.Namespace):
+    pipeline = BTCPipeline()
+    try:
+        logger.info(
+            f"Streaming backfill of {args.sources} {args.currencies} at {args.interval} from {args.start} to {args.end}"
+        )
+        await pipeline.run_streaming(
+            args.start, args.end, sources=args.sources, interval=args.interval, currencies=args.currencies
+        )
+    finally:
+        await pipeline.close()
+        await databases.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,13 @@
 # src/collectors/base.py
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple, Union, BinaryIO
 from datetime import datetime
 from dataclasses import dataclass
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import time
 import aiohttp
 from bs4 import BeautifulSoup
 import logging
@@ -9,6 +15,13 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 import PyPDF2
 import io
+from src.config.settings import settings
+from src.utils.http_client import http_client
+from src.utils.metrics import BYTES_FETCHED, HTTP_SECONDS, RATE_LIMIT_WAIT
+from src.utils.rate_limiter import parse_retry_after
+from src.utils.request_cache import response_cache, request_key
+from src.utils.source_health import source_health
+from .decoders import loads
 
 @dataclass
 class DataRecord:
@@ -18,32 +31,110 @@ class DataRecord:
     timestamp: datetime 
     id: Optional[int] = None
 
+def extract_pdf_text(source: Union[str, BinaryIO]) -> str:
+    """Text of every page of a PDF file path or stream (module level so it can run in a process pool)"""
+    pdf_reader = PyPDF2.PdfReader(source)
+    return "".join(page.extract_text() or "" for page in pdf_reader.pages)
+
 class BaseCollector:
     """Template for all collectors"""
     def __init__(self, name: str) -> None:
         self.name = name
         self.logger = logging.getLogger(name)
+        self.rate_limiter = None
+        self.max_retries = settings.SOURCE_MAX_RETRIES
+        self.health = source_health.get(name)
+        self._http_registered = True
+        http_client.register()
+
+    @property
+    def retries(self) -> int:
+        """Retries made against this source (shared with every collector of the source)"""
+        return self.health.retries
 
     async def collect(self) -> List[DataRecord]:
         """Must be implemented by each collector"""
         raise NotImplementedError("Subclasses must implement collect()")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared, pooled HTTP session used by every collector"""
+        return await http_client.get_session()
+
+    async def _make_request(self, url: str, params: dict = None,
+                            decoder: Optional[Callable[[bytes], Any]] = None) -> Any:
+        """
+        Make API request with retry logic.
+        With a `decoder` the raw body is handed to it instead of being parsed as JSON.
+        Fails fast with CircuitOpenError while the source's circuit is open.
+        Identical concurrent or recent requests share one call (see response_cache).
+        """
+        key = request_key(url, params, getattr(decoder, '__qualname__', 'json'))
+        return await response_cache.get_or_fetch(key, lambda: self._fetch(url, params, decoder))
+
+    async def _fetch(self, url: str, params: Optional[dict],
+                     decoder: Optional[Callable[[bytes], Any]]) -> Any:
+        for attempt in range(self.max_retries):
+            if attempt:
+                self.health.record_retry()
+            # Wait for rate limit
+            if self.rate_limiter:
+                waited = await self.rate_limiter.wait_if_needed()
+                RATE_LIMIT_WAIT.observe(waited or 0.0, source=self.name)
+
+            async with self.health.slot():
+                started = time.monotonic()
+                try:
+                    session = await self._get_session()
+                    async with session.get(url, params=params) as response:
+                        if response.status == 429: # Rate limit hit
+                            self.health.record_throttle()
+                            wait_time = parse_retry_after(response.headers.get('Retry-After'))
+                            if self.rate_limiter:
+                                # Holds back every caller sharing this host's budget
+                                self.rate_limiter.penalize(wait_time)
+                            else:
+                                await asyncio.sleep(wait_time)
+                            continue
+                        response.raise_for_status()
+                        body = await response.read()
+                    latency = time.monotonic() - started
+                    self.health.record_success(latency)
+                    HTTP_SECONDS.observe(latency, source=self.name)
+                    BYTES_FETCHED.inc(len(body), source=self.name)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    latency = time.monotonic() - started
+                    if isinstance(e, aiohttp.ClientResponseError) and 400 <= e.status < 500:
+                        # The source is up and refused this request: not an outage, and a retry won't help
+                        self.health.record_client_error(latency)
+                        raise
+                    self.health.record_failure(latency)
+                    if attempt == self.max_retries - 1 or self.health.is_open():
+                        raise
+                    backoff = random.uniform(0, 2 ** attempt) # Exponential backoff with full jitter
+                else:
+                    if decoder is not None:
+                        return decoder(body)
+                    return loads(body)
+            await asyncio.sleep(backoff)
+
+        raise Exception("Max retries reached")
     
     async def _make_api_request(self, url: str, headers: Optional[Dict] = None) -> Dict:
         """Make an async API request"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"API request failed with status {response.status}")
-                return await response.json()
+        session = await self._get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200:
+                raise Exception(f"API request failed with status {response.status}")
+            return await response.json()
             
     async def _scrape_webpage(self, url: str) -> BeautifulSoup:
         """Scrape webpage content"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise Exception(f"Web scraping failed with status {response.status}")
-                html = await response.text()
-                return BeautifulSoup(html, 'html.parser')
+        session = await self._get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise Exception(f"Web scraping failed with status {response.status}")
+            html = await response.text()
+            return BeautifulSoup(html, 'html.parser')
     
     def _setup_selenium(self) -> webdriver.Chrome:
         """Setup Selenium WebDriver"""
@@ -54,29 +145,47 @@ class BaseCollector:
     
     async def _download_file(self, url: str) -> bytes:
         """Download file content"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise Exception(f"File download failed with status {response.status}")
-                return await response.read()
+        session = await self._get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise Exception(f"File download failed with status {response.status}")
+            return await response.read()
+
+    async def _download_to_file(self, url: str, suffix: str = "", chunk_size: int = 64 * 1024) -> Tuple[str, str]:
+        """
+        Stream a download into a temp file without holding it in memory.
+        Returns (path, sha256 hex digest); the caller removes the file.
+        """
+        session = await self._get_session()
+        digest = hashlib.sha256()
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        raise Exception(f"File download failed with status {response.status}")
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        digest.update(chunk)
+                        f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, digest.hexdigest()
             
     def _extract_pdf_text(self, pdf_content: bytes) -> str:
         """Extract text from PDF content"""
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        return extract_pdf_text(io.BytesIO(pdf_content))
     
     async def _submit_form(self, url: str, data: Dict[str, Any]) -> Dict:
         """Submit form data"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=data) as response:
-                if response.status != 200:
-                    raise Exception(f"Form submission failed with status {response.status}")
-                return await response.json()
+        session = await self._get_session()
+        async with session.post(url, data=data) as response:
+            if response.status != 200:
+                raise Exception(f"Form submission failed with status {response.status}")
+            return await response.json()
             
-    def cleanup(self):
-        """Cleanup resources"""
-        pass
\ No newline at end of file
+    async def cleanup(self):
+        """Release the shared HTTP session"""
+        if self._http_registered:
+            self._http_registered = False
+            await http_client.release()
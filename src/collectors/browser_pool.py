@@ -0,0 +1,84 @@
+# src/collectors/browser_pool.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from urllib3.exceptions import HTTPError
+from src.utils.logger import logger
+
+def is_driver_failure(error: BaseException) -> bool:
+    """
+    Whether `error` means the browser itself is gone: its session is invalid,
+    the driver is unreachable, or Chrome reported a bare WebDriverException
+    ("chrome not reachable", "disconnected"). Command-level errors such as a
+    TimeoutException or NoSuchElementException leave the driver usable.
+    """
+    return (
+        isinstance(error, (InvalidSessionIdException, ConnectionError, HTTPError))
+        or type(error) is WebDriverException
+    )
+
+class BrowserPool:
+    """
+    Keeps up to `size` warm WebDriver instances for reuse across runs.
+
+    WebDriver calls block, so drivers are created and quit on worker threads;
+    callers should do the same with `run()`. Cookies saved per exchange let a
+    later run skip the login form while the session is still valid.
+    """
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        self.factory = factory
+        self.size = max(1, size)
+        self.cookies: Dict[str, List[Dict]] = {}
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.size)
+        self._drivers: List[Any] = []
+        self.created = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow a driver; one whose session or process failed is replaced rather than returned"""
+        async with self._slots:
+            driver = self._idle.get_nowait() if not self._idle.empty() else await self._create()
+            try:
+                yield driver
+            except BaseException as e:
+                if is_driver_failure(e):
+                    await self._discard(driver)
+                else:
+                    self._idle.put_nowait(driver)
+                raise
+            else:
+                self._idle.put_nowait(driver)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a blocking WebDriver call without stalling the event loop"""
+        return await asyncio.to_thread(func, *args)
+
+    def save_cookies(self, exchange: str, cookies: List[Dict]) -> None:
+        self.cookies[exchange] = cookies
+
+    def get_cookies(self, exchange: str) -> Optional[List[Dict]]:
+        return self.cookies.get(exchange)
+
+    async def _create(self) -> Any:
+        driver = await asyncio.to_thread(self.factory)
+        self._drivers.append(driver)
+        self.created += 1
+        logger.debug(f"Started browser {self.created} (pool size {self.size})")
+        return driver
+
+    async def _discard(self, driver: Any) -> None:
+        if driver in self._drivers:
+            self._drivers.remove(driver)
+        try:
+            await asyncio.to_thread(driver.quit)
+        except Exception as e:
+            logger.warning(f"Failed to quit browser: {e}")
+
+    async def close(self) -> None:
+        """Quit every driver the pool started"""
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for driver in list(self._drivers):
+            await self._discard(driver)
@@ -1,214 +1,233 @@
 # src/collectors/coingecko.py
-from .base import BaseCollector, DataRecord
-import aiohttp
+from .base import BaseCollector
+from .price_batch import PriceBatch, to_ms
+from .decoders import PriceSeries, decode_market_chart, decode_klines, decode_ohlc
 import asyncio
-from datetime import datetime, timezone
-from typing import List
+from datetime import datetime, timezone, timedelta
+from typing import AsyncIterator, Dict, Optional
 from src.config.settings import settings
-from src.utils.rate_limiter import RateLimiter
+from src.utils.intervals import INTERVAL_SECONDS
+from src.utils.rate_limiter import rate_limiters, host_key
 
-class CoinGeckoCollector(BaseCollector):
-    def __init__(self) -> None:
-        super().__init__(name="coingecko")
-        self.base_url = settings.COINGECKO_BASE_URL
-        self.rate_limiter = RateLimiter(calls_per_minute=settings.RATE_LIMIT_CALLS)
-        self.max_retries = 3
-        self.retries = 0
-    
-    async def _make_request(self, url: str, params: dict = None) -> dict:
-        """Make API request with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Wait for rate limit
-                await self.rate_limiter.wait_if_needed()
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 429: # Rate limit hit
-                            wait_time = int(response.headers.get('Retry-After', 60))
-                            await asyncio.sleep(wait_time)
-                            continue
-                        response.raise_for_status()
-                        return await response.json()
-            except aiohttp.ClientError as e:
-                self.retries += 1
-                if attempt == self.max_retries -1:
-                    raise
-                await asyncio.sleep(2 ** attempt) # Exponential backoff
-        
-        raise Exception("Max retries reached")
+class PriceCollector(BaseCollector):
+    """Base for exchange collectors that fetch BTC price history per currency"""
+    # Most rows a single historical request returns
+    max_window_points: int = 1000
+    # Whether series volumes are BTC traded per candle (usable as consensus weights)
+    traded_volumes: bool = True
+    # Candle interval of fetch_currency(); incremental runs keep their watermarks under it
+    interval: str = '1d'
 
-    
-    async def collectBTC(self, days: int = 14) -> List[DataRecord]:
+    async def fetch_currency(self, currency: str, days: int = 14,
+                             since: Optional[datetime] = None) -> PriceBatch:
+        """
+        Fetch price history for a single currency.
+        When `since` is given only points strictly newer than it are returned.
+        """
+        raise NotImplementedError("Subclasses must implement fetch_currency()")
+
+    async def collectBTC(self, days: int = 14,
+                         watermarks: Optional[Dict[str, datetime]] = None) -> PriceBatch:
         """
         Fetch historical price data for Bitcoin over the specified number of days.
+        All supported currencies are requested concurrently; the rate limiter
+        still spaces the calls out. `watermarks` maps currency -> last stored
+        timestamp for incremental collection.
         """
-        data_records = []
-        for currency in settings.SUPPORTED_CURRENCIES:
-            url = f"{self.base_url}/coins/bitcoin/market_chart"
-            params = {
-                "vs_currency": currency,  
-                "days": days           # Number of days to fetch historical data
-            }
+        watermarks = watermarks or {}
+        results = await asyncio.gather(
+            *(self.fetch_currency(currency, days=days, since=watermarks.get(currency))
+              for currency in settings.SUPPORTED_CURRENCIES)
+        )
+        return PriceBatch.concat(results)
+
+    def _to_batch(self, series: PriceSeries, currency: str, since: Optional[datetime]) -> PriceBatch:
+        batch = PriceBatch.from_arrays(
+            series.timestamps, series.prices, currency=currency, source=self.name,
+            volumes=series.volumes if self.traded_volumes else None
+        )
+        if since is not None:
+            batch = batch.newer_than(to_ms(since))
+        return batch
 
-            data = await self._make_request(url, params)
-            # Extract prices from the response
-            prices = data.get("prices", [])
-
-            for price in prices:
-                data_records.append(
-                    DataRecord(
-                        source=self.name,
-                        data={
-                            "price": price[1],
-                            "currency": currency,
-                            "timestamp": datetime.fromtimestamp(price[0] / 1000, timezone.utc)
-                        },
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                )
-        return data_records
-        
-        
-    async def collect(self, days: int = 14) -> List[DataRecord]:
+    def window_span(self, interval: str) -> timedelta:
+        """Longest time range one fetch_window() call can cover at `interval`"""
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        return timedelta(seconds=INTERVAL_SECONDS[interval] * self.max_window_points)
+
+    async def fetch_window(self, currency: str, start: datetime, end: datetime,
+                           interval: str = '1h') -> PriceBatch:
+        """Fetch [start, end) at `interval` resolution; the range must fit in window_span()"""
+        raise NotImplementedError("Subclasses must implement fetch_window()")
+
+    async def iter_windows(self, currency: str, start: datetime, end: datetime,
+                           interval: str = '1h') -> AsyncIterator[PriceBatch]:
+        """Fetch [start, end) one window_span() at a time, oldest first, yielding each window's batch"""
+        span = self.window_span(interval)
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + span, end)
+            yield await self.fetch_window(currency, window_start, window_end, interval=interval)
+            window_start = window_end
+
+    def _clip(self, batch: PriceBatch, start: datetime, end: datetime) -> PriceBatch:
+        return batch.take((batch.timestamps >= to_ms(start)) & (batch.timestamps < to_ms(end)))
+
+    async def collect(self, days: int = 14) -> PriceBatch:
         """
         Implementation of the base collector interface.
         By default, collects BTC data for the last 14 days.
         """
         return await self.collectBTC(days=days)
 
-class BinanceCollector(BaseCollector):
+class CoinGeckoCollector(PriceCollector):
+    # total_volumes is a rolling 24h aggregate in the quote currency, not per-candle BTC volume
+    traded_volumes = False
+    # CoinGecko picks the granularity from the requested range
+    interval = 'auto'
+
     def __init__(self) -> None:
-        super().__init__(name="binance")
-        self.base_url = settings.BINANCE_BASE_URL
-        self.rate_limiter = RateLimiter(calls_per_minute=settings.RATE_LIMIT_CALLS)
-        self.max_retries = 3
-        self.retries = 0
+        super().__init__(name="coingecko")
+        self.base_url = settings.COINGECKO_BASE_URL
+        self.rate_limiter = rate_limiters.get(
+            host_key(self.base_url),
+            calls_per_minute=settings.RATE_LIMIT_CALLS,
+            capacity=settings.RATE_LIMIT_BURST
+        )
     
-    async def _make_request(self, url: str, params: dict = None) -> dict:
-        """Make API request with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Wait for rate limit
-                await self.rate_limiter.wait_if_needed()
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 429:  # Rate limit hit
-                            wait_time = int(response.headers.get('Retry-After', 60))
-                            await asyncio.sleep(wait_time)
-                            continue
-                        response.raise_for_status()
-                        return await response.json()
-            except aiohttp.ClientError as e:
-                self.retries += 1
-                if attempt == self.max_retries - 1:
-                    raise
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-        
-        raise Exception("Max retries reached")
-
-    async def collectBTC(self, days: int = 14) -> List[DataRecord]:
+    async def fetch_currency(self, currency: str, days: int = 14,
+                             since: Optional[datetime] = None) -> PriceBatch:
         """
-        Fetch historical price data for Bitcoin over the specified number of days.
+        Fetch historical price data for Bitcoin in one currency over the specified number of days,
+        or only what is newer than `since` via the market_chart/range endpoint.
         """
-        data_records = []
-        for currency in settings.SUPPORTED_CURRENCIES:
-            url = f"{self.base_url}/klines"
+        if since is not None:
+            url = f"{self.base_url}/coins/bitcoin/market_chart/range"
             params = {
-                "symbol": f"BTC{currency.upper()}",
-                "interval": "1d",
-                "limit": days
+                "vs_currency": currency,
+                "from": int(since.timestamp()) + 1,
+                "to": int(datetime.now(timezone.utc).timestamp())
+            }
+        else:
+            url = f"{self.base_url}/coins/bitcoin/market_chart"
+            params = {
+                "vs_currency": currency,  
+                "days": days           # Number of days to fetch historical data
             }
 
-            data = await self._make_request(url, params)
-            
-            for kline in data:
-                # Binance kline format: [OpenTime, Open, High, Low, Close, Volume, ...]
-                data_records.append(
-                    DataRecord(
-                        source=self.name,
-                        data={
-                            "price": float(kline[4]),  # Closing price
-                            "currency": currency,
-                            "timestamp": datetime.fromtimestamp(kline[0] / 1000, timezone.utc)
-                        },
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                )
-        return data_records
-    
-    async def collect(self, days: int = 14) -> List[DataRecord]:
+        series = await self._make_request(url, params, decoder=decode_market_chart)
+        return self._to_batch(series, currency, since)
+
+    # market_chart/range picks its own granularity from the range length:
+    # 5-minutely up to 1 day, hourly up to 90 days, daily beyond that
+    WINDOW_SPANS = {
+        '5m': timedelta(days=1),
+        '1h': timedelta(days=90),
+        '1d': timedelta(days=365)
+    }
+
+    def window_span(self, interval: str) -> timedelta:
+        if interval not in self.WINDOW_SPANS:
+            raise ValueError(f"CoinGecko does not serve {interval} data")
+        return self.WINDOW_SPANS[interval]
+
+    async def fetch_window(self, currency: str, start: datetime, end: datetime,
+                           interval: str = '1h') -> PriceBatch:
+        url = f"{self.base_url}/coins/bitcoin/market_chart/range"
+        params = {
+            "vs_currency": currency,
+            "from": int(start.timestamp()),
+            "to": int(end.timestamp())
+        }
+        series = await self._make_request(url, params, decoder=decode_market_chart)
+        return self._clip(self._to_batch(series, currency, None), start, end)
+
+class BinanceCollector(PriceCollector):
+    def __init__(self) -> None:
+        super().__init__(name="binance")
+        self.base_url = settings.BINANCE_BASE_URL
+        self.rate_limiter = rate_limiters.get(
+            host_key(self.base_url),
+            calls_per_minute=settings.RATE_LIMIT_CALLS,
+            capacity=settings.RATE_LIMIT_BURST
+        )
+
+    async def fetch_currency(self, currency: str, days: int = 14,
+                             since: Optional[datetime] = None) -> PriceBatch:
         """
-        Implementation of the base collector interface.
-        By default, collects BTC data for the last 14 days.
+        Fetch historical price data for Bitcoin in one currency over the specified number of days,
+        or only klines opened after `since` (startTime).
         """
-        return await self.collectBTC(days=days)
+        url = f"{self.base_url}/klines"
+        params = {
+            "symbol": f"BTC{currency.upper()}",
+            "interval": self.interval,
+            "limit": days
+        }
+        if since is not None:
+            params["startTime"] = int(since.timestamp() * 1000) + 1
+            params["limit"] = 1000  # Binance maximum
+
+        # Binance kline format: [OpenTime, Open, High, Low, Close, Volume, ...]
+        series = await self._make_request(url, params, decoder=decode_klines)
+        return self._to_batch(series, currency, since)
+
+    async def fetch_window(self, currency: str, start: datetime, end: datetime,
+                           interval: str = '1h') -> PriceBatch:
+        url = f"{self.base_url}/klines"
+        params = {
+            "symbol": f"BTC{currency.upper()}",
+            "interval": interval,
+            "startTime": to_ms(start),
+            "endTime": to_ms(end) - 1,
+            "limit": self.max_window_points
+        }
+        series = await self._make_request(url, params, decoder=decode_klines)
+        return self._clip(self._to_batch(series, currency, None), start, end)
+
+class KrakenCollector(PriceCollector):
+    # Kraken's OHLC endpoint only ever returns the most recent 720 candles, so
+    # windows further back than that come back empty
+    max_window_points = 720
 
-class KrakenCollector(BaseCollector):
     def __init__(self) -> None:
         super().__init__(name="kraken")
         self.base_url = settings.KRAKEN_BASE_URL
-        self.rate_limiter = RateLimiter(calls_per_minute=settings.RATE_LIMIT_CALLS)
-        self.max_retries = 3
-        self.retries = 0
-    
-    async def _make_request(self, url: str, params: dict = None) -> dict:
-        """Make API request with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Wait for rate limit
-                await self.rate_limiter.wait_if_needed()
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 429:  # Rate limit hit
-                            wait_time = int(response.headers.get('Retry-After', 60))
-                            await asyncio.sleep(wait_time)
-                            continue
-                        response.raise_for_status()
-                        return await response.json()
-            except aiohttp.ClientError as e:
-                self.retries += 1
-                if attempt == self.max_retries - 1:
-                    raise
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-        
-        raise Exception("Max retries reached")
-
-    async def collectBTC(self, days: int = 14) -> List[DataRecord]:
-        """
-        Fetch historical price data for Bitcoin over the specified number of days.
-        """
-        data_records = []
-        for currency in settings.SUPPORTED_CURRENCIES:
-            url = f"{self.base_url}/OHLC"
-            params = {
-                "pair": f"XBT{currency.upper()}",
-                "interval": 1440,  # 1 day in minutes
-                "since": int((datetime.now(timezone.utc).timestamp() - days * 86400))
-            }
+        self.rate_limiter = rate_limiters.get(
+            host_key(self.base_url),
+            calls_per_minute=settings.RATE_LIMIT_CALLS,
+            capacity=settings.RATE_LIMIT_BURST
+        )
 
-            data = await self._make_request(url, params)
-            pair = f"XBT{currency.upper()}"
-            
-            for timestamp, ohlc in data[pair].items():
-                data_records.append(
-                    DataRecord(
-                        source=self.name,
-                        data={
-                            "price": float(ohlc[4]),  # Closing price
-                            "currency": currency,
-                            "timestamp": datetime.fromtimestamp(int(timestamp), timezone.utc)
-                        },
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                )
-        return data_records
-    
-    async def collect(self, days: int = 14) -> List[DataRecord]:
+    async def fetch_currency(self, currency: str, days: int = 14,
+                             since: Optional[datetime] = None) -> PriceBatch:
         """
-        Implementation of the base collector interface.
-        By default, collects BTC data for the last 14 days.
+        Fetch historical price data for Bitcoin in one currency over the specified number of days,
+        or only candles after `since` (Kraken's `since` cursor).
         """
-        return await self.collectBTC(days=days)
\ No newline at end of file
+        url = f"{self.base_url}/OHLC"
+        if since is not None:
+            cursor = int(since.timestamp())
+        else:
+            cursor = int((datetime.now(timezone.utc).timestamp() - days * 86400))
+        params = {
+            "pair": f"XBT{currency.upper()}",
+            "interval": INTERVAL_SECONDS[self.interval] // 60,  # in minutes
+            "since": cursor
+        }
+
+        # Kraken OHLC format: [time, open, high, low, close, vwap, volume, count]
+        series = await self._make_request(url, params, decoder=decode_ohlc)
+        return self._to_batch(series, currency, since)
+
+    async def fetch_window(self, currency: str, start: datetime, end: datetime,
+                           interval: str = '1h') -> PriceBatch:
+        url = f"{self.base_url}/OHLC"
+        params = {
+            "pair": f"XBT{currency.upper()}",
+            "interval": INTERVAL_SECONDS[interval] // 60,
+            "since": int(start.timestamp()) - 1
+        }
+        series = await self._make_request(url, params, decoder=decode_ohlc)
+        return self._clip(self._to_batch(series, currency, None), start, end)
@@ -0,0 +1,102 @@
+# src/collectors/decoders.py
+"""
+Typed decoders for exchange API payloads.
+
+Each decoder takes the raw response body and returns a PriceSeries of NumPy
+columns, checking the payload's shape on the way so a schema change fails
+loudly instead of producing garbage rows.
+"""
+from typing import Any, NamedTuple, Optional
+import numpy as np
+from src.utils.exceptions import DecodeError
+
+try:
+    import orjson as _json
+except ImportError:  # pragma: no cover - stdlib fallback
+    import json as _json
+
+class PriceSeries(NamedTuple):
+    timestamps: np.ndarray  # int64, epoch milliseconds UTC
+    prices: np.ndarray  # float64
+    volumes: Optional[np.ndarray] = None  # float64, same length as prices
+    cursor: Optional[int] = None  # pagination cursor (Kraken `last`)
+
+def loads(raw: bytes) -> Any:
+    try:
+        return _json.loads(raw)
+    except ValueError as e:
+        raise DecodeError(f"Invalid JSON payload: {e}") from e
+
+def _table(rows: Any, min_columns: int, name: str) -> np.ndarray:
+    """List of rows -> 2D object array with at least `min_columns` columns"""
+    if not isinstance(rows, list):
+        raise DecodeError(f"{name}: expected a list, got {type(rows).__name__}")
+    if not rows:
+        return np.empty((0, min_columns), dtype=object)
+    try:
+        table = np.array(rows, dtype=object)
+    except ValueError as e:
+        raise DecodeError(f"{name}: ragged rows") from e
+    if table.ndim != 2 or table.shape[1] < min_columns:
+        raise DecodeError(f"{name}: expected rows of at least {min_columns} fields, got shape {table.shape}")
+    return table
+
+def _column(table: np.ndarray, index: int, dtype, name: str) -> np.ndarray:
+    try:
+        return table[:, index].astype(dtype)
+    except (TypeError, ValueError) as e:
+        raise DecodeError(f"{name}: column {index} is not {np.dtype(dtype).name}") from e
+
+def decode_market_chart(raw: bytes) -> PriceSeries:
+    """CoinGecko market_chart(/range): {"prices": [[ms, price], ...], "total_volumes": [...]}"""
+    data = loads(raw)
+    if not isinstance(data, dict) or "prices" not in data:
+        raise DecodeError("market_chart: missing 'prices'")
+
+    prices = _table(data["prices"], 2, "market_chart.prices")
+    timestamps = _column(prices, 0, np.float64, "market_chart.prices").astype(np.int64)
+    values = _column(prices, 1, np.float64, "market_chart.prices")
+
+    volumes = None
+    raw_volumes = data.get("total_volumes")
+    if isinstance(raw_volumes, list) and len(raw_volumes) == len(values):
+        volumes = _column(_table(raw_volumes, 2, "market_chart.total_volumes"), 1, np.float64,
+                          "market_chart.total_volumes")
+    return PriceSeries(timestamps, values, volumes)
+
+def decode_klines(raw: bytes) -> PriceSeries:
+    """Binance klines: [[open_time, open, high, low, close, volume, ...], ...] (close price)"""
+    table = _table(loads(raw), 6, "klines")
+    return PriceSeries(
+        timestamps=_column(table, 0, np.int64, "klines"),
+        prices=_column(table, 4, np.float64, "klines"),
+        volumes=_column(table, 5, np.float64, "klines")
+    )
+
+def decode_ohlc(raw: bytes) -> PriceSeries:
+    """
+    Kraken OHLC: {"error": [], "result": {"<pair>": [[time, open, high, low, close,
+    vwap, volume, count], ...], "last": <cursor>}} (close price)
+    """
+    data = loads(raw)
+    if not isinstance(data, dict):
+        raise DecodeError("OHLC: expected an object")
+    if data.get("error"):
+        raise DecodeError(f"Kraken error: {data['error']}")
+    result = data.get("result")
+    if not isinstance(result, dict):
+        raise DecodeError("OHLC: missing 'result'")
+
+    # Candles sit under Kraken's own pair name (e.g. XXBTZUSD) next to `last`
+    pairs = [key for key in result if key != "last"]
+    if len(pairs) != 1:
+        raise DecodeError(f"OHLC: expected one pair in result, got {pairs}")
+    table = _table(result[pairs[0]], 8, "OHLC")
+
+    cursor = result.get("last")
+    return PriceSeries(
+        timestamps=_column(table, 0, np.int64, "OHLC") * 1000,
+        prices=_column(table, 4, np.float64, "OHLC"),
+        volumes=_column(table, 6, np.float64, "OHLC"),
+        cursor=int(cursor) if cursor is not None else None
+    )
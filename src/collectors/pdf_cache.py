@@ -0,0 +1,35 @@
+# src/collectors/pdf_cache.py
+import os
+from typing import Dict, Optional
+
+class PDFTextCache:
+    """Extracted PDF text keyed by the sha256 of the file, kept in memory and on disk"""
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._memory: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.txt")
+
+    def get(self, digest: str) -> Optional[str]:
+        text = self._memory.get(digest)
+        if text is None and os.path.exists(self._path(digest)):
+            with open(self._path(digest), encoding='utf-8') as f:
+                text = f.read()
+            self._memory[digest] = text
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def put(self, digest: str, text: str) -> None:
+        self._memory[digest] = text
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename so a crash never leaves a truncated entry behind
+        tmp_path = self._path(digest) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self._path(digest))
@@ -0,0 +1,242 @@
+# src/collectors/price_batch.py
+import hashlib
+import io
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from src.config.settings import settings
+
+class Categories:
+    """Stable string <-> small integer codes for categorical columns"""
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        """Code for `name`, registering it on first use"""
+        code = self._codes.get(name)
+        if code is None:
+            if len(self.names) >= 255:
+                raise ValueError("Too many categories for a uint8 code")
+            code = len(self.names)
+            self.names.append(name)
+            self._codes[name] = code
+        return code
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+CURRENCIES = Categories(settings.SUPPORTED_CURRENCIES)
+SOURCES = Categories(['coingecko', 'binance', 'kraken', 'consensus'])
+
+# Columns a batch may carry besides the core four: dtype and fill value for rows that lack them
+OPTIONAL_COLUMNS = {
+    'volumes': (np.float64, np.nan),  # traded volume in BTC
+    'spreads': (np.float64, np.nan),  # max - min price across sources (consensus rows)
+    'source_counts': (np.uint8, 1),  # sources behind the price (consensus rows)
+}
+
+class PricePoint(NamedTuple):
+    source: str
+    currency: str
+    price: float
+    timestamp: datetime
+
+def now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+def to_ms(timestamp: datetime) -> int:
+    """Epoch milliseconds for a datetime (naive values are taken as UTC)"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+def from_ms(timestamp_ms: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+
+@dataclass
+class PriceBatch:
+    """
+    Columnar batch of price points.
+
+    One row costs 18 bytes: epoch-ms timestamp (int64), price (float64) and
+    uint8 codes into CURRENCIES and SOURCES. `collected_at` is kept once per
+    batch rather than per row. The OPTIONAL_COLUMNS are None unless a
+    collector or the consensus stage fills them in.
+    """
+    timestamps: np.ndarray  # int64, epoch milliseconds UTC
+    prices: np.ndarray  # float64
+    currencies: np.ndarray  # uint8 codes into CURRENCIES
+    sources: np.ndarray  # uint8 codes into SOURCES
+    collected_at: int = field(default_factory=now_ms)  # epoch milliseconds UTC
+    volumes: Optional[np.ndarray] = None
+    spreads: Optional[np.ndarray] = None
+    source_counts: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls) -> 'PriceBatch':
+        return cls(
+            timestamps=np.empty(0, dtype=np.int64),
+            prices=np.empty(0, dtype=np.float64),
+            currencies=np.empty(0, dtype=np.uint8),
+            sources=np.empty(0, dtype=np.uint8)
+        )
+
+    @classmethod
+    def from_arrays(cls, timestamps: Union[np.ndarray, Sequence[int]], prices: Union[np.ndarray, Sequence[float]],
+                    currency: str, source: str, collected_at: Optional[int] = None,
+                    volumes: Union[np.ndarray, Sequence[float], None] = None) -> 'PriceBatch':
+        """Batch for a single (source, currency) from timestamp/price(/volume) columns"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if timestamps.shape != prices.shape:
+            raise ValueError(f"Column length mismatch: {timestamps.shape} vs {prices.shape}")
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=np.float64)
+            if volumes.shape != prices.shape:
+                raise ValueError(f"Column length mismatch: {volumes.shape} vs {prices.shape}")
+        size = len(timestamps)
+        return cls(
+            timestamps=timestamps,
+            prices=prices,
+            currencies=np.full(size, CURRENCIES.code(currency), dtype=np.uint8),
+            sources=np.full(size, SOURCES.code(source), dtype=np.uint8),
+            collected_at=collected_at if collected_at is not None else now_ms(),
+            volumes=volumes
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence['PriceBatch']) -> 'PriceBatch':
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+
+        optional = {}
+        for name, (dtype, fill) in OPTIONAL_COLUMNS.items():
+            if any(getattr(batch, name) is not None for batch in batches):
+                optional[name] = np.concatenate([
+                    getattr(batch, name) if getattr(batch, name) is not None
+                    else np.full(len(batch), fill, dtype=dtype)
+                    for batch in batches
+                ])
+        return cls(
+            timestamps=np.concatenate([batch.timestamps for batch in batches]),
+            prices=np.concatenate([batch.prices for batch in batches]),
+            currencies=np.concatenate([batch.currencies for batch in batches]),
+            sources=np.concatenate([batch.sources for batch in batches]),
+            collected_at=max(batch.collected_at for batch in batches),
+            **optional
+        )
+
+    def to_bytes(self) -> bytes:
+        """Compact .npz encoding; categorical codes are stored with their names so they survive a restart"""
+        buffer = io.BytesIO()
+        optional = {name: getattr(self, name) for name in OPTIONAL_COLUMNS if getattr(self, name) is not None}
+        np.savez(
+            buffer,
+            timestamps=self.timestamps,
+            prices=self.prices,
+            currencies=self.currencies,
+            sources=self.sources,
+            collected_at=np.int64(self.collected_at),
+            currency_names=np.array(CURRENCIES.names),
+            source_names=np.array(SOURCES.names),
+            **optional
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PriceBatch':
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            # Codes are assigned on first use, so map the writer's codes onto this process's
+            currencies = np.array([CURRENCIES.code(str(name)) for name in arrays['currency_names']], dtype=np.uint8)
+            sources = np.array([SOURCES.code(str(name)) for name in arrays['source_names']], dtype=np.uint8)
+            return cls(
+                timestamps=arrays['timestamps'],
+                prices=arrays['prices'],
+                currencies=currencies[arrays['currencies']],
+                sources=sources[arrays['sources']],
+                collected_at=int(arrays['collected_at']),
+                **{name: arrays[name] for name in OPTIONAL_COLUMNS if name in arrays.files}
+            )
+
+    def digest(self) -> str:
+        """Hash of the rows' contents (collected_at aside), to tie checkpoints to the batch they came from"""
+        digest = hashlib.sha1()
+        for column in (self.timestamps, self.prices, self.currencies, self.sources):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        size = self.timestamps.nbytes + self.prices.nbytes + self.currencies.nbytes + self.sources.nbytes
+        return size + sum(getattr(self, name).nbytes for name in OPTIONAL_COLUMNS if getattr(self, name) is not None)
+
+    def take(self, selector: Union[np.ndarray, slice]) -> 'PriceBatch':
+        """Rows selected by a boolean mask, index array or slice"""
+        return PriceBatch(
+            timestamps=self.timestamps[selector],
+            prices=self.prices[selector],
+            currencies=self.currencies[selector],
+            sources=self.sources[selector],
+            collected_at=self.collected_at,
+            **{name: getattr(self, name)[selector] for name in OPTIONAL_COLUMNS if getattr(self, name) is not None}
+        )
+
+    def __getitem__(self, selector: Union[np.ndarray, slice]) -> 'PriceBatch':
+        return self.take(selector)
+
+    def for_currency(self, currency: str) -> 'PriceBatch':
+        return self.take(self.currencies == CURRENCIES.code(currency))
+
+    def newer_than(self, timestamp_ms: int) -> 'PriceBatch':
+        return self.take(self.timestamps > timestamp_ms)
+
+    def datetimes(self) -> List[datetime]:
+        """Timestamps as naive UTC datetimes (matches the btc_prices columns)"""
+        return self.timestamps.astype('datetime64[ms]').astype(datetime).tolist()
+
+    def latest_by_key(self) -> Dict[Tuple[str, str], datetime]:
+        """Newest timestamp per (source, currency)"""
+        latest = {}
+        keys = self.sources.astype(np.uint16) << 8 | self.currencies
+        for key in np.unique(keys):
+            source, currency = SOURCES.name(int(key) >> 8), CURRENCIES.name(int(key) & 0xFF)
+            latest[(source, currency)] = from_ms(int(self.timestamps[keys == key].max()))
+        return latest
+
+    def to_rows(self) -> List[Dict]:
+        """Rows for inserting into btc_prices (with spread/source_count for consensus rows)"""
+        collected_at = from_ms(self.collected_at).replace(tzinfo=None)
+        currency_names = CURRENCIES.names
+        rows = [
+            {
+                'price': price,
+                'currency': currency_names[code],
+                'price_timestamp': timestamp,
+                'collected_at': collected_at
+            }
+            for price, code, timestamp in zip(self.prices.tolist(), self.currencies.tolist(), self.datetimes())
+        ]
+        if self.spreads is not None:
+            for row, spread, count in zip(rows, self.spreads.tolist(), self.source_counts.tolist()):
+                row['spread'] = spread
+                row['source_count'] = count
+        return rows
+
+    def __iter__(self) -> Iterator[PricePoint]:
+        for source, currency, price, timestamp in zip(
+            self.sources.tolist(), self.currencies.tolist(), self.prices.tolist(), self.timestamps.tolist()
+        ):
+            yield PricePoint(SOURCES.name(source), CURRENCIES.name(currency), price, from_ms(timestamp))
+
+    def __repr__(self) -> str:
+        return f"<PriceBatch(rows={len(self)}, bytes={self.nbytes})>"
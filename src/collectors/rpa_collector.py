@@ -1,14 +1,16 @@
 # src/collectors/rpa_collector.py
 
-from .base import BaseCollector, DataRecord
-import aiohttp
+from .base import BaseCollector, DataRecord, extract_pdf_text
 import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from src.config.settings import settings
-from src.utils.rate_limiter import RateLimiter
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from src.utils.rate_limiter import rate_limiters
+from .browser_pool import BrowserPool
+from .pdf_cache import PDFTextCache
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -44,122 +46,150 @@ class RPACollector(BaseCollector):
     }
     def __init__(self) -> None:
         super().__init__(name="rpa")
-        self.rate_limiter = RateLimiter(calls_per_minute=settings.RPA_RATE_LIMIT)
-        self.max_retries = 3
-        self.retries = 0
-        self.driver = None
+        self.rate_limiter = rate_limiters.get("rpa", calls_per_minute=settings.RPA_RATE_LIMIT)
+        self.browser_pool = BrowserPool(self._setup_selenium, size=settings.RPA_BROWSER_POOL_SIZE)
+        self.pdf_cache = PDFTextCache(settings.PDF_CACHE_DIR)
+        self._pdf_executor: Optional[ProcessPoolExecutor] = None
     
     async def collectPDFReports(self, pdf_urls: List[str]) -> List[DataRecord]:
         """
-        Download and extract text from PDF reports
+        Download and extract text from PDF reports, all reports at once
         """
-        data_records = []
-        for url in pdf_urls:
+        return list(await asyncio.gather(*(self._collect_pdf(url) for url in pdf_urls)))
+
+    async def _collect_pdf(self, url: str) -> DataRecord:
+        try:
+            # Streamed to a temp file so large reports never sit in memory
+            path, digest = await self._download_to_file(url, suffix=".pdf")
             try:
-                # Using inherited _download_file method
-                pdf_content = await self._download_file(url)
-                
-                # Using inherited _extract_pdf_text method
-                text = self._extract_pdf_text(pdf_content)
+                text = self.pdf_cache.get(digest)
+                cached = text is not None
+                if not cached:
+                    # PyPDF2 is CPU bound; parse in a worker process to keep the loop free
+                    loop = asyncio.get_running_loop()
+                    text = await loop.run_in_executor(self._get_pdf_executor(), extract_pdf_text, path)
+                    self.pdf_cache.put(digest, text)
+            finally:
+                os.remove(path)
 
-                data_records.append(
-                    DataRecord(
-                        source=self.name,
-                        data={
-                            "type": "pdf_report",
-                            "url": url,
-                            "content": text,
-                            "status": "success"
-                        },
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                )
-            except Exception as e:
-                data_records.append(
-                    DataRecord(
-                        source=self.name,
-                        data={
-                            "type": "pdf_report",
-                            "url": url,
-                            "error": str(e),
-                            "status": "failed"
-                        },
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                )
-        return data_records
+            return DataRecord(
+                source=self.name,
+                data={
+                    "type": "pdf_report",
+                    "url": url,
+                    "content": text,
+                    "content_hash": digest,
+                    "cached": cached,
+                    "status": "success"
+                },
+                timestamp=datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            return DataRecord(
+                source=self.name,
+                data={
+                    "type": "pdf_report",
+                    "url": url,
+                    "error": str(e),
+                    "status": "failed"
+                },
+                timestamp=datetime.now(timezone.utc)
+            )
+
+    def _get_pdf_executor(self) -> ProcessPoolExecutor:
+        if self._pdf_executor is None:
+            self._pdf_executor = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS)
+        return self._pdf_executor
     
     async def collectExchangeData(self, exchange_configs: List[Dict[str, Any]]) -> List[DataRecord]:
         """
-        Collect data from exchanges using Selenium
+        Collect data from exchanges using Selenium, several exchanges at a time
         """
-        data_records = []
-        # Using inherited _setup_selenium method
-        self.driver = self._setup_selenium()
+        results = await asyncio.gather(*(self._collect_exchange(config) for config in exchange_configs))
+        return [record for records in results for record in records]
 
+    async def _collect_exchange(self, config: Dict[str, Any]) -> List[DataRecord]:
         try:
-            for config in exchange_configs:
-                try:
-                    await self.rate_limiter.wait_if_needed()
-                    self.driver.get(config["url"])
+            await self.rate_limiter.wait_if_needed()
+            async with self.browser_pool.acquire() as driver:
+                values = await self.browser_pool.run(self._scrape_exchange, driver, config)
+            return [
+                DataRecord(
+                    source=self.name,
+                    data={
+                        "type": "exchange_data",
+                        "exchange": config["name"],
+                        "field": field,
+                        "value": value,
+                        "status": "success"
+                    },
+                    timestamp=datetime.now(timezone.utc)
+                )
+                for field, value in values
+            ]
+        except Exception as e:
+            return [
+                DataRecord(
+                    source=self.name,
+                    data={
+                        "type": "exchange_data",
+                        "exchange": config["name"],
+                        "error": str(e),
+                        "status": "failed"
+                    },
+                    timestamp=datetime.now(timezone.utc)
+                )
+            ]
 
-                    # Handle login if required
-                    if config.get("requires_login"):
-                        username_elem = WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located(By.NAME, "username")
-                        )
-                        password_elem = self.driver.find_element(By.NAME, "password")
+    def _scrape_exchange(self, driver, config: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Blocking part of an exchange scrape; runs on a worker thread"""
+        driver.get(config["url"])
 
-                        username_elem.send_keys(config["credentials"]["username"])
-                        password_elem.send_keys(config["credentials"]["password"])
+        # Handle login if required, reusing the exchange's cookies when they are still valid
+        if config.get("requires_login") and not self._restore_session(driver, config):
+            username_elem = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.NAME, "username"))
+            )
+            password_elem = driver.find_element(By.NAME, "password")
 
-                        login_button = self.driver.find_element(By.XPATH, config["login_button_xpath"])
-                        login_button.click()
+            username_elem.send_keys(config["credentials"]["username"])
+            password_elem.send_keys(config["credentials"]["password"])
 
-                        # Wait for login to complete
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located((By.XPATH, config["login_success_xpath"]))
-                        )
-                    
-                    # Extract data using provided selectors
-                    for selector in config["data_selectors"]:
-                        element = WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located((By.XPATH, selector["xpath"]))
-                        )
+            login_button = driver.find_element(By.XPATH, config["login_button_xpath"])
+            login_button.click()
+
+            # Wait for login to complete
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, config["login_success_xpath"]))
+            )
+            self.browser_pool.save_cookies(config["name"], driver.get_cookies())
+
+        # Extract data using provided selectors
+        values = []
+        for selector in config["data_selectors"]:
+            element = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, selector["xpath"]))
+            )
+            values.append((selector["name"], element.text))
+        return values
+
+    def _restore_session(self, driver, config: Dict[str, Any]) -> bool:
+        """Load saved cookies for the exchange; True if that leaves us logged in"""
+        cookies = self.browser_pool.get_cookies(config["name"])
+        if not cookies:
+            return False
+        driver.delete_all_cookies()
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+        driver.get(config["url"])
+        try:
+            WebDriverWait(driver, 3).until(
+                EC.presence_of_element_located((By.XPATH, config["login_success_xpath"]))
+            )
+            return True
+        except TimeoutException:
+            return False
 
-                        data_records.append(
-                            DataRecord(
-                                source=self.name,
-                                data={
-                                    "type": "exchange_data",
-                                    "exchange": config["name"],
-                                    "field": selector["name"],
-                                    "value": element.text,
-                                    "status": "success"
-                                },
-                                timestamp=datetime.now(timezone.utc)
-                            )
-                        )
-                except Exception as e:
-                    data_records.append(
-                        DataRecord(
-                            source=self.name,
-                            data={
-                                "type": "exchange_data",
-                                "exchange": config["name"],
-                                "error": str(e),
-                                "status": "failed"
-                            },
-                            timestamp=datetime.now(timezone.utc)
-                        )
-                    )
-        finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
-        
-        return data_records
-    
     async def collect(self, config: Dict[str, Any] = None) -> List[DataRecord]:
         """
         Implementation of the base collector interface.
@@ -182,9 +212,11 @@ class RPACollector(BaseCollector):
         
         return data_records
     
-    def cleanup(self):
-        """Cleanup Selenium resources"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+    async def cleanup(self):
+        """Cleanup Selenium and PDF worker resources"""
+        await self.browser_pool.close()
+        if self._pdf_executor is not None:
+            await asyncio.to_thread(self._pdf_executor.shutdown)
+            self._pdf_executor = None
+        await super().cleanup()
                         
\ No newline at end of file
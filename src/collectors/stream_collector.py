@@ -0,0 +1,276 @@
+# src/collectors/stream_collector.py
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+import aiohttp
+import numpy as np
+from .base import BaseCollector
+from .btc_collector import PriceCollector
+from .decoders import loads
+from .price_batch import PriceBatch, CURRENCIES, SOURCES, from_ms
+from src.config.settings import settings
+from src.utils.intervals import INTERVAL_SECONDS
+from src.utils.logger import logger
+
+BatchSink = Callable[[PriceBatch], Awaitable[Any]]
+
+class Tick(NamedTuple):
+    currency: str
+    timestamp: int  # candle open time, epoch milliseconds UTC
+    price: float  # close price
+
+class MicroBatcher:
+    """
+    Buffers ticks and hands them to `sink` every `flush_interval_ms` or
+    `max_records`, whichever comes first. Batches the sink fails on are kept,
+    up to `max_pending_records` rows, and handed over again, in order, before
+    the next batch.
+    """
+    def __init__(self, sink: BatchSink, source: str, max_records: int, flush_interval_ms: int,
+                 max_pending_records: Optional[int] = None) -> None:
+        self.sink = sink
+        self.source_code = SOURCES.code(source)
+        self.max_records = max_records
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending_records = max_pending_records or settings.STREAM_MAX_PENDING_RECORDS
+        self._timestamps: List[int] = []
+        self._prices: List[float] = []
+        self._currencies: List[int] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._pending: List[PriceBatch] = []
+        self.flushed_batches = 0
+        self.sink_failures = 0
+        self.dropped_rows = 0
+
+    async def add(self, tick: Tick) -> None:
+        self._timestamps.append(tick.timestamp)
+        self._prices.append(tick.price)
+        self._currencies.append(CURRENCIES.code(tick.currency))
+        if len(self._timestamps) >= self.max_records:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def add_batch(self, batch: PriceBatch) -> None:
+        """Gap fills arrive as whole batches; pass them straight through"""
+        if len(batch):
+            await self._emit(batch)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._timestamps:
+            return
+        batch = PriceBatch(
+            timestamps=np.asarray(self._timestamps, dtype=np.int64),
+            prices=np.asarray(self._prices, dtype=np.float64),
+            currencies=np.asarray(self._currencies, dtype=np.uint8),
+            sources=np.full(len(self._timestamps), self.source_code, dtype=np.uint8)
+        )
+        self._timestamps, self._prices, self._currencies = [], [], []
+        await self._emit(batch)
+
+    async def _emit(self, batch: PriceBatch) -> None:
+        # A failing sink must not take the stream down with it, nor lose the batch
+        self._pending.append(batch)
+        while self._pending:
+            try:
+                await self.sink(self._pending[0])
+            except Exception as e:
+                self.sink_failures += 1
+                logger.error(f"Stream sink failed for {len(self._pending[0])} rows, keeping them for a retry: {e}")
+                self._trim_pending()
+                return
+            self._pending.pop(0)
+            self.flushed_batches += 1
+
+    def _trim_pending(self) -> None:
+        while len(self._pending) > 1 and sum(len(batch) for batch in self._pending) > self.max_pending_records:
+            dropped = self._pending.pop(0)
+            self.dropped_rows += len(dropped)
+            logger.error(f"Stream sink still failing, dropped {len(dropped)} buffered rows")
+
+    @property
+    def pending_rows(self) -> int:
+        return sum(len(batch) for batch in self._pending)
+
+class BaseStreamCollector(BaseCollector):
+    """
+    Long-running WebSocket collector for closed candles.
+
+    Reconnects with exponential backoff, watches each currency's candle
+    sequence for gaps (missed candles during a disconnect are fetched over
+    REST through `gap_filler`), and micro-batches rows into a sink.
+    """
+    url: str = ""
+
+    def __init__(self, name: str, currencies: Optional[List[str]] = None, interval: str = '1m',
+                 gap_filler: Optional[PriceCollector] = None) -> None:
+        super().__init__(name=name)
+        self.currencies = currencies or list(settings.SUPPORTED_CURRENCIES)
+        self.interval = interval
+        self.interval_ms = INTERVAL_SECONDS[interval] * 1000
+        self.gap_filler = gap_filler
+        self.last_candle: Dict[str, int] = {}
+        self.gaps: List[Dict] = []
+        self.reconnects = 0
+        self.frame_errors = 0
+        self._running = False
+
+    def subscribe_message(self) -> Optional[Dict]:
+        """Message sent after connecting, if the feed needs one"""
+        return None
+
+    def parse(self, message: Any) -> List[Tick]:
+        """Closed candles contained in one decoded frame"""
+        raise NotImplementedError("Subclasses must implement parse()")
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def stream(self, sink: BatchSink) -> None:
+        """Stream closed candles into `sink` until stop() is called"""
+        batcher = MicroBatcher(
+            sink,
+            source=self.name,
+            max_records=settings.STREAM_FLUSH_RECORDS,
+            flush_interval_ms=settings.STREAM_FLUSH_INTERVAL_MS
+        )
+        self._running = True
+        backoff = 1.0
+        try:
+            while self._running:
+                try:
+                    session = await self._get_session()
+                    async with session.ws_connect(self.url, heartbeat=settings.STREAM_HEARTBEAT) as ws:
+                        logger.info(f"{self.name} stream connected")
+                        subscribe = self.subscribe_message()
+                        if subscribe:
+                            await ws.send_json(subscribe)
+                        backoff = 1.0
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                await self._handle_frame(msg.data, batcher)
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+                            if not self._running:
+                                break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"{self.name} stream error: {e}")
+
+                if self._running:
+                    self.reconnects += 1
+                    logger.info(f"{self.name} stream reconnecting in {backoff:.0f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, settings.STREAM_MAX_BACKOFF)
+        finally:
+            await batcher.flush()
+            if batcher.pending_rows:
+                logger.error(f"{self.name} stream stopped with {batcher.pending_rows} rows the sink didn't take")
+
+    async def _handle_frame(self, data: str, batcher: MicroBatcher) -> None:
+        """Parse one text frame and batch its candles; a malformed frame is logged, counted and skipped"""
+        try:
+            for tick in self.parse(loads(data)):
+                await self._handle_tick(tick, batcher)
+        except Exception as e:
+            self.frame_errors += 1
+            logger.warning(f"{self.name} stream skipped a malformed frame ({e!r}): {data[:200]}")
+
+    async def _handle_tick(self, tick: Tick, batcher: MicroBatcher) -> None:
+        last = self.last_candle.get(tick.currency)
+        if last is not None:
+            if tick.timestamp <= last:
+                return  # replayed candle after a reconnect
+            if tick.timestamp - last > self.interval_ms:
+                await self._fill_gap(tick.currency, last + self.interval_ms, tick.timestamp, batcher)
+        self.last_candle[tick.currency] = tick.timestamp
+        await batcher.add(tick)
+
+    async def _fill_gap(self, currency: str, start_ms: int, end_ms: int, batcher: MicroBatcher) -> None:
+        missing = (end_ms - start_ms) // self.interval_ms
+        self.gaps.append({'currency': currency, 'start': from_ms(start_ms), 'end': from_ms(end_ms), 'missing': missing})
+        logger.warning(f"{self.name} stream gap for {currency}: {missing} candles from {from_ms(start_ms)}")
+        if self.gap_filler is None:
+            return
+        try:
+            batch = await self.gap_filler.fetch_window(
+                currency, from_ms(start_ms), from_ms(end_ms), interval=self.interval
+            )
+            await batcher.add_batch(batch)
+        except Exception as e:
+            logger.error(f"{self.name} could not fill gap for {currency}: {e}")
+
+class BinanceStreamCollector(BaseStreamCollector):
+    """Closed klines from Binance's public combined stream"""
+    def __init__(self, currencies: Optional[List[str]] = None, interval: str = '1m',
+                 gap_filler: Optional[PriceCollector] = None, url: Optional[str] = None) -> None:
+        super().__init__(name="binance", currencies=currencies, interval=interval, gap_filler=gap_filler)
+        streams = "/".join(f"btc{currency}@kline_{interval}" for currency in self.currencies)
+        self.url = url or f"{settings.BINANCE_WS_URL}/stream?streams={streams}"
+        self._symbols = {f"BTC{currency.upper()}": currency for currency in self.currencies}
+
+    def parse(self, message: Any) -> List[Tick]:
+        # {"stream": "btcusd@kline_1m", "data": {"e": "kline", "s": "BTCUSD", "k": {"t": open_ms, "c": close, "x": closed}}}
+        data = message.get("data", message) if isinstance(message, dict) else None
+        if not data or data.get("e") != "kline":
+            return []
+        kline = data["k"]
+        currency = self._symbols.get(data.get("s"))
+        if currency is None or not kline.get("x"):
+            return []
+        return [Tick(currency, int(kline["t"]), float(kline["c"]))]
+
+class KrakenStreamCollector(BaseStreamCollector):
+    """
+    Candles from Kraken's v2 `ohlc` channel. Kraken only sends updates for the
+    open candle, so a candle is emitted once the next one starts.
+    """
+    def __init__(self, currencies: Optional[List[str]] = None, interval: str = '1m',
+                 gap_filler: Optional[PriceCollector] = None, url: Optional[str] = None) -> None:
+        super().__init__(name="kraken", currencies=currencies, interval=interval, gap_filler=gap_filler)
+        self.url = url or settings.KRAKEN_WS_URL
+        self._symbols = {f"BTC/{currency.upper()}": currency for currency in self.currencies}
+        self._open: Dict[str, Tick] = {}
+
+    def subscribe_message(self) -> Optional[Dict]:
+        return {
+            "method": "subscribe",
+            "params": {
+                "channel": "ohlc",
+                "symbol": list(self._symbols),
+                "interval": INTERVAL_SECONDS[self.interval] // 60
+            }
+        }
+
+    def parse(self, message: Any) -> List[Tick]:
+        # {"channel": "ohlc", "type": "update", "data": [{"symbol": "BTC/USD", "close": 1.0, "interval_begin": "..."}]}
+        if not isinstance(message, dict) or message.get("channel") != "ohlc":
+            return []
+        closed = []
+        for candle in message.get("data", []):
+            currency = self._symbols.get(candle.get("symbol"))
+            if currency is None:
+                continue
+            begin = _parse_iso_ms(candle["interval_begin"])
+            current = self._open.get(currency)
+            if current is not None and begin > current.timestamp:
+                closed.append(current)
+            if current is None or begin >= current.timestamp:
+                self._open[currency] = Tick(currency, begin, float(candle["close"]))
+        return closed
+
+def _parse_iso_ms(value: str) -> int:
+    """Kraken's RFC 3339 timestamps (nanosecond precision) -> epoch ms"""
+    value = value.rstrip("Z")
+    if "." in value:
+        head, fraction = value.split(".", 1)
+        value = f"{head}.{fraction[:6]}"
+    parsed = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
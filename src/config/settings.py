@@ -11,12 +11,16 @@ class Settings:
 
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    STORAGE_BACKEND: str = os.getenv('STORAGE_BACKEND', 'postgres')  # postgres or sqlite
+    SQLITE_PATH: str = os.getenv('SQLITE_PATH', 'data/platform.sqlite3')  # used by the sqlite backend
 
     # API settings
     COINGECKO_API_KEY: Optional[str] = os.getenv('COINGECKO_API_KEY')
     COINGECKO_BASE_URL: str = "https://api.coingecko.com/api/v3"
     BINANCE_BASE_URL = "https://api.binance.com/api/v3"
     KRAKEN_BASE_URL = "https://api.kraken.com/0/public"
+    BINANCE_WS_URL = "wss://stream.binance.com:9443"
+    KRAKEN_WS_URL = "wss://ws.kraken.com/v2"
     RPA_RATE_LIMIT = 10
 
     # Collection settings
@@ -24,6 +28,26 @@ class Settings:
     SUPPORTED_CURRENCIES: list[str] = ["usd", "eur", "gbp"]
     RATE_LIMIT_CALLS: int = 10
     RATE_LIMIT_PERIOD: int = 60  # in seconds
+    RATE_LIMIT_BURST: int = int(os.getenv('RATE_LIMIT_BURST', '5'))  # calls allowed back to back
+
+    # HTTP client settings (shared connection pool)
+    HTTP_POOL_LIMIT: int = int(os.getenv('HTTP_POOL_LIMIT', '100'))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10'))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv('HTTP_DNS_CACHE_TTL', '300'))  # in seconds
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))  # in seconds
+    HTTP_TIMEOUT: float = float(os.getenv('HTTP_TIMEOUT', '30'))  # in seconds
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv('MAX_CONCURRENT_REQUESTS', '8'))
+    RESPONSE_CACHE_TTL: float = float(os.getenv('RESPONSE_CACHE_TTL', '10'))  # in seconds, 0 disables caching
+    RESPONSE_CACHE_SIZE: int = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))  # entries
+
+    # Source health (circuit breaker and adaptive concurrency per source)
+    SOURCE_MAX_RETRIES: int = int(os.getenv('SOURCE_MAX_RETRIES', '3'))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))  # consecutive failures
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '60'))  # in seconds
+    SOURCE_TARGET_LATENCY: float = float(os.getenv('SOURCE_TARGET_LATENCY', '2.0'))  # in seconds
+    SOURCE_MIN_CONCURRENCY: int = int(os.getenv('SOURCE_MIN_CONCURRENCY', '1'))
+    SOURCE_MAX_CONCURRENCY: int = int(os.getenv('SOURCE_MAX_CONCURRENCY', '8'))
+    SOURCE_INITIAL_CONCURRENCY: int = int(os.getenv('SOURCE_INITIAL_CONCURRENCY', '2'))
 
     # Exchange API credentials
     EXCHANGE1_USERNAME: str = os.getenv("EXCHANGE1_USERNAME")
@@ -31,31 +55,86 @@ class Settings:
 
     # RPA settings
     ENABLE_RPA: bool = os.getenv("ENABLE_RPA", "false").lower() == "true"
+    RPA_BROWSER_POOL_SIZE: int = int(os.getenv('RPA_BROWSER_POOL_SIZE', '2'))  # warm browsers kept between runs
+    PDF_EXTRACT_WORKERS: int = int(os.getenv('PDF_EXTRACT_WORKERS', '2'))  # processes parsing PDF reports
+    PDF_CACHE_DIR: str = os.getenv('PDF_CACHE_DIR', 'cache/pdf_text')
     
     # Collection intervals
     PRICE_COLLECTION_INTERVAL: int = int(os.getenv("PRICE_COLLECTION_INTERVAL", "5"))
 
+    # Resumable runs: stage checkpoints keyed by run id (Airflow passes its run_id)
+    PIPELINE_RUN_ID: Optional[str] = os.getenv('PIPELINE_RUN_ID')
+    RUN_STATE_PATH: str = os.getenv('RUN_STATE_PATH', 'state/runs.sqlite3')
+    RUN_STATE_TTL: float = float(os.getenv('RUN_STATE_TTL', '86400'))  # in seconds
+    PIPELINE_MAX_ATTEMPTS: int = int(os.getenv('PIPELINE_MAX_ATTEMPTS', '3'))  # tries of one run id before a fresh run
+
+    # Batches waiting between two stages of a streaming pipeline run
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))
+
+    # Multi-source consensus
+    CONSENSUS_ENABLED: bool = os.getenv("CONSENSUS_ENABLED", "true").lower() == "true"
+    CONSENSUS_METHOD: str = os.getenv("CONSENSUS_METHOD", "median")  # median or vwap
+    CONSENSUS_INTERVAL: str = os.getenv("CONSENSUS_INTERVAL", "5m")  # bucket size
+    CONSENSUS_MIN_SOURCES: int = int(os.getenv("CONSENSUS_MIN_SOURCES", "1"))
+
+    # Streaming settings
+    ENABLE_STREAMING: bool = os.getenv("ENABLE_STREAMING", "false").lower() == "true"
+    STREAM_SOURCES: list[str] = os.getenv("STREAM_SOURCES", "binance,kraken").split(",")
+    STREAM_FLUSH_INTERVAL_MS: int = int(os.getenv('STREAM_FLUSH_INTERVAL_MS', '250'))
+    STREAM_FLUSH_RECORDS: int = int(os.getenv('STREAM_FLUSH_RECORDS', '500'))
+    STREAM_HEARTBEAT: float = float(os.getenv('STREAM_HEARTBEAT', '20'))  # in seconds
+    STREAM_MAX_BACKOFF: float = float(os.getenv('STREAM_MAX_BACKOFF', '60'))  # in seconds
+    STREAM_MAX_PENDING_RECORDS: int = int(os.getenv('STREAM_MAX_PENDING_RECORDS', '50000'))  # rows kept while the sink fails
+
     # Database settings
     SQL_ECHO: bool = os.getenv('SQL_ECHO', 'false').lower() == 'true'
     DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
     DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
     DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
     DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_SSLMODE: str = os.getenv('DB_SSLMODE', 'require')  # Postgres only; empty leaves it to DATABASE_URL
+    DB_CREATE_SCHEMA: bool = os.getenv('DB_CREATE_SCHEMA', 'true').lower() == 'true'  # false when Alembic owns the schema
 
     # Cache settings
     CACHE_DEFAULT_TTL: int = int(os.getenv('CACHE_DEFAULT_TTL', '300'))
     
     # Batch processing settings
     DEFAULT_BATCH_SIZE: int = int(os.getenv('DEFAULT_BATCH_SIZE', '1000'))
+
+    # Quality results write-behind queue
+    QUALITY_QUEUE_SIZE: int = int(os.getenv('QUALITY_QUEUE_SIZE', '10000'))  # rows
+    QUALITY_BATCH_SIZE: int = int(os.getenv('QUALITY_BATCH_SIZE', '500'))
+    QUALITY_FLUSH_INTERVAL: float = float(os.getenv('QUALITY_FLUSH_INTERVAL', '1.0'))  # in seconds
+
+    # Local spool for price writes while the database is down or slow
+    SPOOL_ENABLED: bool = os.getenv('SPOOL_ENABLED', 'true').lower() == 'true'
+    SPOOL_DIR: str = os.getenv('SPOOL_DIR', 'state/spool')
+    SPOOL_SEGMENT_BYTES: int = int(os.getenv('SPOOL_SEGMENT_BYTES', str(64 * 1024 * 1024)))
+    SPOOL_WRITE_TIMEOUT: float = float(os.getenv('SPOOL_WRITE_TIMEOUT', '10'))  # in seconds, latency budget per write
+    SPOOL_RETRY_INTERVAL: float = float(os.getenv('SPOOL_RETRY_INTERVAL', '5'))  # in seconds
+
+    # Parquet archive (cold tier of btc_prices)
+    ARCHIVE_DIR: str = os.getenv('ARCHIVE_DIR', 'archive')
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))  # rows older than this are archived
+    ARCHIVE_ROW_GROUP_SIZE: int = int(os.getenv('ARCHIVE_ROW_GROUP_SIZE', '100000'))  # rows
+
+    # Backfill settings
+    BACKFILL_CONCURRENCY: int = int(os.getenv('BACKFILL_CONCURRENCY', '4'))
+    BACKFILL_CHECKPOINT_DIR: str = os.getenv('BACKFILL_CHECKPOINT_DIR', 'checkpoints')
     
     # Performance monitoring
+    METRICS_HOST: str = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', '9108'))  # 0 disables the /metrics endpoint
+    METRICS_FILE: str = os.getenv('METRICS_FILE', '')  # Prometheus text file rewritten every minute when set
     PERFORMANCE_THRESHOLD: float = float(os.getenv('PERFORMANCE_THRESHOLD', '5.0'))
 
     @classmethod
     def validate(cls) -> None:
         """Validate required settings."""
-        if not cls.DATABASE_URL:
-            raise ValueError("DATABASE_URL is required")
+        if cls.STORAGE_BACKEND not in ('postgres', 'sqlite'):
+            raise ValueError(f"Unknown STORAGE_BACKEND: {cls.STORAGE_BACKEND}")
+        if cls.STORAGE_BACKEND == 'postgres' and not cls.DATABASE_URL:
+            raise ValueError("DATABASE_URL is required for the postgres storage backend")
 
 # Create a global settings instance
 settings = Settings()
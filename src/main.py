@@ -2,28 +2,30 @@
 import asyncio
 from src.pipelines.btc_pipeline import BTCPipeline
 from src.pipelines.news_pipeline import BitcoinNewsPipeline
+from src.pipelines.stream_pipeline import StreamPipeline
 from src.reports.report_generator import ReportGenerator
 from src.analysis.market_analyzer import MarketAnalyzer
-from src.storage.database import DatabaseManager
-from src.utils.scheduler import Scheduler
+from src.storage.registry import databases
+from src.config.settings import settings
+from src.utils.scheduler import Scheduler, current_run_id
 from src.utils.logger import logger
+from src.utils.metrics import pipeline_metrics
+from src.utils.metrics_server import MetricsServer
 import signal
 
-async def run_price_collection():
+async def run_price_collection(pipeline: BTCPipeline):
     """Task for collecting price data"""
     try:
-        pipeline = BTCPipeline()
         logger.info("Starting BTC pipeline...")
-        results = await pipeline.run(days=1)
+        results = await pipeline.run(days=1, concurrent=True, incremental=True, run_id=current_run_id.get())
         logger.info(f"BTC pipeline complete. Collected {len(results) if results else 0} records")
     except Exception as e:
         logger.error(f"Error in price collection: {e}")
         raise
 
-async def run_news_collection():
+async def run_news_collection(pipeline: BitcoinNewsPipeline):
     """Task for collecting news"""
     try:
-        pipeline = BitcoinNewsPipeline()
         logger.info("Starting news pipeline...")
         await pipeline.run()
         logger.info("News pipeline complete")
@@ -34,14 +36,13 @@ async def run_news_collection():
 async def generate_reports():
     """Task for generating reports"""
     try:
-        db = DatabaseManager()
         logger.info("Generating reports...")
-        with db.get_session() as session:
+        async with databases.get_async().get_session() as session:
             analyzer = MarketAnalyzer(session)
             report_gen = ReportGenerator(analyzer)
 
-            daily_report = report_gen.generate_daily_report()
-            weekly_report = report_gen.generate_weekly_report()
+            daily_report = await report_gen.generate_daily_report_async()
+            weekly_report = await report_gen.generate_weekly_report_async()
 
             logger.info("Reports generated successfully")
     except Exception as e:
@@ -64,16 +65,32 @@ async def update_dashboard(scheduler: Scheduler):
     """Task for updating dashboard"""
     await scheduler.update_dashboard()
 
+async def write_metrics():
+    """Task for exporting metrics to a textfile"""
+    pipeline_metrics.write_textfile(settings.METRICS_FILE)
+
 async def main():
     scheduler = None
+    metrics_server = None
+    price_pipeline = None
+    news_pipeline = None
+    stream_pipeline = None
+    stream_task = None
     try:
         logger.info("Starting data platform...")
         
-        # Initialize database
-        db = DatabaseManager()
-        db.init_db()
+        # Create the schema once; scheduled runs reuse the shared engine and skip it
+        await databases.get_backend().ensure_schema()
         logger.info("Database initialized")
 
+        if settings.METRICS_PORT:
+            metrics_server = MetricsServer(pipeline_metrics, settings.METRICS_HOST, settings.METRICS_PORT)
+            await metrics_server.start()
+
+        # Pipelines live as long as the process, keeping their collectors and HTTP sessions
+        price_pipeline = BTCPipeline()
+        news_pipeline = BitcoinNewsPipeline()
+
         # Create scheduler
         scheduler = Scheduler()
 
@@ -82,17 +99,28 @@ async def main():
             logger.info("Shutdown signal received")
             if scheduler:
                 scheduler.stop()
+            if stream_pipeline:
+                stream_pipeline.stop()
         
         # Register signal handlers
         for sig in (signal.SIGINT, signal.SIGTERM):
             asyncio.get_event_loop().add_signal_handler(sig, signal_handler)
 
         # Add tasks with different intervals
-        scheduler.add_task("price_collection", run_price_collection, interval_minutes=5)
-        scheduler.add_task("news_collection", run_news_collection, interval_minutes=30)
-        scheduler.add_task("report_generation", generate_reports, interval_minutes=1440)
+        scheduler.add_task("price_collection", lambda: run_price_collection(price_pipeline), interval_minutes=5)
+        scheduler.add_task("news_collection", lambda: run_news_collection(news_pipeline), interval_minutes=30)
+        if settings.STORAGE_BACKEND == 'postgres':
+            # MarketAnalyzer's report queries run on the asyncpg engine
+            scheduler.add_task("report_generation", generate_reports, interval_minutes=1440)
         scheduler.add_task("status_report", lambda: print_status(scheduler), interval_minutes=15)
         scheduler.add_task("dashboard_update", lambda: update_dashboard(scheduler), interval_minutes=1)
+        if settings.METRICS_FILE:
+            scheduler.add_task("metrics_export", write_metrics, interval_minutes=1)
+
+        # Live prices stream alongside the scheduled REST collection
+        if settings.ENABLE_STREAMING:
+            stream_pipeline = StreamPipeline()
+            stream_task = asyncio.create_task(stream_pipeline.run())
 
         logger.info("Starting scheduler. Press Ctrl+C to stop.")
         logger.info(f"Dashboard available at: {scheduler.dashboard_path}")
@@ -106,6 +134,17 @@ async def main():
     finally:
         if scheduler:
             scheduler.stop()
+        if stream_pipeline:
+            stream_pipeline.stop()
+            stream_task.cancel()
+            await asyncio.gather(stream_task, return_exceptions=True)
+            await stream_pipeline.close()
+        for pipeline in (price_pipeline, news_pipeline):
+            if pipeline:
+                await pipeline.close()
+        await databases.dispose()
+        if metrics_server:
+            await metrics_server.stop()
         logger.info("Shutdown complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+# src/pipelines/archive_pipeline.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from src.config.settings import settings
+from src.storage.archive import ARCHIVE_COLUMNS, PriceArchive, to_naive_utc, next_month
+from src.storage.backends import StorageBackend
+from src.storage.registry import databases
+from src.utils.logger import logger
+
+@dataclass
+class ArchiveStats:
+    ranges_exported: int = 0
+    rows_exported: int = 0
+    rows_dropped: int = 0
+    partitions_compacted: int = 0
+
+class ArchivePipeline:
+    """
+    Moves closed time ranges of btc_prices into the Parquet archive.
+
+    Each currency is exported one month at a time, from its archive boundary
+    (or its oldest row) up to `before`. The boundary advances after every
+    file, so an interrupted run resumes where it stopped. With drop=True the
+    exported rows are deleted from the hot table once their file is written;
+    rows found below the boundary are merged into the archive before they
+    are deleted, since they may have arrived after their range was exported.
+    """
+    def __init__(self, storage: Optional[StorageBackend] = None, archive: Optional[PriceArchive] = None,
+                 currencies: Optional[List[str]] = None) -> None:
+        self.storage = storage or databases.get_backend()
+        self.archive = archive or PriceArchive()
+        self.currencies = currencies or list(settings.SUPPORTED_CURRENCIES)
+
+    def run(self, before: datetime, drop: bool = False, compact: bool = True) -> ArchiveStats:
+        stats = ArchiveStats()
+        before = to_naive_utc(before)
+        for currency in self.currencies:
+            start = self.archive.boundary(currency)
+            if start is not None and drop:
+                # Rows archived by an earlier run without drop (or interrupted before the delete),
+                # or written below the boundary later on, e.g. by a backfill
+                late = self.storage.read_prices(currency, until=start, columns=ARCHIVE_COLUMNS)
+                if not late.empty:
+                    stats.rows_exported += self.archive.merge(currency, late)
+                    stats.rows_dropped += self.storage.delete_prices(currency, until=start)
+            if start is None:
+                start = self.storage.oldest_price_time(currency)
+                if start is None:
+                    continue
+
+            while start < before:
+                end = min(next_month(start), before)
+                rows = self.storage.read_prices(currency, since=start, until=end, columns=ARCHIVE_COLUMNS)
+                written = self.archive.write(currency, rows, start, end)
+                self.archive.set_boundary(currency, end)
+                stats.ranges_exported += 1
+                stats.rows_exported += written
+                if drop and written:
+                    stats.rows_dropped += self.storage.delete_prices(currency, since=start, until=end)
+                logger.info(f"Archived {currency} {start} - {end}: {written} rows")
+                start = end
+
+        if compact:
+            stats.partitions_compacted = self.archive.compact()
+
+        logger.info(
+            f"Archive complete: {stats.rows_exported} rows in {stats.ranges_exported} ranges, "
+            f"{stats.rows_dropped} dropped from the hot table, {stats.partitions_compacted} partitions compacted"
+        )
+        return stats
@@ -0,0 +1,151 @@
+# src/pipelines/backfill_pipeline.py
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+from src.collectors.btc_collector import PriceCollector, CoinGeckoCollector, BinanceCollector, KrakenCollector
+from src.processors.btc_processor import BTCProcessor
+from src.storage.registry import databases
+from src.storage.watermarks import batch_watermarks
+from src.config.settings import settings
+from src.utils.error_tracker import ErrorTracker
+from src.utils.logger import logger
+
+@dataclass(frozen=True)
+class BackfillWindow:
+    source: str
+    currency: str
+    interval: str
+    start: datetime
+    end: datetime
+
+    @property
+    def key(self) -> str:
+        return f"{self.source}:{self.currency}:{self.interval}:{self.start.isoformat()}:{self.end.isoformat()}"
+
+@dataclass
+class BackfillStats:
+    windows_done: int = 0
+    windows_skipped: int = 0
+    windows_failed: int = 0
+    rows_fetched: int = 0
+    rows_inserted: int = 0
+
+class BackfillCheckpoint:
+    """Append-only record of finished windows, so an interrupted backfill can resume"""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.done.add(json.loads(line)['window'])
+
+    def is_done(self, window: BackfillWindow) -> bool:
+        return window.key in self.done
+
+    def mark_done(self, window: BackfillWindow, rows: int) -> None:
+        self.done.add(window.key)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'window': window.key, 'rows': rows}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+class BackfillPipeline:
+    """
+    Historical backfill over an arbitrary date range.
+
+    The range is split into windows each source can serve in one request.
+    Windows are produced lazily and consumed by a fixed number of workers, and
+    every fetched batch is written before the next one is taken, so memory use
+    doesn't grow with the length of the range.
+    """
+    def __init__(self, sources: List[str], currencies: Optional[List[str]] = None,
+                 interval: str = '1h', concurrency: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None) -> None:
+        available = {
+            'coingecko': CoinGeckoCollector,
+            'binance': BinanceCollector,
+            'kraken': KrakenCollector
+        }
+        unknown = [source for source in sources if source not in available]
+        if unknown:
+            raise ValueError(f"Unknown backfill sources: {unknown}")
+
+        self.collectors: Dict[str, PriceCollector] = {source: available[source]() for source in sources}
+        self.currencies = currencies or list(settings.SUPPORTED_CURRENCIES)
+        self.interval = interval
+        self.concurrency = concurrency or settings.BACKFILL_CONCURRENCY
+        self.checkpoint = BackfillCheckpoint(
+            checkpoint_path or os.path.join(settings.BACKFILL_CHECKPOINT_DIR, f"backfill_{interval}.jsonl")
+        )
+        self.processor = BTCProcessor()
+        self.storage = databases.get_backend()
+        self.error_tracker = ErrorTracker()
+
+    def plan_windows(self, start: datetime, end: datetime) -> Iterator[BackfillWindow]:
+        """Windows for every (source, currency), interleaved so that sources run side by side"""
+        def windows_for(source: str, currency: str) -> Iterator[BackfillWindow]:
+            span = self.collectors[source].window_span(self.interval)
+            window_start = start
+            while window_start < end:
+                window_end = min(window_start + span, end)
+                yield BackfillWindow(source, currency, self.interval, window_start, window_end)
+                window_start = window_end
+
+        iterators = [windows_for(source, currency) for source in self.collectors for currency in self.currencies]
+        while iterators:
+            for iterator in list(iterators):
+                window = next(iterator, None)
+                if window is None:
+                    iterators.remove(iterator)
+                else:
+                    yield window
+
+    async def run(self, start: datetime, end: datetime) -> BackfillStats:
+        stats = BackfillStats()
+        windows = self.plan_windows(start, end)
+        await self.storage.ensure_schema()
+
+        async def worker():
+            # All workers share one lazy iterator; the event loop makes next() safe
+            for window in windows:
+                if self.checkpoint.is_done(window):
+                    stats.windows_skipped += 1
+                    continue
+                try:
+                    batch = await self.collectors[window.source].fetch_window(
+                        window.currency, window.start, window.end, interval=window.interval
+                    )
+                    batch = self.processor.process_batch(batch)
+                    inserted, _ = await self.storage.write_prices(batch)
+                    if len(batch):
+                        await self.storage.update_watermarks(batch_watermarks(batch, window.interval))
+                    self.checkpoint.mark_done(window, rows=len(batch))
+
+                    stats.windows_done += 1
+                    stats.rows_fetched += len(batch)
+                    stats.rows_inserted += inserted
+                    logger.info(f"Backfilled {window.key}: {len(batch)} rows, {inserted} new")
+                except Exception as e:
+                    stats.windows_failed += 1
+                    self.error_tracker.record_error(f'backfill_{window.source}', e, {'window': window.key})
+                    logger.error(f"Backfill window {window.key} failed: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        logger.info(
+            f"Backfill complete: {stats.windows_done} windows done, {stats.windows_skipped} already done, "
+            f"{stats.windows_failed} failed, {stats.rows_inserted}/{stats.rows_fetched} rows inserted"
+        )
+        return stats
+
+    async def close(self):
+        """Release collector resources (shared HTTP session)"""
+        for collector in self.collectors.values():
+            await collector.cleanup()
@@ -3,24 +3,41 @@
 # import os
 # sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from typing import List, Dict
-from src.collectors.btc_collector import CoinGeckoCollector, BinanceCollector, KrakenCollector
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+from src.collectors.price_batch import PriceBatch, CURRENCIES, SOURCES
+from src.collectors.btc_collector import PriceCollector, CoinGeckoCollector, BinanceCollector, KrakenCollector
 from src.collectors.rpa_collector import RPACollector
 from src.processors.btc_processor import BTCProcessor
-from src.storage.models import BTCPrice
-from src.storage.database import DatabaseManager
+from src.processors.consensus import ConsensusEngine
+from src.storage.registry import databases
+from src.storage.run_state import RunStateStore
+from src.storage.watermarks import WatermarkKey, batch_watermarks
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from src.utils.metrics import MetricsCollector
+from src.utils.metrics import (
+    MetricsCollector, STAGE_SECONDS, RECORDS_TOTAL, RECORDS_PER_SECOND, ROWS_WRITTEN, RUNS_TOTAL
+)
+from src.utils.rate_limiter import rate_limiters
+from src.utils.request_cache import response_cache
 from src.utils.logger import logger
-from src.validators.price_validator import PriceValidator
+from src.validators.price_validator import PriceValidator, ValidationState
 from src.analysis.price_analyzer import PriceAnalyzer
 from src.config.settings import settings
 from src.utils.exceptions import ValidationError, CollectionError
 from src.utils.error_tracker import ErrorTracker
 from src.validators.validators import DataQualityValidator
-from src.storage.quality_storage import QualityCheckResult
-from src.utils.json_encoder import serialize_for_json
+from src.storage.quality_writer import QualityResultWriter
+
+@dataclass
+class StreamingStats:
+    batches_written: int = 0
+    batches_rejected: int = 0
+    rows_fetched: int = 0
+    rows_inserted: int = 0
+    first_write_seconds: Optional[float] = None  # time until the first batch was committed
 
 class BTCPipeline:
     def __init__(self, strict_validation: bool = False):
@@ -31,98 +48,159 @@ class BTCPipeline:
             'kraken': KrakenCollector(),
             'rpa': RPACollector()
         }
-        self.processor = BTCProcessor()
-        self.db = DatabaseManager()
+        # Several sources in one run are merged into one consensus price per bucket
+        consensus = ConsensusEngine(
+            interval=settings.CONSENSUS_INTERVAL,
+            method=settings.CONSENSUS_METHOD,
+            min_sources=settings.CONSENSUS_MIN_SOURCES
+        ) if settings.CONSENSUS_ENABLED else None
+        self.processor = BTCProcessor(consensus=consensus)
+        # Shared storage backend (Postgres or embedded SQLite); db is its sync engine for callers outside the loop
+        self.storage = databases.get_backend()
+        self.db = self.storage.db
         self.metrics = MetricsCollector()
         self.validator = PriceValidator()
         self.error_tracker = ErrorTracker()
         self.quality_validator = DataQualityValidator()
+        self.quality_writer = QualityResultWriter(self.storage)
         self.strict_validation = strict_validation
+        self._run_state: Optional[RunStateStore] = None
+
+    @property
+    def run_state(self) -> RunStateStore:
+        if self._run_state is None:
+            self._run_state = RunStateStore(settings.RUN_STATE_PATH, ttl=settings.RUN_STATE_TTL)
+        return self._run_state
+
+    async def _checkpointed(self, run_id: Optional[str], window: str, stage: str,
+                            produce: Callable[[], Awaitable[PriceBatch]]) -> PriceBatch:
+        """Batch from this run's checkpoint for (window, stage), or produce() it and checkpoint it"""
+        if run_id is None:
+            return await produce()
+        saved = await self.run_state.get_async(run_id, window, stage)
+        if saved is not None:
+            logger.info(f"Run {run_id}: reusing {stage} checkpoint for {window}")
+            return PriceBatch.from_bytes(saved)
+        batch = await produce()
+        await self.run_state.put_async(run_id, window, stage, batch.to_bytes())
+        return batch
 
-    async def run(self, days: int = 14, sources: List[str] = None, rpa_config: Dict = None) -> List[BTCPrice]:
-        """Enhanced pipeline supporting multiple data sources"""
+    async def run(self, days: int = 14, sources: List[str] = None, rpa_config: Dict = None,
+                  concurrent: bool = False, incremental: bool = False,
+                  run_id: Optional[str] = None) -> PriceBatch:
+        """
+        Enhanced pipeline supporting multiple data sources.
+        With concurrent=True every (source, currency) fetch runs at the same time.
+        With incremental=True each source only fetches data newer than its stored
+        watermark; `days` then only applies to pairs that have none yet.
+        Watermarks only advance for currencies that passed validation.
+
+        With a run id (or settings.PIPELINE_RUN_ID) every finished stage -
+        each fetch, the processed batch, each currency's validation and the
+        write - is checkpointed in the local run state store. Retrying the
+        same run id skips what already finished; a completed run's
+        checkpoints are removed. The later stages are keyed by a digest of
+        the batch they were built from, so a fetch that is redone on retry
+        invalidates them instead of being dropped.
+        """
+        run_id = run_id or settings.PIPELINE_RUN_ID
         self.metrics.start_collection()
+        retries_before = self._total_retries()  # source health counters are process-wide and cumulative
+        self.error_tracker.clear()  # the pipeline outlives a run; errors are summarised per run
         
         try:
+            if run_id:
+                await self.run_state.prune_async()
+
             # Initialize database
-            self.db.init_db()
+            await self.storage.ensure_schema()
 
             # Determine which sources to collect from
             if not sources:
                 sources = ['coingecko']  # Default to CoinGecko if no sources specified
             
-            # Collect data from all specified sources
-            all_raw_records = []
-            for source in sources:
-                if source not in self.collectors:
-                    logger.warning(f"Unknown source: {source}")
-                    continue
-                
-                source_records = await self.collect_from_source(
-                    source, 
-                    days=days,
-                    rpa_config=rpa_config if source == 'rpa' else None
+            watermarks = await self.storage.get_watermarks() if incremental else {}
+
+            # Collect data from all specified sources; fetches a previous attempt of this run finished are not repeated
+            if concurrent:
+                raw_batch = await self.collect_concurrently(
+                    sources, days=days, rpa_config=rpa_config, watermarks=watermarks, run_id=run_id
                 )
-                all_raw_records.extend(source_records)
+            else:
+                source_batches = []
+                for source in sources:
+                    if source not in self.collectors:
+                        logger.warning(f"Unknown source: {source}")
+                        continue
+                    
+                    source_batch = await self.collect_from_source(
+                        source, 
+                        days=days,
+                        rpa_config=rpa_config if source == 'rpa' else None,
+                        watermarks=watermarks,
+                        run_id=run_id
+                    )
+                    source_batches.append(source_batch)
+                raw_batch = PriceBatch.concat(source_batches)
 
-            if not all_raw_records:
+            if not len(raw_batch):
+                if incremental and watermarks:
+                    # Nothing newer than the stored watermarks yet
+                    logger.info("No new data since last collection")
+                    self.metrics.end_collection(records=0)
+                    if run_id:
+                        await self.run_state.clear_async(run_id)
+                    return raw_batch
                 raise CollectionError("No data collected from any source")
 
             # Process data
+            RECORDS_TOTAL.inc(len(raw_batch), stage='collect')
+
+            async def process() -> PriceBatch:
+                with STAGE_SECONDS.time(stage='process'):
+                    return self.processor.process_batch(raw_batch)
+
             try:
-                processed_data = self.processor.process_records(all_raw_records)
+                processed_data = await self._checkpointed(run_id, f"all:{raw_batch.digest()}", 'processed', process)
             except Exception as e:
-                self.error_tracker.record_error('processing', e, {'records': len(all_raw_records)})
+                self.error_tracker.record_error('processing', e, {'records': len(raw_batch)})
                 raise
 
+            currency_batches = {
+                currency: processed_data.for_currency(currency)
+                for currency in settings.SUPPORTED_CURRENCIES
+            }
+
+            # Currencies a previous attempt of this run already checked, with the same data
+            digests = {currency: batch.digest() for currency, batch in currency_batches.items()}
+            checked = set()
+            invalid = set()  # stored unless validation is strict, but they don't advance watermarks
+            if run_id:
+                for currency in currency_batches:
+                    state = await self.run_state.get_async(run_id, currency, 'validated')
+                    if state is None:
+                        continue
+                    digest, valid = state.decode().split(',')
+                    if digest == digests[currency]:
+                        checked.add(currency)
+                        if valid == '0':
+                            invalid.add(currency)
+
             # Data Quality Checks
             quality_issues = False
-            for currency in settings.SUPPORTED_CURRENCIES:
-                currency_data = [r for r in processed_data if r.currency == currency]
-                if not currency_data:
+            for currency, currency_data in currency_batches.items():
+                if not len(currency_data) or currency in checked:
                     continue
-
-                prices = [r.price for r in currency_data]
-                timestamps = [r.price_timestamp for r in currency_data]
-                
-                # Run quality checks
-                quality_report = self.quality_validator.validate_price_data(
-                    prices=prices,
-                    timestamps=timestamps
-                )
-
-                # Store quality results
-                with self.db.get_session() as session:
-                    for check in quality_report.checks:
-                        result = QualityCheckResult(
-                            timestamp=quality_report.timestamp,
-                            source=f"btc_price_{currency}",
-                            check_name=check.name,
-                            passed=check.passed,
-                            message=check.message,
-                            details=serialize_for_json(check.details) if check.details else None
-                        )
-                        session.add(result)
-                    session.commit()
-
-                # Log quality issues
-                if not quality_report.passed:
+                if not self._check_quality(currency, currency_data):
                     quality_issues = True
-                    logger.warning(f"Quality issues found for {currency}: {quality_report.summary}")
-                    for check in quality_report.checks:
-                        if not check.passed:
-                            logger.warning(f"Failed check: {check.message}")
-                            self.error_tracker.record_error(
-                                'quality',
-                                ValueError(check.message),
-                                {'currency': currency, 'check': check.name}
-                            )
             
             # Validate data before storage
             validation_errors = False
-            for currency in settings.SUPPORTED_CURRENCIES:
-                currency_data = [r for r in processed_data if r.currency == currency]
-                if not currency_data:
+            for currency, currency_data in currency_batches.items():
+                if currency in checked:
+                    continue
+                if not len(currency_data):
+                    invalid.add(currency)
                     self.error_tracker.record_error(
                         'validation', 
                         ValueError(f"No data for {currency}"),
@@ -132,11 +210,11 @@ class BTCPipeline:
                         validation_errors = True
                     continue
 
-                prices = [r.price for r in currency_data]
-                timestamps = [r.price_timestamp for r in currency_data]
-                validation_result = self.validator.validate_price_data(prices, timestamps)
+                with STAGE_SECONDS.time(stage='validate'):
+                    validation_result = self.validator.validate_batch(currency_data)
 
                 if not validation_result.is_valid:
+                    invalid.add(currency)
                     if self.strict_validation:  # Only raise if strict
                         validation_errors = True
                     self.error_tracker.record_error(
@@ -151,43 +229,41 @@ class BTCPipeline:
             if validation_errors and self.strict_validation:
                 logger.error("Validation failed and strict validation is enabled")
                 raise ValueError("Data validation failed")
+            if run_id:
+                for currency in currency_batches.keys() - checked:
+                    valid = '0' if currency in invalid else '1'
+                    await self.run_state.put_async(run_id, currency, 'validated', f"{digests[currency]},{valid}".encode())
 
             # Store data
-            with self.db.get_session() as session:
-                try:
-                    stmt = pg_insert(BTCPrice.__table__).values(
-                        [
-                            {
-                                'price': record.price,
-                                'currency': record.currency,
-                                'price_timestamp': record.price_timestamp.isoformat(),
-                                'collected_at': record.collected_at.isoformat()
-                            }
-                            for record in processed_data
-                        ]
-                    ).on_conflict_do_nothing(
-                        index_elements=['price_timestamp', 'currency']
-                    )
-
-                    result = session.execute(stmt)
-                    session.commit()
-
-                    total_records = len(processed_data)
-                    inserted_records = result.rowcount
-                    skipped_records = total_records - inserted_records
+            try:
+                write_window = f"all:{processed_data.digest()}"
+                written = await self.run_state.get_async(run_id, write_window, 'written') if run_id else None
+                if written is not None:
+                    inserted_records, skipped_records = map(int, written.decode().split(','))
+                    logger.info(f"Run {run_id}: data already stored by a previous attempt")
+                else:
+                    with STAGE_SECONDS.time(stage='store'):
+                        inserted_records, skipped_records = await self.storage.write_prices(processed_data)
+                        # Only from raw rows that were stored, so nothing dropped on the way is skipped next time
+                        stored = self.processor.stored_rows(raw_batch, processed_data)
+                        for currency in invalid:
+                            stored &= raw_batch.currencies != CURRENCIES.code(currency)
+                        await self.storage.update_watermarks(self._collection_watermarks(raw_batch.take(stored)))
+                    ROWS_WRITTEN.inc(inserted_records, outcome='inserted')
+                    ROWS_WRITTEN.inc(skipped_records, outcome='skipped')
+                    if run_id:
+                        await self.run_state.put_async(run_id, write_window, 'written', f"{inserted_records},{skipped_records}".encode())
 
-                    logger.info(f"Total records processed: {total_records}")
-                    logger.info(f"New records inserted: {inserted_records}")
-                    logger.info(f"Duplicate records skipped: {skipped_records}")
+                logger.info(f"Total records processed: {len(processed_data)}")
+                logger.info(f"New records inserted: {inserted_records}")
+                logger.info(f"Duplicate records skipped: {skipped_records}")
 
-                except IntegrityError as e:
-                    session.rollback()
-                    logger.error(f"Database integrity error: {e}")
-                    raise
-                except Exception as e:
-                    session.rollback()
-                    logger.error(f"Database error: {e}")
-                    raise
+            except IntegrityError as e:
+                logger.error(f"Database integrity error: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Database error: {e}")
+                raise
 
             # Log error summary
             error_summary = self.error_tracker.get_error_summary()
@@ -195,44 +271,282 @@ class BTCPipeline:
                 logger.warning(f"Pipeline errors: {error_summary}")
             
             # Record metrics
-            total_retries = sum(
-                getattr(collector, 'retries', 0) 
-                for collector in self.collectors.values()
-            )
             self.metrics.end_collection(
                 records=len(processed_data),
-                retries=total_retries
+                retries=self._total_retries() - retries_before
             )
 
+            RECORDS_TOTAL.inc(len(processed_data), stage='store')
+            RUNS_TOTAL.inc(pipeline='btc', status='success')
             if self.metrics.current_run:
                 duration = (self.metrics.current_run.end_time - self.metrics.current_run.start_time).total_seconds()
+                if duration > 0:
+                    RECORDS_PER_SECOND.set(len(processed_data) / duration, pipeline='btc')
                 logger.info(f"""Collection Metrics:
 ------------------
 Records collected: {self.metrics.current_run.records_collected}
 Retries: {self.metrics.current_run.retries}
+Rate limit wait: {rate_limiters.total_wait():.2f} seconds (process total)
+Source health: {self._health_summary()}
+Response cache: {response_cache.stats()}
+Quality results: {self.quality_writer.stats()}
 Duration: {duration:.2f} seconds
 Start time: {self.metrics.current_run.start_time}
 End time: {self.metrics.current_run.end_time}""")
-     
+
+            if run_id:
+                await self.run_state.clear_async(run_id)
             return processed_data
         except Exception as e:
+            RUNS_TOTAL.inc(pipeline='btc', status='failure')
             self.metrics.end_collection(errors=1)
             self.error_tracker.record_error('pipeline', e)
             logger.error(f"Pipeline error: {e}")
             raise
 
-    async def collect_from_source(self, source: str, days: int = 14, rpa_config: Dict = None) -> List[BTCPrice]:
+    async def run_streaming(self, start: datetime, end: datetime, sources: List[str] = None,
+                            interval: str = '1h', currencies: Optional[List[str]] = None) -> StreamingStats:
+        """
+        Streaming mode: collect -> process/validate -> write, connected by bounded queues.
+
+        Every (source, currency) is fetched window by window through
+        PriceCollector.iter_windows(). At most settings.PIPELINE_QUEUE_SIZE
+        batches wait between two stages, so memory stays flat however long the
+        range is, and each batch is committed as soon as it is validated.
+        Validation state is kept per (source, currency), so gaps and jumps
+        across batch boundaries are still reported. Data quality checks run
+        and are recorded per batch. Batches hold one source, so no consensus
+        is computed in this mode.
+        """
+        began = time.monotonic()
+        stats = StreamingStats()
+        self.error_tracker.clear()
+        sources = sources or ['coingecko']
+        currencies = currencies or settings.SUPPORTED_CURRENCIES
+        await self.storage.ensure_schema()
+
+        collected: asyncio.Queue = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        validated: asyncio.Queue = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        states: Dict[Tuple[str, str], ValidationState] = {}
+
+        async def collect(source: str, currency: str):
+            try:
+                async for batch in self.collectors[source].iter_windows(currency, start, end, interval=interval):
+                    if len(batch):
+                        await collected.put(batch)
+            except Exception as e:
+                self.error_tracker.record_error(f'collection_{source}', e, {'currency': currency})
+                logger.error(f"Error collecting {currency} from {source}: {e}")
+
+        async def collect_all():
+            jobs = []
+            for source in sources:
+                collector = self.collectors.get(source)
+                if not isinstance(collector, PriceCollector):
+                    logger.warning(f"Source {source} can't stream windows, skipping")
+                    continue
+                if collector.health.is_open():
+                    logger.warning(f"Skipping {source}: circuit open")
+                    continue
+                jobs.extend(collect(source, currency) for currency in currencies)
+            await asyncio.gather(*jobs)
+            await collected.put(None)
+
+        async def validate():
+            while (batch := await collected.get()) is not None:
+                stats.rows_fetched += len(batch)
+                RECORDS_TOTAL.inc(len(batch), stage='collect')
+                with STAGE_SECONDS.time(stage='process'):
+                    batch = self.processor.process_batch(batch)
+                key = (SOURCES.name(int(batch.sources[0])), CURRENCIES.name(int(batch.currencies[0])))
+                self._check_quality(key[1], batch)
+                with STAGE_SECONDS.time(stage='validate'):
+                    result = self.validator.validate_chunk(batch, states.setdefault(key, ValidationState()))
+                for warning in result.warnings:
+                    logger.warning(f"Validation warning for {key}: {warning}")
+                if not result.is_valid:
+                    self.error_tracker.record_error('validation', ValueError(result.errors), {'series': key})
+                    logger.warning(f"Validation issues for {key}: {result.errors}")
+                    if self.strict_validation:
+                        stats.batches_rejected += 1
+                        continue
+                await validated.put(batch)
+            await validated.put(None)
+
+        async def write():
+            while (batch := await validated.get()) is not None:
+                with STAGE_SECONDS.time(stage='store'):
+                    inserted, skipped = await self.storage.write_prices(batch)
+                    await self.storage.update_watermarks(batch_watermarks(batch, interval))
+                ROWS_WRITTEN.inc(inserted, outcome='inserted')
+                ROWS_WRITTEN.inc(skipped, outcome='skipped')
+                RECORDS_TOTAL.inc(len(batch), stage='store')
+                stats.batches_written += 1
+                stats.rows_inserted += inserted
+                if stats.first_write_seconds is None:
+                    stats.first_write_seconds = time.monotonic() - began
+
+        tasks = [asyncio.create_task(stage()) for stage in (collect_all, validate, write)]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            RUNS_TOTAL.inc(pipeline='btc_streaming', status='failure')
+            self.error_tracker.record_error('pipeline', e)
+            logger.error(f"Streaming pipeline error: {e}")
+            raise
+        finally:
+            # A failing stage would leave the others blocked on a queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for key, state in states.items():
+            result = self.validator.finish(state)
+            if not result.is_valid:
+                self.error_tracker.record_error('validation', ValueError(result.errors), {'series': key})
+                logger.warning(f"Validation issues for {key}: {result.errors}")
+
+        logger.info(
+            f"Streaming run complete: {stats.batches_written} batches, "
+            f"{stats.rows_inserted}/{stats.rows_fetched} rows inserted, {stats.batches_rejected} batches rejected"
+        )
+        RUNS_TOTAL.inc(pipeline='btc_streaming', status='success')
+        return stats
+
+    def _check_quality(self, currency: str, batch: PriceBatch) -> bool:
+        """Run the data quality checks on one currency's batch and store the results in the background"""
+        with STAGE_SECONDS.time(stage='quality'):
+            quality_report = self.quality_validator.validate_batch(batch)
+            self.quality_writer.submit(quality_report, source=f"btc_price_{currency}")
+
+        if not quality_report.passed:
+            logger.warning(f"Quality issues found for {currency}: {quality_report.summary}")
+            for check in quality_report.checks:
+                if not check.passed:
+                    logger.warning(f"Failed check: {check.message}")
+                    self.error_tracker.record_error(
+                        'quality',
+                        ValueError(check.message),
+                        {'currency': currency, 'check': check.name}
+                    )
+        return quality_report.passed
+
+    def _collection_watermarks(self, batch: PriceBatch) -> Dict[WatermarkKey, datetime]:
+        """Watermarks stored rows advance, under the interval their source's fetch_currency() returns"""
+        return {
+            (source, currency, self.collectors[source].interval): timestamp
+            for (source, currency), timestamp in batch.latest_by_key().items()
+            if isinstance(self.collectors.get(source), PriceCollector)
+        }
+
+    def _total_retries(self) -> int:
+        return sum(getattr(collector, 'retries', 0) for collector in self.collectors.values())
+
+    def _health_summary(self) -> str:
+        parts = []
+        for source, collector in self.collectors.items():
+            stats = collector.health.stats()
+            p95 = f"{stats['p95']:.2f}s" if stats['p95'] is not None else "n/a"
+            parts.append(f"{source} {stats['state']} p95={p95} errors={stats['error_rate']:.0%} limit={stats['limit']}")
+        return ", ".join(parts)
+
+    async def close(self):
+        """Write pending quality results and release collector resources (shared HTTP session, browsers)"""
+        await self.quality_writer.close()
+        for collector in self.collectors.values():
+            await collector.cleanup()
+
+    async def collect_concurrently(self, sources: List[str], days: int = 14, rpa_config: Dict = None,
+                                   watermarks: Dict[WatermarkKey, datetime] = None,
+                                   run_id: Optional[str] = None) -> PriceBatch:
+        """
+        Fetch every (source, currency) pair at the same time.
+
+        At most settings.MAX_CONCURRENT_REQUESTS fetches are in flight; each
+        collector's rate limiter and source health limit still apply per exchange,
+        and sources whose circuit is open are skipped.
+        A failing fetch is recorded and skipped without cancelling the others.
+        """
+        watermarks = watermarks or {}
+        semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(source: str, currency: str) -> PriceBatch:
+            async with semaphore:
+                with STAGE_SECONDS.time(stage='collect', source=source):
+                    return await self.collectors[source].fetch_currency(
+                        currency, days=days, since=watermarks.get((source, currency, self.collectors[source].interval))
+                    )
+
+        async def fetch_other(source: str) -> PriceBatch:
+            async with semaphore:
+                return await self.collect_from_source(
+                    source,
+                    days=days,
+                    rpa_config=rpa_config if source == 'rpa' else None,
+                    run_id=run_id
+                )
+
+        jobs = []
+        for source in sources:
+            collector = self.collectors.get(source)
+            if collector is None:
+                logger.warning(f"Unknown source: {source}")
+                continue
+            if collector.health.is_open():
+                logger.warning(f"Skipping {source}: circuit open")
+                continue
+            if isinstance(collector, PriceCollector):
+                for currency in settings.SUPPORTED_CURRENCIES:
+                    job = self._checkpointed(
+                        run_id, f"{source}:{currency}", 'raw',
+                        lambda source=source, currency=currency: fetch(source, currency)
+                    )
+                    jobs.append(((source, currency), job))
+            else:
+                jobs.append(((source, None), fetch_other(source)))
+
+        results = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+        batches = []
+        for ((source, currency), _), result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                self.error_tracker.record_error(
+                    f'collection_{source}', result, {'days': days, 'currency': currency}
+                )
+                logger.error(f"Error collecting {currency} from {source}: {result}")
+                continue
+            batches.append(result)
+        return PriceBatch.concat(batches)
+
+    async def collect_from_source(self, source: str, days: int = 14, rpa_config: Dict = None,
+                                  watermarks: Dict[WatermarkKey, datetime] = None,
+                                  run_id: Optional[str] = None) -> PriceBatch:
         """Collect data from a specific source with error handling"""
         try:
             collector = self.collectors[source]
+            if collector.health.is_open():
+                logger.warning(f"Skipping {source}: circuit open")
+                return PriceBatch.empty()
             if source == 'rpa':
                 if not rpa_config:
                     raise ValueError("RPA collector requires configuration")
-                raw_records = await collector.collect(config=rpa_config)
+                async def collect_rpa() -> PriceBatch:
+                    with STAGE_SECONDS.time(stage='collect', source=source):
+                        raw_records = await collector.collect(config=rpa_config)
+                    # Only records that carry a price end up in the batch
+                    return self.processor.process_records(raw_records)
+                return await self._checkpointed(run_id, source, 'raw', collect_rpa)
             else:
-                raw_records = await collector.collectBTC(days=days)
-            return raw_records
+                source_watermarks = {
+                    currency: timestamp
+                    for (watermark_source, currency, interval), timestamp in (watermarks or {}).items()
+                    if watermark_source == source and interval == collector.interval
+                }
+                async def collect_prices() -> PriceBatch:
+                    with STAGE_SECONDS.time(stage='collect', source=source):
+                        return await collector.collectBTC(days=days, watermarks=source_watermarks)
+                return await self._checkpointed(run_id, source, 'raw', collect_prices)
         except Exception as e:
                 self.error_tracker.record_error(f'collection_{source}', e, {'days': days})
                 logger.error(f"Error collecting from {source}: {str(e)}")
-                return []
\ No newline at end of file
+                return PriceBatch.empty()
\ No newline at end of file
@@ -3,20 +3,20 @@
 from typing import List
 from src.scrapers.bitcoin_news import BitcoinNewsScrapper
 from src.storage.models import BitcoinNews
-from src.storage.database import DatabaseManager
+from src.storage.registry import databases
 from src.utils.logger import logger
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 class BitcoinNewsPipeline:
     def __init__(self):
         self.scraper = BitcoinNewsScrapper()
-        self.db = DatabaseManager()
+        self.storage = databases.get_backend()
+        self.db = self.storage.db
     
     async def run(self) -> List[BitcoinNews]:
         try:
             # Initialize database
-            self.db.init_db()
+            await self.storage.ensure_schema()
             
             # Scrape news
             news_items = await self.scraper.scrape()
@@ -34,19 +34,14 @@ class BitcoinNewsPipeline:
                     'collected_at': datetime.now()
                 })
 
-            # Store in database
-            with self.db.get_session() as session:
-                # Use upsert to avoid duplicates
-                stmt = pg_insert(BitcoinNews.__table__).values(
-                    db_items
-                ).on_conflict_do_nothing(
-                    index_elements=['title', 'published_at']
-                )
-
-                result = session.execute(stmt)
-                session.commit()
-                logger.info(f"Stored {result.rowcount} new articles")
+            # Store in database, skipping articles we already have
+            inserted, skipped = await self.storage.write_news(db_items)
+            logger.info(f"Stored {inserted} new articles ({skipped} already stored)")
             return db_items
         except Exception as e:
             logger.error(f"News pipeline error: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def close(self):
+        """Release scraper resources (shared HTTP session)"""
+        await self.scraper.cleanup()
\ No newline at end of file
@@ -0,0 +1,60 @@
+# src/pipelines/stream_pipeline.py
+import asyncio
+from typing import Dict, List, Optional
+from src.collectors.btc_collector import BinanceCollector, KrakenCollector
+from src.collectors.price_batch import PriceBatch
+from src.collectors.stream_collector import BaseStreamCollector, BinanceStreamCollector, KrakenStreamCollector
+from src.processors.btc_processor import BTCProcessor
+from src.storage.registry import databases
+from src.storage.watermarks import batch_watermarks
+from src.config.settings import settings
+from src.utils.logger import logger
+
+class StreamPipeline:
+    """
+    Runs WebSocket collectors continuously and writes their micro-batches as
+    they arrive. The REST collectors for the same exchanges fill any gaps.
+    """
+    def __init__(self, sources: Optional[List[str]] = None, currencies: Optional[List[str]] = None,
+                 interval: str = '1m') -> None:
+        available = {
+            'binance': (BinanceStreamCollector, BinanceCollector),
+            'kraken': (KrakenStreamCollector, KrakenCollector)
+        }
+        sources = sources or settings.STREAM_SOURCES
+        unknown = [source for source in sources if source not in available]
+        if unknown:
+            raise ValueError(f"Unknown stream sources: {unknown}")
+
+        self.collectors: Dict[str, BaseStreamCollector] = {}
+        for source in sources:
+            stream_cls, rest_cls = available[source]
+            self.collectors[source] = stream_cls(currencies=currencies, interval=interval, gap_filler=rest_cls())
+        self.interval = interval
+        self.processor = BTCProcessor()
+        self.storage = databases.get_backend()
+        self.rows_written = 0
+
+    async def write(self, batch: PriceBatch) -> None:
+        """Sink for the stream collectors"""
+        batch = self.processor.process_batch(batch)
+        inserted, _ = await self.storage.write_prices(batch)
+        await self.storage.update_watermarks(batch_watermarks(batch, self.interval))
+        self.rows_written += inserted
+        logger.debug(f"Stream batch stored: {len(batch)} rows, {inserted} new")
+
+    async def run(self) -> None:
+        """Stream until stop() is called"""
+        logger.info(f"Starting streams for {list(self.collectors)}")
+        await asyncio.gather(*(collector.stream(self.write) for collector in self.collectors.values()))
+
+    def stop(self) -> None:
+        for collector in self.collectors.values():
+            collector.stop()
+
+    async def close(self):
+        """Release collector resources (shared HTTP session)"""
+        for collector in self.collectors.values():
+            if collector.gap_filler is not None:
+                await collector.gap_filler.cleanup()
+            await collector.cleanup()
@@ -1,28 +1,88 @@
 # src/processors/btc_processor.py
-from typing import List
+from typing import List, Optional
+import numpy as np
 from src.collectors.base import DataRecord
-from src.storage.models import BTCPrice
+from src.collectors.price_batch import PriceBatch, CURRENCIES, SOURCES, to_ms
+from src.utils.logger import logger
+from .consensus import ConsensusEngine
 
 class BTCProcessor:
-    def process_records(self, records: List[DataRecord]) -> List[BTCPrice]:
-        """Converts DataRecords to BTCPrice database models"""
-        processed = []
-        for record in records:
-            # Here we could add business logic like:
-            # - Currency conversion
-            # - Data validation
-            # - Calculating additional metrics
-            # - Filtering unwanted data
-            price_data = {
-                f"price_{record.data['currency']}": record.data["price"]
-            }
-            processed.append(
-                BTCPrice(
-                    price=record.data['price'],
-                    currency=record.data['currency'],
-                    price_timestamp=record.data['timestamp'],
-                    collected_at=record.timestamp
-                )
+    def __init__(self, consensus: Optional[ConsensusEngine] = None) -> None:
+        self.consensus = consensus
+        self.duplicates_dropped = 0
+
+    def process_batch(self, batch: PriceBatch) -> PriceBatch:
+        """
+        Prepare a collected batch for validation and storage.
+
+        With a consensus engine, a batch mixing several sources is first
+        reconciled into one consensus row per bucket and currency.
+        Rows are sorted by (timestamp, currency) in a single pass and only the
+        first row per key is kept (the unique key of btc_prices), so sources that
+        overlap and re-fetched windows never reach the database as duplicates.
+        When sources disagree, the one listed first in the batch wins, which is
+        also the row the database would have kept. The input is not modified.
+        """
+        if not len(batch):
+            return batch
+        if self.consensus is not None and np.any(batch.sources != batch.sources[0]):
+            batch = self.consensus.reconcile(batch)
+
+        # Timestamps are UTC epoch ms (see PriceBatch); one int64 key per row packs the currency code too
+        timestamps = np.asarray(batch.timestamps, dtype=np.int64)
+        keys = timestamps << 8 | batch.currencies.astype(np.int64)
+
+        if len(keys) == 1 or np.all(keys[1:] > keys[:-1]):
+            # Already sorted and unique: just make sure the columns are contiguous
+            return PriceBatch(
+                timestamps=np.ascontiguousarray(timestamps),
+                prices=np.ascontiguousarray(batch.prices, dtype=np.float64),
+                currencies=np.ascontiguousarray(batch.currencies, dtype=np.uint8),
+                sources=np.ascontiguousarray(batch.sources, dtype=np.uint8),
+                collected_at=batch.collected_at,
+                volumes=batch.volumes,
+                spreads=batch.spreads,
+                source_counts=batch.source_counts
             )
-        
-        return processed
\ No newline at end of file
+
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        first = np.empty(len(order), dtype=bool)
+        first[0] = True
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=first[1:])
+        selected = order[first]
+
+        dropped = len(batch) - len(selected)
+        if dropped:
+            self.duplicates_dropped += dropped
+            logger.debug(f"Dropped {dropped} duplicate (timestamp, currency) rows")
+
+        # Fancy indexing copies, so every column comes out contiguous
+        return batch.take(selected)
+
+    def stored_rows(self, raw: PriceBatch, processed: PriceBatch) -> np.ndarray:
+        """
+        Mask of the `raw` rows that `processed` (the output of process_batch(raw)
+        or a part of it) still carries: the row itself, or a duplicate of its
+        (timestamp, currency), or for consensus output the bucket it fell in.
+        """
+        timestamps = np.asarray(raw.timestamps, dtype=np.int64)
+        if self.consensus is not None and len(processed) and np.all(processed.sources == self.consensus.source_code):
+            timestamps = timestamps // self.consensus.interval_ms * self.consensus.interval_ms
+        raw_keys = timestamps << 8 | raw.currencies.astype(np.int64)
+        processed_keys = np.asarray(processed.timestamps, dtype=np.int64) << 8 | processed.currencies.astype(np.int64)
+        return np.isin(raw_keys, processed_keys)
+
+    def process_records(self, records: List[DataRecord]) -> PriceBatch:
+        """Converts price DataRecords (legacy row format) into a PriceBatch"""
+        records = [record for record in records if 'price' in record.data]
+        size = len(records)
+        batch = PriceBatch(
+            timestamps=np.fromiter((to_ms(r.data['timestamp']) for r in records), dtype=np.int64, count=size),
+            prices=np.fromiter((r.data['price'] for r in records), dtype=np.float64, count=size),
+            currencies=np.fromiter((CURRENCIES.code(r.data['currency']) for r in records), dtype=np.uint8, count=size),
+            sources=np.fromiter((SOURCES.code(r.source) for r in records), dtype=np.uint8, count=size)
+        )
+        if records:
+            batch.collected_at = max(to_ms(r.timestamp) for r in records)
+        return self.process_batch(batch)
@@ -0,0 +1,91 @@
+# src/processors/consensus.py
+from typing import Optional
+import numpy as np
+from src.collectors.price_batch import PriceBatch, SOURCES
+from src.utils.intervals import INTERVAL_SECONDS
+
+class ConsensusEngine:
+    """
+    Reconciles prices from several sources into one row per (bucket, currency).
+
+    Each currency's timeline is cut into `interval` buckets. For every bucket
+    that has data, each source contributes its latest observation at or
+    before the bucket's end, if that observation is no older than
+    `tolerance` (an as-of join done with np.searchsorted). The consensus is
+    the median of those prices, or with method='vwap' their volume-weighted
+    mean. VWAP falls back to the median for buckets where no source reports
+    volume. Spread (max - min) and the number of contributing sources are
+    kept alongside.
+    """
+    METHODS = ('median', 'vwap')
+
+    def __init__(self, interval: str = '5m', method: str = 'median',
+                 tolerance: Optional[str] = None, min_sources: int = 1) -> None:
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown consensus method: {method}")
+        self.interval_ms = INTERVAL_SECONDS[interval] * 1000
+        self.tolerance_ms = INTERVAL_SECONDS[tolerance or interval] * 1000
+        self.method = method
+        self.min_sources = min_sources
+        self.source_code = SOURCES.code('consensus')
+
+    def reconcile(self, batch: PriceBatch) -> PriceBatch:
+        """Consensus rows for every currency in `batch`, sorted by (timestamp, currency)"""
+        if not len(batch):
+            return batch
+        per_currency = [
+            self._reconcile_currency(batch.take(batch.currencies == code), int(code))
+            for code in np.unique(batch.currencies)
+        ]
+        result = PriceBatch.concat(per_currency)
+        order = np.lexsort((result.currencies, result.timestamps))
+        return result.take(order)
+
+    def _reconcile_currency(self, batch: PriceBatch, currency_code: int) -> PriceBatch:
+        step = self.interval_ms
+        grid = np.unique(batch.timestamps // step * step)  # bucket starts that have data
+        bucket_ends = grid + step
+        source_codes = np.unique(batch.sources)
+
+        # One row per source, one column per bucket; NaN where a source has nothing in range
+        prices = np.full((len(source_codes), len(grid)), np.nan)
+        volumes = np.full_like(prices, np.nan)
+        for i, code in enumerate(source_codes):
+            rows = np.flatnonzero(batch.sources == code)
+            rows = rows[np.argsort(batch.timestamps[rows], kind='stable')]
+            timestamps = batch.timestamps[rows]
+
+            # As-of join: last observation strictly before each bucket end
+            position = np.searchsorted(timestamps, bucket_ends, side='left') - 1
+            found = position >= 0
+            position = np.maximum(position, 0)
+            found &= timestamps[position] >= bucket_ends - self.tolerance_ms
+
+            prices[i, found] = batch.prices[rows[position[found]]]
+            if batch.volumes is not None:
+                volumes[i, found] = batch.volumes[rows[position[found]]]
+
+        present = ~np.isnan(prices)
+        counts = present.sum(axis=0)
+        keep = counts >= self.min_sources
+        prices, volumes, present, counts, grid = prices[:, keep], volumes[:, keep], present[:, keep], counts[keep], grid[keep]
+        if not len(grid):
+            return PriceBatch.empty()
+
+        consensus = np.nanmedian(prices, axis=0)
+        if self.method == 'vwap':
+            weights = np.where(present & (volumes > 0), volumes, 0.0)
+            total = weights.sum(axis=0)
+            weighted = total > 0
+            consensus[weighted] = (np.where(present, prices, 0.0) * weights).sum(axis=0)[weighted] / total[weighted]
+
+        size = len(grid)
+        return PriceBatch(
+            timestamps=grid,
+            prices=consensus,
+            currencies=np.full(size, currency_code, dtype=np.uint8),
+            sources=np.full(size, self.source_code, dtype=np.uint8),
+            collected_at=batch.collected_at,
+            spreads=np.nanmax(prices, axis=0) - np.nanmin(prices, axis=0),
+            source_counts=counts.astype(np.uint8)
+        )
@@ -1,11 +1,12 @@
 # src/scrapers/base_scraper.py
 
-import aiohttp
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 from datetime import datetime
-from src.utils.rate_limiter import RateLimiter
+from src.utils.rate_limiter import rate_limiters, host_key
+from src.utils.http_client import http_client
+from src.utils.request_cache import response_cache, request_key
 
 class BaseScraper(ABC):
     def __init__(self, name: str) -> None:
@@ -13,13 +14,27 @@ class BaseScraper(ABC):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.rate_limiter = RateLimiter(calls_per_minute=10)
+        self.calls_per_minute = 10
+        self._http_registered = True
+        http_client.register()
     
     async def fetch_page(self, url: str) -> str:
-        await self.rate_limiter.wait_if_needed()
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            async with session.get(url) as response:
-                return await response.text()
+        # Scrapers reading the same page at the same time share one download
+        return await response_cache.get_or_fetch(request_key(url, None, 'text'), lambda: self._fetch_page(url))
+
+    async def _fetch_page(self, url: str) -> str:
+        # Budget is shared with every other scraper hitting the same host
+        rate_limiter = rate_limiters.get(host_key(url), calls_per_minute=self.calls_per_minute)
+        await rate_limiter.wait_if_needed()
+        session = await http_client.get_session()
+        async with session.get(url, headers=self.headers) as response:
+            return await response.text()
+
+    async def cleanup(self):
+        """Release the shared HTTP session"""
+        if self._http_registered:
+            self._http_registered = False
+            await http_client.release()
     
     @abstractmethod
     async def scrape(self) -> List[Dict[str, Any]]:
@@ -0,0 +1,207 @@
+# src/storage/archive.py
+"""
+Parquet cold storage for btc_prices.
+
+Closed time ranges are exported to
+
+    <root>/currency=<currency>/month=<YYYY-MM>/part-<start>-<end>.parquet
+
+zstd-compressed, sorted by price_timestamp and with row-group statistics, so
+a time-range filter skips whole partitions (by month) and row groups (by
+min/max timestamp). `_archived.json` records per currency the time up to
+which rows live in the archive; read_price_history() combines the archive
+below that boundary with the hot table, which may still hold rows below it
+(a backfill that ran after the export, or an export without drop).
+"""
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.config.settings import settings
+from src.utils.logger import logger
+from .backends import HISTORY_COLUMNS, StorageBackend
+
+ARCHIVE_COLUMNS = ('price', 'price_timestamp', 'collected_at', 'spread', 'source_count')
+
+SCHEMA = pa.schema([
+    ('price', pa.float64()),
+    ('price_timestamp', pa.timestamp('ms')),
+    ('collected_at', pa.timestamp('ms')),
+    ('spread', pa.float64()),
+    ('source_count', pa.int32()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('currency', pa.string()), ('month', pa.string())]), flavor='hive')
+
+MANIFEST = '_archived.json'  # leading underscore: ignored by pyarrow.dataset
+
+def to_naive_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def month_key(timestamp: datetime) -> str:
+    return f"{timestamp.year:04d}-{timestamp.month:02d}"
+
+def month_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def next_month(timestamp: datetime) -> datetime:
+    start = month_start(timestamp)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+class PriceArchive:
+    """Partitioned Parquet files of archived btc_prices rows (timestamps are naive UTC, like the table)"""
+    def __init__(self, root: Optional[str] = None, row_group_size: Optional[int] = None) -> None:
+        self.root = root or settings.ARCHIVE_DIR
+        self.row_group_size = row_group_size or settings.ARCHIVE_ROW_GROUP_SIZE
+
+    def _partition(self, currency: str, month: str) -> str:
+        return os.path.join(self.root, f"currency={currency}", f"month={month}")
+
+    def _manifest(self) -> Dict[str, str]:
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def boundary(self, currency: str) -> Optional[datetime]:
+        """Rows of `currency` before this time are in the archive"""
+        value = self._manifest().get(currency)
+        return datetime.fromisoformat(value) if value else None
+
+    def set_boundary(self, currency: str, until: datetime) -> None:
+        manifest = self._manifest()
+        manifest[currency] = to_naive_utc(until).isoformat()
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def _write_file(self, table: pa.Table, directory: str, name: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        tmp_path = os.path.join(directory, f".{name}.tmp")  # dot prefix: invisible to readers until renamed
+        pq.write_table(table, tmp_path, compression='zstd', row_group_size=self.row_group_size,
+                       write_statistics=True)
+        os.replace(tmp_path, path)
+        return path
+
+    def write(self, currency: str, rows: pd.DataFrame, start: datetime, end: datetime) -> int:
+        """
+        Write the rows of [start, end) as one file of start's month partition.
+        The file name is derived from the range, so re-exporting it replaces
+        the file instead of duplicating rows.
+        """
+        if next_month(start) < end:
+            raise ValueError(f"Archive range {start} - {end} spans more than one month")
+        if rows.empty:
+            return 0
+        table = pa.Table.from_pandas(rows[list(ARCHIVE_COLUMNS)], schema=SCHEMA, preserve_index=False)
+        table = table.sort_by('price_timestamp')
+        name = f"part-{start:%Y%m%dT%H%M%S}-{end:%Y%m%dT%H%M%S}.parquet"
+        self._write_file(table, self._partition(currency, month_key(start)), name)
+        return table.num_rows
+
+    def merge(self, currency: str, rows: pd.DataFrame) -> int:
+        """
+        Add rows below the boundary that reached the hot table after their
+        range was exported (a backfill, say) to their month partitions.
+        Timestamps the archive already holds are skipped; returns the number
+        of rows added.
+        """
+        if rows.empty:
+            return 0
+        timestamps = rows['price_timestamp']
+        archived = self.read(currency, since=timestamps.min(), until=timestamps.max() + timedelta(milliseconds=1),
+                             columns=['price_timestamp'])
+        rows = rows[~timestamps.isin(archived['price_timestamp'])]
+        added = 0
+        for month, group in rows.groupby(rows['price_timestamp'].dt.strftime('%Y-%m')):
+            table = pa.Table.from_pandas(group[list(ARCHIVE_COLUMNS)], schema=SCHEMA, preserve_index=False)
+            table = table.sort_by('price_timestamp')
+            self._write_file(table, self._partition(currency, month), f"late-{uuid.uuid4().hex}.parquet")
+            added += table.num_rows
+        return added
+
+    def compact(self, currency: Optional[str] = None) -> int:
+        """
+        Merge every partition that holds more than one file into a single
+        file (sorted, duplicates of a timestamp dropped). Returns the number
+        of partitions compacted.
+        """
+        compacted = 0
+        if not os.path.isdir(self.root):
+            return compacted
+        currencies = [currency] if currency else [
+            entry.split('=', 1)[1] for entry in os.listdir(self.root) if entry.startswith('currency=')
+        ]
+        for name in currencies:
+            currency_dir = os.path.join(self.root, f"currency={name}")
+            if not os.path.isdir(currency_dir):
+                continue
+            for month_dir in sorted(os.listdir(currency_dir)):
+                directory = os.path.join(currency_dir, month_dir)
+                files = sorted(
+                    os.path.join(directory, entry) for entry in os.listdir(directory)
+                    if entry.endswith('.parquet') and not entry.startswith(('.', '_'))
+                )
+                if len(files) < 2:
+                    continue
+                table = pa.concat_tables(pq.read_table(path, schema=SCHEMA) for path in files)
+                frame = table.to_pandas().drop_duplicates('price_timestamp', keep='last')
+                table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False).sort_by('price_timestamp')
+                self._write_file(table, directory, f"compacted-{uuid.uuid4().hex}.parquet")
+                for path in files:
+                    os.remove(path)
+                compacted += 1
+                logger.info(f"Compacted {len(files)} archive files in {directory} ({table.num_rows} rows)")
+        return compacted
+
+    def read(self, currency: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+             columns: Sequence[str] = HISTORY_COLUMNS) -> pd.DataFrame:
+        """Archived rows of `currency` in [since, until), oldest first"""
+        if not os.path.isdir(os.path.join(self.root, f"currency={currency}")):
+            return pd.DataFrame(columns=list(columns))
+        dataset = ds.dataset(self.root, format='parquet', partitioning=PARTITIONING)
+        # Partition pruning on month, row-group pruning on the timestamp statistics
+        condition = ds.field('currency') == currency
+        if since is not None:
+            since = to_naive_utc(since)
+            condition &= (ds.field('month') >= month_key(since)) & (
+                ds.field('price_timestamp') >= pa.scalar(since, type=pa.timestamp('ms'))
+            )
+        if until is not None:
+            until = to_naive_utc(until)
+            condition &= (ds.field('month') <= month_key(until)) & (
+                ds.field('price_timestamp') < pa.scalar(until, type=pa.timestamp('ms'))
+            )
+        table = dataset.to_table(columns=list(columns), filter=condition)
+        return table.sort_by('price_timestamp').to_pandas()
+
+def read_price_history(storage: StorageBackend, archive: Optional[PriceArchive], currency: str,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Price history from the archive below its boundary and from the hot table.
+    Rows left in the hot table below the boundary are included too; where
+    both tiers hold a timestamp, the hot row wins.
+    """
+    boundary = archive.boundary(currency) if archive is not None else None
+    if boundary is None or (since is not None and since >= boundary):
+        return storage.read_prices(currency, since=since, until=until)
+
+    frames: List[pd.DataFrame] = [
+        archive.read(currency, since=since, until=boundary if until is None else min(until, boundary)),
+        storage.read_prices(currency, since=since, until=until)
+    ]
+    frames = [frame for frame in frames if not frame.empty] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    history = pd.concat(frames, ignore_index=True).drop_duplicates('price_timestamp', keep='last')
+    return history.sort_values('price_timestamp', kind='stable', ignore_index=True)
@@ -0,0 +1,101 @@
+# src/storage/async_database.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from .models import Base
+from ..config.settings import settings
+from ..utils.logger import logger
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with the asyncpg driver (asyncpg takes SSL as a connect arg, not sslmode)"""
+    parsed = make_url(url)
+    return parsed.set(drivername='postgresql+asyncpg').difference_update_query(['sslmode']).render_as_string(
+        hide_password=False
+    )
+
+class AsyncDatabaseManager:
+    """
+    asyncpg-backed counterpart of DatabaseManager for code running on the
+    event loop. The engine is created on first use, so constructing a manager
+    doesn't need the driver (or a loop) yet. Pooled asyncpg connections belong
+    to the loop that opened them, so a new loop gets a new engine.
+    """
+    def __init__(self):
+        if not settings.DATABASE_URL:
+            raise ValueError("DATABASE_URL not found in environment variables")
+        self.url = async_database_url(settings.DATABASE_URL)
+        self._engine: Optional[AsyncEngine] = None
+        self._Session: Optional[async_sessionmaker] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.schema_ready = False
+
+    def _current(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._engine is None or (loop is not None and loop is not self._loop):
+            self._create_engine()
+            self._loop = loop
+
+    def _create_engine(self) -> None:
+        self._engine = create_async_engine(
+            self.url,
+            connect_args={'ssl': settings.DB_SSLMODE} if settings.DB_SSLMODE else {},
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            echo=settings.SQL_ECHO
+        )
+        self._Session = async_sessionmaker(self._engine, expire_on_commit=False)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self._current()
+        return self._engine
+
+    @property
+    def Session(self) -> async_sessionmaker:
+        self._current()
+        return self._Session
+
+    async def init_db(self):
+        """Initialize the database by creating all tables"""
+        try:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            logger.info("Database initialization completed")
+        except Exception as e:
+            logger.error(f"Error initializing database: {e}")
+            raise
+
+    async def ensure_schema(self):
+        """init_db() once per process; a no-op when DB_CREATE_SCHEMA is off and Alembic manages tables"""
+        if not self.schema_ready:
+            if settings.DB_CREATE_SCHEMA:
+                await self.init_db()
+            self.schema_ready = True
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """Get an async database session with automatic cleanup"""
+        session = self.Session()
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def dispose(self):
+        """Close pooled connections (they belong to the loop that opened them)"""
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._Session = None
+            self._loop = None
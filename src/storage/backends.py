@@ -0,0 +1,110 @@
+# src/storage/backends.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+from src.collectors.price_batch import PriceBatch
+from .async_database import AsyncDatabaseManager
+from .database import DatabaseManager
+from .models import BTCPrice
+from .news_writer import NewsWriter
+from .price_writer import PriceWriter
+from .quality_storage import QualityCheckResult
+from .watermarks import WatermarkKey, WatermarkStore
+
+HISTORY_COLUMNS = ('price', 'price_timestamp', 'currency')
+
+class StorageBackend(ABC):
+    """
+    What the pipelines need from a store. Writes skip rows that already exist
+    (btc_prices by (price_timestamp, currency), bitcoin_news by (title,
+    published_at)) and return (inserted, skipped); watermarks only move
+    forward. `db` is a sync DatabaseManager for analysis queries and tests.
+    """
+    name: str
+    db: DatabaseManager
+
+    @abstractmethod
+    async def ensure_schema(self) -> None:
+        ...
+
+    @abstractmethod
+    async def write_prices(self, batch: PriceBatch) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def write_news(self, items: List[Dict]) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def write_quality(self, rows: List[Dict]) -> None:
+        """Insert quality_checks rows (see quality_writer.quality_rows)"""
+
+    @abstractmethod
+    async def get_watermarks(self) -> Dict[WatermarkKey, datetime]:
+        ...
+
+    @abstractmethod
+    async def update_watermarks(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        ...
+
+    def _in_range(self, query, currency: str, since: Optional[datetime], until: Optional[datetime]):
+        query = query.where(BTCPrice.currency == currency)
+        if since is not None:
+            query = query.where(BTCPrice.price_timestamp >= since)
+        if until is not None:
+            query = query.where(BTCPrice.price_timestamp < until)
+        return query
+
+    def read_prices(self, currency: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    columns: Sequence[str] = HISTORY_COLUMNS) -> pd.DataFrame:
+        """btc_prices rows for `currency` in [since, until), oldest first"""
+        query = self._in_range(select(*(BTCPrice.__table__.c[name] for name in columns)), currency, since, until)
+        return pd.read_sql(query.order_by(BTCPrice.price_timestamp), self.db.engine)
+
+    def oldest_price_time(self, currency: str) -> Optional[datetime]:
+        with self.db.engine.connect() as connection:
+            return connection.execute(
+                select(func.min(BTCPrice.price_timestamp)).where(BTCPrice.currency == currency)
+            ).scalar()
+
+    def delete_prices(self, currency: str, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> int:
+        """Delete btc_prices rows for `currency` in [since, until); returns the number deleted"""
+        with self.db.engine.begin() as connection:
+            return connection.execute(self._in_range(delete(BTCPrice), currency, since, until)).rowcount
+
+    async def dispose(self) -> None:
+        pass
+
+class PostgresBackend(StorageBackend):
+    """Postgres through the shared engines: binary COPY into staging tables for the bulk writes"""
+    name = 'postgres'
+
+    def __init__(self, db: DatabaseManager, async_db: AsyncDatabaseManager) -> None:
+        self.db = db
+        self.async_db = async_db
+        self.prices = PriceWriter(db, async_db=async_db)
+        self.news = NewsWriter(db, async_db=async_db)
+        self.watermarks = WatermarkStore(db, async_db)
+
+    async def ensure_schema(self) -> None:
+        await self.async_db.ensure_schema()
+
+    async def write_prices(self, batch: PriceBatch) -> Tuple[int, int]:
+        return await self.prices.write_async(batch)
+
+    async def write_news(self, items: List[Dict]) -> Tuple[int, int]:
+        return await self.news.write_async(items)
+
+    async def write_quality(self, rows: List[Dict]) -> None:
+        async with self.async_db.get_session() as session:
+            await session.execute(insert(QualityCheckResult.__table__), rows)
+            await session.commit()
+
+    async def get_watermarks(self) -> Dict[WatermarkKey, datetime]:
+        return await self.watermarks.get_all_async()
+
+    async def update_watermarks(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        await self.watermarks.update_async(watermarks)
@@ -0,0 +1,81 @@
+# src/storage/bulk_writer.py
+import io
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+from .async_database import AsyncDatabaseManager
+from .database import DatabaseManager
+from src.utils.logger import logger
+
+class StagedCopyWriter:
+    """
+    Bulk loads into `table` through a staging table.
+
+    Each chunk is streamed into the staging table with binary COPY and then
+    merged with a single INSERT ... SELECT ... ON CONFLICT DO NOTHING, in its
+    own transaction, so locks are held for one chunk at a time. The staging
+    table is a temporary table: never WAL-logged, private to the connection
+    (concurrent writers can't see each other's rows) and emptied on commit.
+    write_chunk_async() does the same over asyncpg.
+    """
+    def __init__(self, db: DatabaseManager, table: Table, conflict_columns: Sequence[str],
+                 async_db: Optional[AsyncDatabaseManager] = None) -> None:
+        self.db = db
+        self.async_db = async_db
+        self.table = table
+        self.conflict_columns = list(conflict_columns)
+        self.staging = f"{table.name}_staging"
+        self.chunk_counts: List[Tuple[int, int]] = []
+
+    def _staging_ddl(self) -> str:
+        # Same column types as the target, without keys or constraints
+        dialect = postgresql.dialect()
+        columns = ", ".join(
+            f"{column.name} {column.type.compile(dialect=dialect)}"
+            for column in self.table.columns if not column.primary_key
+        )
+        return f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging} ({columns}) ON COMMIT DELETE ROWS"
+
+    def _merge_sql(self, columns: Sequence[str]) -> str:
+        column_list = ", ".join(columns)
+        return (
+            f"INSERT INTO {self.table.name} ({column_list}) "
+            f"SELECT {column_list} FROM {self.staging} "
+            f"ON CONFLICT ({', '.join(self.conflict_columns)}) DO NOTHING"
+        )
+
+    def write_chunk(self, columns: Sequence[str], payload: bytes, rows: int) -> Tuple[int, int]:
+        """COPY one encoded chunk and merge it; returns (inserted, skipped)"""
+        with self.db.get_session() as session:
+            cursor = session.connection().connection.cursor()
+            cursor.execute(self._staging_ddl())
+            cursor.copy_expert(
+                f"COPY {self.staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+                io.BytesIO(payload)
+            )
+            cursor.execute(self._merge_sql(columns))
+            inserted = cursor.rowcount
+            session.commit()
+        return self._record(inserted, rows)
+
+    async def write_chunk_async(self, columns: Sequence[str], payload: bytes, rows: int) -> Tuple[int, int]:
+        """write_chunk() without blocking the event loop"""
+        async with self.async_db.get_session() as session:
+            connection = await session.connection()
+            raw = await connection.get_raw_connection()
+            driver = raw.driver_connection  # asyncpg.Connection
+            # SQLAlchemy's adapter only sends BEGIN for its own statements; without this each call
+            # autocommits and ON COMMIT DELETE ROWS empties the staging table before the merge
+            async with driver.transaction():
+                await driver.execute(self._staging_ddl())
+                await driver.copy_to_table(self.staging, source=io.BytesIO(payload), columns=list(columns),
+                                           format='binary')
+                status = await driver.execute(self._merge_sql(columns))  # e.g. "INSERT 0 42"
+            inserted = int(status.split()[-1])
+        return self._record(inserted, rows)
+
+    def _record(self, inserted: int, rows: int) -> Tuple[int, int]:
+        counts = (inserted, rows - inserted)
+        self.chunk_counts.append(counts)
+        logger.debug(f"{self.table.name} chunk {len(self.chunk_counts)}: {counts[0]} inserted, {counts[1]} skipped")
+        return counts
@@ -1,26 +1,28 @@
 # src/storage/database.py
 from contextlib import contextmanager
+from typing import Optional
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from .models import Base
 from ..config.settings import settings
 from ..utils.logger import logger
 
 class DatabaseManager:
-    def __init__(self):
-        # Make sure .env is loaded
-        # load_dotenv()
-        
+    def __init__(self, url: Optional[str] = None):
         # Get database URL
-        # database_url = os.getenv('DATABASE_URL')
-        if not settings.DATABASE_URL:
+        url = url or settings.DATABASE_URL
+        if not url:
             raise ValueError("DATABASE_URL not found in environment variables")
         
-        # Create engine with explicit SSL mode for Neon
+        # Explicit SSL mode for Neon; other engines (e.g. SQLite) don't take one
+        connect_args = {}
+        if make_url(url).get_backend_name() == 'postgresql' and settings.DB_SSLMODE:
+            connect_args['sslmode'] = settings.DB_SSLMODE
         self.engine = create_engine(
-            settings.DATABASE_URL,
-            connect_args={'sslmode': 'require'},
+            url,
+            connect_args=connect_args,
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_MAX_OVERFLOW,
             pool_timeout=settings.DB_POOL_TIMEOUT,
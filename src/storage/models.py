@@ -13,6 +13,9 @@ class BTCPrice(Base):
     currency = Column(String, nullable=False)
     price_timestamp = Column(DateTime, nullable=False)
     collected_at = Column(DateTime, nullable=False)
+    # Set on consensus rows: max - min price across sources and how many contributed
+    spread = Column(Float, nullable=True)
+    source_count = Column(Integer, nullable=True)
 
     # Let database handle uniqueness
     __table_args__ = (
@@ -44,3 +47,21 @@ class BitcoinNews(Base):
         Index('idx_news_source', source)
     )
 
+
+class CollectionWatermark(Base):
+    """Latest price timestamp stored per (source, currency, interval), used for incremental runs"""
+    __tablename__ = 'collection_watermarks'
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    currency = Column(String, nullable=False)
+    interval = Column(String, nullable=False, server_default='1d')  # candle interval of the writer
+    last_timestamp = Column(DateTime, nullable=False)  # UTC
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('source', 'currency', 'interval', name='unique_watermark_source_currency_interval'),
+    )
+
+    def __repr__(self):
+        return f"<CollectionWatermark(source={self.source}, currency={self.currency}, interval={self.interval}, last={self.last_timestamp})>"
@@ -0,0 +1,41 @@
+# src/storage/news_writer.py
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.config.settings import settings
+from .async_database import AsyncDatabaseManager
+from .bulk_writer import StagedCopyWriter
+from .database import DatabaseManager
+from .models import BitcoinNews
+from .pg_copy import encode_rows
+
+NEWS_COLUMNS = ['title', 'summary', 'link', 'published_at', 'source', 'collected_at']
+
+class NewsWriter:
+    """Writes scraped articles into bitcoin_news, skipping ones already stored"""
+    def __init__(self, db: DatabaseManager, chunk_size: Optional[int] = None,
+                 async_db: Optional[AsyncDatabaseManager] = None) -> None:
+        self.db = db
+        self.chunk_size = chunk_size or settings.DEFAULT_BATCH_SIZE
+        self.copy_writer = StagedCopyWriter(db, BitcoinNews.__table__, ['title', 'published_at'], async_db=async_db)
+
+    def _chunks(self, items: List[Dict]) -> Iterator[Tuple[bytes, int]]:
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            yield encode_rows([item.get(column) for column in NEWS_COLUMNS] for item in chunk), len(chunk)
+
+    def write(self, items: List[Dict]) -> Tuple[int, int]:
+        """Insert article dicts in chunks of `chunk_size`; returns total (inserted, skipped) counts"""
+        inserted = skipped = 0
+        for payload, rows in self._chunks(items):
+            chunk_inserted, chunk_skipped = self.copy_writer.write_chunk(NEWS_COLUMNS, payload, rows)
+            inserted += chunk_inserted
+            skipped += chunk_skipped
+        return inserted, skipped
+
+    async def write_async(self, items: List[Dict]) -> Tuple[int, int]:
+        """write() over the async engine"""
+        inserted = skipped = 0
+        for payload, rows in self._chunks(items):
+            chunk_inserted, chunk_skipped = await self.copy_writer.write_chunk_async(NEWS_COLUMNS, payload, rows)
+            inserted += chunk_inserted
+            skipped += chunk_skipped
+        return inserted, skipped
@@ -0,0 +1,93 @@
+# src/storage/pg_copy.py
+"""
+Encoders for PostgreSQL's binary COPY format.
+
+A binary COPY stream is a fixed header, one tuple per row (field count, then
+length-prefixed big-endian values, length -1 for NULL) and a -1 trailer. Price
+rows are encoded with NumPy record arrays, one fixed-width layout per
+currency, so no Python code runs per row.
+"""
+import struct
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Sequence
+import numpy as np
+from src.collectors.price_batch import PriceBatch, CURRENCIES
+
+HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+TRAILER = struct.pack('>h', -1)
+
+# PostgreSQL timestamps count microseconds from 2000-01-01
+PG_EPOCH_MS = 946_684_800_000
+_PG_EPOCH = datetime(2000, 1, 1)
+
+PRICE_COLUMNS = ['price', 'currency', 'price_timestamp', 'collected_at']
+CONSENSUS_COLUMNS = ['spread', 'source_count']
+
+def price_columns(batch: PriceBatch) -> List[str]:
+    """btc_prices columns a batch fills (consensus batches add spread and source_count)"""
+    return PRICE_COLUMNS + CONSENSUS_COLUMNS if batch.spreads is not None else PRICE_COLUMNS
+
+def encode_price_batch(batch: PriceBatch) -> bytes:
+    """Binary COPY payload for btc_prices rows, in the order of price_columns(batch)"""
+    consensus = batch.spreads is not None
+    collected_us = (batch.collected_at - PG_EPOCH_MS) * 1000
+    parts = [HEADER]
+    for code in np.unique(batch.currencies):
+        rows = batch.currencies == code
+        name = CURRENCIES.name(int(code)).encode('utf-8')
+        fields = [
+            ('count', '>i2'),
+            ('price_len', '>i4'), ('price', '>f8'),
+            ('currency_len', '>i4'), ('currency', f'S{len(name)}'),
+            ('timestamp_len', '>i4'), ('timestamp', '>i8'),
+            ('collected_len', '>i4'), ('collected', '>i8'),
+        ]
+        if consensus:
+            fields += [('spread_len', '>i4'), ('spread', '>f8'), ('sources_len', '>i4'), ('sources', '>i4')]
+
+        records = np.empty(int(rows.sum()), dtype=np.dtype(fields))
+        records['count'] = len(price_columns(batch))
+        records['price_len'] = 8
+        records['price'] = batch.prices[rows]
+        records['currency_len'] = len(name)
+        records['currency'] = name
+        records['timestamp_len'] = 8
+        records['timestamp'] = (batch.timestamps[rows] - PG_EPOCH_MS) * 1000
+        records['collected_len'] = 8
+        records['collected'] = collected_us
+        if consensus:
+            records['spread_len'] = 8
+            records['spread'] = batch.spreads[rows]
+            records['sources_len'] = 4
+            records['sources'] = batch.source_counts[rows]
+        parts.append(records.tobytes())
+    parts.append(TRAILER)
+    return b''.join(parts)
+
+def _encode_value(value: Any) -> bytes:
+    if value is None:
+        return struct.pack('>i', -1)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        delta = value - _PG_EPOCH
+        micros = (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+        return struct.pack('>iq', 8, micros)
+    if isinstance(value, float):
+        return struct.pack('>id', 8, value)
+    if isinstance(value, int):
+        return struct.pack('>iq', 8, value)  # int8 column
+    data = str(value).encode('utf-8')
+    return struct.pack('>i', len(data)) + data
+
+def encode_rows(rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Binary COPY payload for small row sets (text, float8, int8, timestamp and NULL).
+    Aware datetimes are converted to naive UTC.
+    """
+    parts = [HEADER]
+    for row in rows:
+        parts.append(struct.pack('>h', len(row)))
+        parts.extend(_encode_value(value) for value in row)
+    parts.append(TRAILER)
+    return b''.join(parts)
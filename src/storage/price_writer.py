@@ -0,0 +1,42 @@
+# src/storage/price_writer.py
+from typing import Iterator, List, Optional, Tuple
+from src.collectors.price_batch import PriceBatch
+from src.config.settings import settings
+from .async_database import AsyncDatabaseManager
+from .bulk_writer import StagedCopyWriter
+from .database import DatabaseManager
+from .models import BTCPrice
+from .pg_copy import encode_price_batch, price_columns
+
+class PriceWriter:
+    """Writes PriceBatches into btc_prices, skipping rows that already exist"""
+    def __init__(self, db: DatabaseManager, chunk_size: Optional[int] = None,
+                 async_db: Optional[AsyncDatabaseManager] = None) -> None:
+        self.db = db
+        self.chunk_size = chunk_size or settings.DEFAULT_BATCH_SIZE
+        self.copy_writer = StagedCopyWriter(
+            db, BTCPrice.__table__, ['price_timestamp', 'currency'], async_db=async_db
+        )
+
+    def _chunks(self, batch: PriceBatch) -> Iterator[Tuple[List[str], bytes, int]]:
+        for start in range(0, len(batch), self.chunk_size):
+            chunk = batch[start:start + self.chunk_size]
+            yield price_columns(chunk), encode_price_batch(chunk), len(chunk)
+
+    def write(self, batch: PriceBatch) -> Tuple[int, int]:
+        """Insert a batch in chunks of `chunk_size` rows; returns total (inserted, skipped) counts"""
+        inserted = skipped = 0
+        for columns, payload, rows in self._chunks(batch):
+            chunk_inserted, chunk_skipped = self.copy_writer.write_chunk(columns, payload, rows)
+            inserted += chunk_inserted
+            skipped += chunk_skipped
+        return inserted, skipped
+
+    async def write_async(self, batch: PriceBatch) -> Tuple[int, int]:
+        """write() over the async engine"""
+        inserted = skipped = 0
+        for columns, payload, rows in self._chunks(batch):
+            chunk_inserted, chunk_skipped = await self.copy_writer.write_chunk_async(columns, payload, rows)
+            inserted += chunk_inserted
+            skipped += chunk_skipped
+        return inserted, skipped
@@ -0,0 +1,147 @@
+# src/storage/quality_writer.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.config.settings import settings
+from src.utils.json_encoder import serialize_for_json
+from src.utils.logger import logger
+from src.validators.validators import QualityCheck, QualityReport
+from .backends import StorageBackend
+
+def _check_time(check: QualityCheck) -> Optional[datetime]:
+    return check.details.get('timestamp') if check.details else None
+
+def quality_rows(report: QualityReport, source: str) -> List[Dict]:
+    """
+    quality_checks rows for a report. A run of consecutive failures of the
+    same check becomes one row whose details carry the number of
+    occurrences, the first/last timestamps and the first/last details.
+    """
+    rows = []
+    start = 0
+    checks = report.checks
+    while start < len(checks):
+        first = checks[start]
+        end = start + 1
+        if not first.passed:
+            while end < len(checks) and checks[end].name == first.name and not checks[end].passed:
+                end += 1
+
+        count = end - start
+        if count == 1:
+            message, details = first.message, first.details
+        else:
+            last = checks[end - 1]
+            message = f"{count} failed {first.name} checks, first: {first.message}"
+            details = {
+                'occurrences': count,
+                'first_timestamp': _check_time(first),
+                'last_timestamp': _check_time(last),
+                'first': first.details,
+                'last': last.details
+            }
+        rows.append({
+            'timestamp': report.timestamp,
+            'source': source,
+            'check_name': first.name,
+            'passed': first.passed,
+            'message': message,
+            'details': serialize_for_json(details) if details else None
+        })
+        start = end
+    return rows
+
+class QualityResultWriter:
+    """
+    Write-behind queue for quality check results.
+
+    submit() only enqueues rows; a background task bulk-inserts them in
+    batches of up to `batch_size`, or whatever arrived within
+    `flush_interval` seconds. The queue is bounded: when it is full new rows
+    are dropped (and counted) rather than slowing down ingestion.
+    """
+    def __init__(self, storage: StorageBackend, max_queue: Optional[int] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None) -> None:
+        self.storage = storage
+        self.max_queue = max_queue or settings.QUALITY_QUEUE_SIZE
+        self.batch_size = batch_size or settings.QUALITY_BATCH_SIZE
+        self.flush_interval = settings.QUALITY_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        # The queue and drain task belong to one loop; a new loop starts over
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = loop.create_task(self._drain())
+            self._loop = loop
+        return self._queue
+
+    def submit(self, report: QualityReport, source: str) -> int:
+        """Queue a report's rows for writing; returns the number of rows queued"""
+        queue = self._ensure_started()
+        rows = quality_rows(report, source)
+        queued = 0
+        for row in rows:
+            try:
+                queue.put_nowait(row)
+                queued += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+        if queued < len(rows):
+            logger.warning(f"Quality queue full, dropped {len(rows) - queued} results for {source}")
+        return queued
+
+    async def _drain(self) -> None:
+        queue = self._queue
+        while True:
+            rows = [await queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._write(rows)
+                self.written += len(rows)
+            except Exception as e:
+                self.failed += len(rows)
+                logger.error(f"Failed to store {len(rows)} quality results: {e}")
+            finally:
+                for _ in rows:
+                    queue.task_done()
+
+    async def _write(self, rows: List[Dict]) -> None:
+        await self.storage.write_quality(rows)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been written (or failed)"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            await self.flush()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queued': self._queue.qsize() if self._queue is not None else 0
+        }
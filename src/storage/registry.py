@@ -0,0 +1,54 @@
+# src/storage/registry.py
+from typing import Optional
+from src.config.settings import settings
+from .async_database import AsyncDatabaseManager
+from .backends import PostgresBackend, StorageBackend
+from .database import DatabaseManager
+from .spool import BatchSpool, SpooledStorage
+from .sqlite_backend import SQLiteBackend
+
+class DatabaseRegistry:
+    """
+    Process-wide database managers, so every pipeline shares one engine and
+    connection pool instead of opening its own. Managers are created on first
+    use; dispose() at shutdown closes the pooled connections.
+
+    get_backend() is the storage the pipelines write through, chosen by
+    settings.STORAGE_BACKEND and wrapped in a local spool when
+    SPOOL_ENABLED.
+    """
+    def __init__(self) -> None:
+        self._sync: Optional[DatabaseManager] = None
+        self._async: Optional[AsyncDatabaseManager] = None
+        self._backend: Optional[StorageBackend] = None
+
+    def get(self) -> DatabaseManager:
+        if self._sync is None:
+            self._sync = DatabaseManager()
+        return self._sync
+
+    def get_async(self) -> AsyncDatabaseManager:
+        if self._async is None:
+            self._async = AsyncDatabaseManager()
+        return self._async
+
+    def get_backend(self) -> StorageBackend:
+        if self._backend is None:
+            if settings.STORAGE_BACKEND == 'sqlite':
+                self._backend = SQLiteBackend(settings.SQLITE_PATH)
+            else:
+                self._backend = PostgresBackend(self.get(), self.get_async())
+            if settings.SPOOL_ENABLED:
+                self._backend = SpooledStorage(self._backend, BatchSpool(settings.SPOOL_DIR))
+        return self._backend
+
+    async def dispose(self) -> None:
+        if self._backend is not None:
+            await self._backend.dispose()
+        if self._async is not None:
+            await self._async.dispose()
+        if self._sync is not None:
+            self._sync.engine.dispose()
+
+# Process-wide instance shared by all pipelines
+databases = DatabaseRegistry()
@@ -0,0 +1,75 @@
+# src/storage/run_state.py
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Optional
+from src.utils.logger import logger
+
+class RunStateStore:
+    """
+    Durable stage checkpoints for pipeline runs, in a local SQLite file.
+
+    A checkpoint is keyed by (run_id, window, stage) and holds an opaque
+    payload. A retried run with the same run id finds the stages it already
+    finished and skips them. Each call opens its own connection, so the
+    async helpers can run the I/O on a worker thread.
+    """
+    def __init__(self, path: str, ttl: float = 86400.0) -> None:
+        self.path = path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_id TEXT NOT NULL, window TEXT NOT NULL, stage TEXT NOT NULL, "
+                "payload BLOB, created_at REAL NOT NULL, "
+                "PRIMARY KEY (run_id, window, stage))"
+            )
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, run_id: str, window: str, stage: str) -> Optional[bytes]:
+        """Payload of a finished stage, or None if it hasn't finished in this run"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT payload FROM checkpoints WHERE run_id = ? AND window = ? AND stage = ?",
+                (run_id, window, stage)
+            ).fetchone()
+        return None if row is None else (row[0] if row[0] is not None else b'')
+
+    def put(self, run_id: str, window: str, stage: str, payload: bytes = b'') -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, window, stage, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, window, stage, payload, time.time())
+            )
+
+    def clear(self, run_id: str) -> None:
+        """Forget a run once it has completed"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def prune(self) -> None:
+        """Drop checkpoints of runs abandoned more than `ttl` seconds ago"""
+        with closing(self._connect()) as conn, conn:
+            removed = conn.execute("DELETE FROM checkpoints WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} stale run checkpoints")
+
+    async def get_async(self, run_id: str, window: str, stage: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, run_id, window, stage)
+
+    async def put_async(self, run_id: str, window: str, stage: str, payload: bytes = b'') -> None:
+        await asyncio.to_thread(self.put, run_id, window, stage, payload)
+
+    async def clear_async(self, run_id: str) -> None:
+        await asyncio.to_thread(self.clear, run_id)
+
+    async def prune_async(self) -> None:
+        await asyncio.to_thread(self.prune)
@@ -0,0 +1,270 @@
+# src/storage/spool.py
+"""
+Local durable spool for price batches the database couldn't take.
+
+The spool is a directory of append-only segment files. Every record is
+a header (magic, CRC32 and length of the payload) followed by a
+PriceBatch.to_bytes() payload, and it is fsynced before append() returns.
+New records go to the active segment. rotate() closes it, so a drainer can
+replay the closed segments in order while writers keep appending.
+"""
+import asyncio
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import asyncpg
+from sqlalchemy.exc import InterfaceError, OperationalError
+from src.collectors.price_batch import PriceBatch
+from src.config.settings import settings
+from src.utils.logger import logger
+from src.utils.metrics import SPOOL_ROWS
+from .backends import StorageBackend
+from .watermarks import WatermarkKey
+
+MAGIC = b'BSP1'
+RECORD_HEADER = struct.Struct('>4sII')  # magic, crc32, payload length
+
+# Failures worth retrying later: the database is unreachable, overloaded or too slow
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError, OSError, OperationalError, InterfaceError,
+    asyncpg.PostgresConnectionError, asyncpg.InterfaceError
+)
+
+class BatchSpool:
+    """Append-only, checksummed segment files of encoded batches"""
+    def __init__(self, directory: str, segment_bytes: Optional[int] = None) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes or settings.SPOOL_SEGMENT_BYTES
+        self._lock = threading.Lock()
+        self._active: Optional[BinaryIO] = None
+        self._next_seq: Optional[int] = None  # the directory is only created by the first append
+
+    def _names(self) -> List[str]:
+        return os.listdir(self.directory) if os.path.isdir(self.directory) else []
+
+    def _segments(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, name) for name in self._names()
+            if name.startswith('segment-') and name.endswith('.spool')
+        )
+
+    def append(self, payload: bytes) -> None:
+        record = RECORD_HEADER.pack(MAGIC, zlib.crc32(payload), len(payload)) + payload
+        with self._lock:
+            if self._next_seq is None:
+                os.makedirs(self.directory, exist_ok=True)
+                # A restart never appends to an old segment (its tail may be torn)
+                existing = [int(name[8:20]) for name in self._names() if name.startswith('segment-')]
+                self._next_seq = max(existing) + 1 if existing else 0
+            if self._active is None:
+                path = os.path.join(self.directory, f"segment-{self._next_seq:012d}.spool")
+                self._next_seq += 1
+                self._active = open(path, 'ab')
+            self._active.write(record)
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            if self._active.tell() >= self.segment_bytes:
+                self._close_active()
+
+    def _close_active(self) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+
+    def rotate(self) -> List[str]:
+        """Close the active segment; returns every closed segment, oldest first"""
+        with self._lock:
+            self._close_active()
+            return self._segments()
+
+    def read_segment(self, path: str) -> Iterator[bytes]:
+        """Payloads of a closed segment in order. Stops at a torn or corrupt record."""
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if not header:
+                    return
+                if len(header) < RECORD_HEADER.size:
+                    logger.warning(f"Spool segment {path} ends in a torn record, ignoring it")
+                    return
+                magic, crc, length = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if magic != MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+                    if magic == MAGIC and len(payload) < length:
+                        logger.warning(f"Spool segment {path} ends in a torn record, ignoring it")
+                    else:
+                        logger.error(f"Spool segment {path} has a corrupt record, keeping a copy")
+                        os.replace(path, path + '.corrupt')
+                    return
+                yield payload
+
+    def remove(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+    def set_aside(self, path: str) -> None:
+        """Keep a segment that can't be replayed out of the drain, for inspection"""
+        if os.path.exists(path):
+            os.replace(path, path + '.failed')
+
+    def pending(self) -> bool:
+        with self._lock:
+            return self._active is not None or bool(self._segments())
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_active()
+
+class SpooledStorage(StorageBackend):
+    """
+    StorageBackend that keeps price writes flowing while the database is
+    down or slow.
+
+    A price write that fails with a transient error, or takes longer than
+    `write_timeout`, goes to the spool instead. A background task replays
+    the spool in order once the database answers again, then stores the
+    watermarks held back meanwhile. While anything is spooled, new batches
+    are spooled behind it to keep that order. Replays are idempotent because
+    writes skip existing rows, so a batch replayed twice after a crash isn't
+    duplicated. get_watermarks() falls back to the last known marks plus the
+    held-back ones, so incremental runs don't re-fetch data. A segment that
+    fails to replay for any other reason is logged and set aside
+    (`.failed`) so the rest of the spool still drains.
+    """
+    def __init__(self, inner: StorageBackend, spool: BatchSpool, write_timeout: Optional[float] = None,
+                 retry_interval: Optional[float] = None) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.db = inner.db
+        self.spool = spool
+        self.write_timeout = write_timeout or settings.SPOOL_WRITE_TIMEOUT
+        self.retry_interval = settings.SPOOL_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self._known: Dict[WatermarkKey, datetime] = {}
+        self._pending: Dict[WatermarkKey, datetime] = {}
+        self._drainer: Optional[asyncio.Task] = None
+        self.spooled_batches = 0
+        self.replayed_batches = 0
+        self.failed_segments = 0
+
+    async def ensure_schema(self) -> None:
+        try:
+            await self.inner.ensure_schema()
+        except TRANSIENT_ERRORS as e:
+            # Not fatal: writes are spooled, and the next run tries again
+            logger.warning(f"Database unavailable for schema setup ({e!r})")
+        if self.spool.pending():
+            self._start_drainer()
+
+    async def write_prices(self, batch: PriceBatch) -> Tuple[int, int]:
+        """(inserted, skipped) of the database write, or (0, 0) when the batch was spooled"""
+        if self._draining():
+            await self._spool(batch, reason="earlier batches are still spooled")
+            return 0, 0
+        try:
+            return await asyncio.wait_for(self.inner.write_prices(batch), self.write_timeout)
+        except TRANSIENT_ERRORS as e:
+            await self._spool(batch, reason=repr(e))
+            return 0, 0
+
+    async def update_watermarks(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        _merge(self._pending, watermarks)
+        if self._draining():
+            return  # the drainer advances them as it replays
+        try:
+            await asyncio.wait_for(self.inner.update_watermarks(self._pending), self.write_timeout)
+            _merge(self._known, self._pending)
+            self._pending.clear()
+        except TRANSIENT_ERRORS as e:
+            logger.warning(f"Watermark update failed ({e!r}), keeping them until the database is back")
+            self._start_drainer()
+
+    async def get_watermarks(self) -> Dict[WatermarkKey, datetime]:
+        try:
+            self._known = await asyncio.wait_for(self.inner.get_watermarks(), self.write_timeout)
+        except TRANSIENT_ERRORS as e:
+            logger.warning(f"Reading watermarks failed ({e!r}), using the last known ones")
+        watermarks = dict(self._known)
+        _merge(watermarks, self._pending)
+        return watermarks
+
+    async def write_news(self, items: List[Dict]) -> Tuple[int, int]:
+        return await self.inner.write_news(items)
+
+    async def write_quality(self, rows: List[Dict]) -> None:
+        await self.inner.write_quality(rows)
+
+    async def _spool(self, batch: PriceBatch, reason: str) -> None:
+        await asyncio.to_thread(self.spool.append, batch.to_bytes())
+        self.spooled_batches += 1
+        SPOOL_ROWS.inc(len(batch), event='spooled')
+        logger.warning(f"Spooled {len(batch)} price rows locally: {reason}")
+        self._start_drainer()
+
+    def _draining(self) -> bool:
+        return self._drainer is not None and not self._drainer.done()
+
+    def _start_drainer(self) -> None:
+        if not self._draining():
+            self._drainer = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while True:
+            segments = await asyncio.to_thread(self.spool.rotate)
+            if not segments and not self._pending:
+                logger.info("Spool drained")
+                return
+            try:
+                for path in segments:
+                    try:
+                        await self._replay(path)
+                    except TRANSIENT_ERRORS:
+                        raise
+                    except Exception as e:
+                        # Retrying would hit the same record again; keep the segment and move on
+                        logger.error(f"Replaying spool segment {path} failed ({e!r}), setting it aside")
+                        await asyncio.to_thread(self.spool.set_aside, path)
+                        self.failed_segments += 1
+                if self._pending:
+                    await asyncio.wait_for(self.inner.update_watermarks(self._pending), self.write_timeout)
+                    _merge(self._known, self._pending)
+                    self._pending.clear()
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"Database still unavailable ({e!r}), retrying the spool in {self.retry_interval}s")
+                await asyncio.sleep(self.retry_interval)
+            except Exception as e:
+                # Only the watermark update gets here; without them the next run re-fetches, which is safe
+                logger.error(f"Storing held-back watermarks failed ({e!r}), dropping them")
+                self._pending.clear()
+
+    async def _replay(self, path: str) -> None:
+        payloads = await asyncio.to_thread(lambda: list(self.spool.read_segment(path)))
+        for payload in payloads:
+            batch = PriceBatch.from_bytes(payload)
+            # A spooled batch doesn't know its interval; its watermarks wait in _pending
+            await asyncio.wait_for(self.inner.write_prices(batch), self.write_timeout)
+            self.replayed_batches += 1
+            SPOOL_ROWS.inc(len(batch), event='replayed')
+        # Only once every record is in the database; a crash before this replays the segment again
+        await asyncio.to_thread(self.spool.remove, path)
+        logger.info(f"Replayed {len(payloads)} spooled batches from {os.path.basename(path)}")
+
+    async def drained(self) -> None:
+        """Wait until the spool has been replayed (or the drainer stopped)"""
+        if self._drainer is not None:
+            await asyncio.gather(self._drainer, return_exceptions=True)
+
+    async def dispose(self) -> None:
+        if self._drainer is not None:
+            self._drainer.cancel()
+            await asyncio.gather(self._drainer, return_exceptions=True)
+            self._drainer = None
+        self.spool.close()
+        await self.inner.dispose()
+
+def _merge(into: Dict[WatermarkKey, datetime], watermarks: Dict[WatermarkKey, datetime]) -> None:
+    for key, timestamp in watermarks.items():
+        if key not in into or timestamp > into[key]:
+            into[key] = timestamp
@@ -0,0 +1,91 @@
+# src/storage/sqlite_backend.py
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import Table, event, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.collectors.price_batch import PriceBatch
+from src.config.settings import settings
+from .backends import StorageBackend
+from .database import DatabaseManager
+from .models import BTCPrice, BitcoinNews
+from .news_writer import NEWS_COLUMNS
+from .quality_storage import QualityCheckResult
+from .watermarks import WatermarkKey, SELECT_WATERMARKS, watermark_upsert, watermarks_by_key
+
+def _set_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+    cursor.execute("PRAGMA synchronous=NORMAL")  # fsync at checkpoints, not every commit
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+def _naive_utc(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded storage in a local SQLite file in WAL mode, for laptops and CI
+    boxes without a database server. Same tables and the same upsert
+    semantics as Postgres (INSERT ... ON CONFLICT DO NOTHING, forward-only
+    watermarks). sqlite3 calls block, so they run in a worker thread.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.db = DatabaseManager(url=f"sqlite:///{path}")
+        event.listen(self.db.engine, 'connect', _set_pragmas)
+        self.schema_ready = False
+
+    async def ensure_schema(self) -> None:
+        if not self.schema_ready:
+            if settings.DB_CREATE_SCHEMA:
+                await asyncio.to_thread(self.db.init_db)
+            self.schema_ready = True
+
+    def _insert_new(self, table: Table, conflict_columns: Sequence[str], rows: List[Dict]) -> Tuple[int, int]:
+        if not rows:
+            return 0, 0
+        stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=list(conflict_columns))
+        with self.db.engine.begin() as connection:
+            inserted = connection.execute(stmt, rows).rowcount
+        return inserted, len(rows) - inserted
+
+    async def write_prices(self, batch: PriceBatch) -> Tuple[int, int]:
+        return await asyncio.to_thread(
+            self._insert_new, BTCPrice.__table__, ['price_timestamp', 'currency'], batch.to_rows()
+        )
+
+    async def write_news(self, items: List[Dict]) -> Tuple[int, int]:
+        rows = [{column: _naive_utc(item.get(column)) for column in NEWS_COLUMNS} for item in items]
+        return await asyncio.to_thread(self._insert_new, BitcoinNews.__table__, ['title', 'published_at'], rows)
+
+    def _write_quality(self, rows: List[Dict]) -> None:
+        with self.db.engine.begin() as connection:
+            connection.execute(insert(QualityCheckResult.__table__), rows)
+
+    async def write_quality(self, rows: List[Dict]) -> None:
+        await asyncio.to_thread(self._write_quality, rows)
+
+    def _get_watermarks(self) -> Dict[WatermarkKey, datetime]:
+        with self.db.engine.connect() as connection:
+            return watermarks_by_key(connection.execute(SELECT_WATERMARKS).all())
+
+    async def get_watermarks(self) -> Dict[WatermarkKey, datetime]:
+        return await asyncio.to_thread(self._get_watermarks)
+
+    def _update_watermarks(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        with self.db.engine.begin() as connection:
+            connection.execute(watermark_upsert(watermarks, dialect='sqlite'))
+
+    async def update_watermarks(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        if watermarks:
+            await asyncio.to_thread(self._update_watermarks, watermarks)
+
+    async def dispose(self) -> None:
+        self.db.engine.dispose()
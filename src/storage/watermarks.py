@@ -0,0 +1,97 @@
+# src/storage/watermarks.py
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.collectors.price_batch import PriceBatch
+from .async_database import AsyncDatabaseManager
+from .database import DatabaseManager
+from .models import CollectionWatermark
+
+WatermarkKey = Tuple[str, str, str]  # (source, currency, interval)
+
+SELECT_WATERMARKS = select(
+    CollectionWatermark.source, CollectionWatermark.currency, CollectionWatermark.interval,
+    CollectionWatermark.last_timestamp
+)
+
+class WatermarkStore:
+    """
+    High-water marks of collected prices per (source, currency, interval).
+
+    The interval keeps writers of different resolutions apart: a 1h backfill
+    or a 1m stream must not move the mark the daily collection resumes from.
+    """
+    def __init__(self, db: DatabaseManager, async_db: Optional[AsyncDatabaseManager] = None) -> None:
+        self.db = db
+        self.async_db = async_db
+
+    def get_all(self) -> Dict[WatermarkKey, datetime]:
+        """Latest stored timestamp per (source, currency, interval), as aware UTC datetimes"""
+        with self.db.get_session() as session:
+            rows = session.execute(SELECT_WATERMARKS).all()
+        return watermarks_by_key(rows)
+
+    async def get_all_async(self) -> Dict[WatermarkKey, datetime]:
+        async with self.async_db.get_session() as session:
+            rows = (await session.execute(SELECT_WATERMARKS)).all()
+        return watermarks_by_key(rows)
+
+    def update(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        """Advance watermarks; an older timestamp never moves a mark backwards"""
+        if not watermarks:
+            return
+        with self.db.get_session() as session:
+            session.execute(watermark_upsert(watermarks))
+            session.commit()
+
+    async def update_async(self, watermarks: Dict[WatermarkKey, datetime]) -> None:
+        if not watermarks:
+            return
+        async with self.async_db.get_session() as session:
+            await session.execute(watermark_upsert(watermarks))
+            await session.commit()
+
+def watermarks_by_key(rows) -> Dict[WatermarkKey, datetime]:
+    return {
+        (row.source, row.currency, row.interval): row.last_timestamp.replace(tzinfo=timezone.utc)
+        for row in rows
+    }
+
+def batch_watermarks(batch: PriceBatch, interval: str) -> Dict[WatermarkKey, datetime]:
+    """Watermarks a stored batch of `interval` data advances"""
+    return {
+        (source, currency, interval): timestamp
+        for (source, currency), timestamp in batch.latest_by_key().items()
+    }
+
+def watermark_upsert(watermarks: Dict[WatermarkKey, datetime], dialect: str = 'postgresql'):
+    """INSERT ... ON CONFLICT that only ever moves a watermark forward (postgresql or sqlite)"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    table = CollectionWatermark.__table__
+    insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+    greatest = func.max if dialect == 'sqlite' else func.greatest  # SQLite's two-argument max() is scalar
+    stmt = insert(table).values([
+        {
+            'source': source,
+            'currency': currency,
+            'interval': interval,
+            'last_timestamp': _to_naive_utc(timestamp),
+            'updated_at': now
+        }
+        for (source, currency, interval), timestamp in watermarks.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=['source', 'currency', 'interval'],
+        set_={
+            'last_timestamp': greatest(table.c.last_timestamp, stmt.excluded.last_timestamp),
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+
+def _to_naive_utc(timestamp: datetime) -> datetime:
+    """btc_prices stores naive UTC timestamps; keep watermarks consistent with it"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
@@ -20,4 +20,7 @@ class ErrorTracker:
         return {
             error_type: len(errors)
             for error_type, errors in self.errors.items()
-        }
\ No newline at end of file
+        }
+
+    def clear(self) -> None:
+        self.errors.clear()
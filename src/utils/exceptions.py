@@ -10,4 +10,12 @@ class ValidationError(DataPlatformError):
 
 class CollectionError(DataPlatformError):
     """Raised when data collection fails"""
-    pass
\ No newline at end of file
+    pass
+
+class DecodeError(CollectionError):
+    """Raised when an API response doesn't match the expected schema"""
+    pass
+
+class CircuitOpenError(CollectionError):
+    """Raised when a source's circuit breaker is open and requests are skipped"""
+    pass
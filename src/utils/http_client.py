@@ -0,0 +1,76 @@
+# src/utils/http_client.py
+import asyncio
+from typing import Optional
+import aiohttp
+from src.config.settings import settings
+from src.utils.logger import logger
+
+class SharedHTTPClient:
+    """
+    One long-lived aiohttp session per process (and event loop).
+
+    Collectors and scrapers register themselves as users; the session is
+    created lazily on first request and closed when the last user releases it.
+    Connections are kept alive and reused, DNS lookups are cached and the
+    number of open connections per host is capped.
+    """
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._users = 0
+
+    def register(self) -> None:
+        self._users += 1
+
+    def _build_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        # A session is bound to the loop it was created on, so a new loop
+        # (e.g. a fresh asyncio.run) gets a new one
+        if self._session is not None and not self._session.closed:
+            logger.warning("Closing HTTP session bound to a different event loop")
+            await _close_abandoned(self._session, self._loop)
+        self._session = self._build_session()
+        self._loop = loop
+        return self._session
+
+    async def release(self) -> None:
+        """Drop one user; close the session once nobody uses it anymore"""
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            if self._loop is asyncio.get_running_loop():
+                await self._session.close()
+        self._session = None
+        self._loop = None
+
+async def _close_abandoned(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+    """Close a session from outside the event loop it belongs to"""
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        return
+    # Driving a loop that isn't ours could deadlock; closing the connector needs no loop to run
+    connector = session.connector
+    session.detach()
+    if connector is not None:
+        await connector.close()
+
+# Process-wide instance shared by all collectors and scrapers
+http_client = SharedHTTPClient()
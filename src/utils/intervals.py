@@ -0,0 +1,11 @@
+# src/utils/intervals.py
+
+# Candle and bucket intervals used across collectors and processors, in seconds
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400
+}
@@ -1,7 +1,12 @@
 # src/utils/metrics.py
+import bisect
+import math
+import os
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 @dataclass
 class CollectionMetrics:
@@ -25,3 +30,144 @@ class MetricsCollector:
             self.current_run.retries = retries
             self.current_run.errors = errors
 
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic total per label set"""
+    type = 'counter'
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    """Last value set per label set"""
+    type = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[_label_key(labels)] = value
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+    type = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values: Dict[LabelKey, List[float]] = {}  # per-bucket counts, then sum
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [0.0] * (len(self.buckets) + 1)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self.values.get(_label_key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def total(self, **labels: str) -> float:
+        series = self.values.get(_label_key(labels))
+        return series[-1] if series else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for key, series in self.values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(key)} {_format_value(cumulative)}"
+
+class MetricsRegistry:
+    """In-process metrics, rendered in the Prometheus text exposition format"""
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Union[Counter, Gauge, Histogram]] = {}
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str) -> None:
+        """Write render() to `path` atomically (for node_exporter's textfile collector or a plain scrape)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+# Process-wide instance shared by collectors and pipelines
+pipeline_metrics = MetricsRegistry()
+
+STAGE_SECONDS = pipeline_metrics.histogram('pipeline_stage_seconds', 'Wall time per pipeline stage')
+RECORDS_TOTAL = pipeline_metrics.counter('pipeline_records_total', 'Records that went through a pipeline stage')
+RECORDS_PER_SECOND = pipeline_metrics.gauge('pipeline_records_per_second', 'Throughput of the last completed run')
+ROWS_WRITTEN = pipeline_metrics.counter('pipeline_rows_written_total', 'Rows sent to the database, by outcome')
+RUNS_TOTAL = pipeline_metrics.counter('pipeline_runs_total', 'Pipeline runs, by status')
+HTTP_SECONDS = pipeline_metrics.histogram('collector_request_seconds', 'HTTP request latency per source')
+BYTES_FETCHED = pipeline_metrics.counter('collector_bytes_fetched_total', 'Response body bytes received per source')
+SPOOL_ROWS = pipeline_metrics.counter('storage_spool_rows_total', 'Price rows spooled locally and replayed')
+RATE_LIMIT_WAIT = pipeline_metrics.histogram(
+    'collector_rate_limit_wait_seconds', 'Time spent waiting for the rate limiter per source',
+    buckets=(0.0, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
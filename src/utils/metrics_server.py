@@ -0,0 +1,34 @@
+# src/utils/metrics_server.py
+from typing import Optional
+from aiohttp import web
+from src.utils.logger import logger
+from src.utils.metrics import MetricsRegistry
+
+class MetricsServer:
+    """Serves a MetricsRegistry at /metrics in the Prometheus text format"""
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9108) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            # Ephemeral port: report the one the OS picked
+            self.port = self._runner.addresses[0][1]
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,26 +1,137 @@
 # src/utils/rate_limiter.py
 import time
 import asyncio
-from datetime import datetime, timedelta
 from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
 
 class RateLimiter:
+    """Sliding one-minute window limiter"""
     def __init__(self, calls_per_minute: int = 50) -> None:
         self.calls_per_minute = calls_per_minute
         self.calls = deque(maxlen=calls_per_minute)
-    
+        # Serializes concurrent callers so they can't all slip past the limit
+        self._lock = asyncio.Lock()
+
     async def wait_if_needed(self):
-        now = datetime.now()
-
-        # Remove old timestamps
-        while self.calls and self.calls[0] < now - timedelta(minutes=1):
-            self.calls.popleft()
-        
-        # If we've hit the limit, wait
-        if len(self.calls) >= self.calls_per_minute:
-            wait_time = (self.calls[0] + timedelta(minutes=1) - now).total_seconds()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-        
-        self.calls.append(now)
+        async with self._lock:
+            now = time.monotonic()
+
+            # Remove old timestamps
+            while self.calls and self.calls[0] < now - 60:
+                self.calls.popleft()
+
+            # If we've hit the limit, wait
+            if len(self.calls) >= self.calls_per_minute:
+                wait_time = self.calls[0] + 60 - now
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                    now = time.monotonic()
+
+            self.calls.append(now)
+
+class TokenBucket:
+    """
+    Monotonic-clock token bucket.
+
+    Up to `capacity` calls go out immediately, after which calls are spaced
+    at `calls_per_minute`. Callers reserve their token before sleeping, so
+    concurrent waiters queue up in order without a lock. A 429 reported via
+    penalize() pushes back every caller of the bucket, including those
+    already waiting.
+    """
+    def __init__(self, calls_per_minute: float, capacity: Optional[int] = None) -> None:
+        self.rate = calls_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else max(int(calls_per_minute), 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._generation = 0
+
+        # Wait statistics
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going into debt); return seconds until it is usable"""
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        self._tokens -= 1
+        ready_at = self._updated + max(0.0, -self._tokens) / self.rate
+        return max(ready_at - now, 0.0)
+
+    async def wait_if_needed(self) -> float:
+        """Wait for a token; returns the time spent waiting in seconds"""
+        start = time.monotonic()
+        generation = self._generation
+        delay = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            if generation != self._generation:
+                # A Retry-After came in while we slept: queue up again behind it
+                generation = self._generation
+                delay = self._reserve()
+            else:
+                delay = 0.0
+
+        waited = time.monotonic() - start
+        self.calls += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def penalize(self, retry_after: float) -> None:
+        """Block all callers for `retry_after` seconds (server sent 429/Retry-After)"""
+        blocked_until = time.monotonic() + retry_after
+        if blocked_until <= self._blocked_until:
+            return
+        self._blocked_until = blocked_until
+        # Start from an empty bucket once the block lifts, so waiters don't
+        # all fire at the same instant
+        self._tokens = 0.0
+        self._updated = max(self._updated, blocked_until)
+        self._generation += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'calls': self.calls,
+            'total_wait': self.total_wait,
+            'max_wait': self.max_wait,
+            'avg_wait': self.total_wait / self.calls if self.calls else 0.0
+        }
+
+class RateLimiterRegistry:
+    """Process-wide token buckets keyed by host (or API key), shared by all callers"""
+    def __init__(self) -> None:
+        self._limiters: Dict[str, TokenBucket] = {}
+
+    def get(self, key: str, calls_per_minute: float, capacity: Optional[int] = None) -> TokenBucket:
+        """Return the bucket for `key`, creating it on first use"""
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(calls_per_minute, capacity)
+            self._limiters[key] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {key: limiter.stats() for key, limiter in self._limiters.items()}
+
+    def total_wait(self) -> float:
+        return sum(limiter.total_wait for limiter in self._limiters.values())
+
+def host_key(url: str) -> str:
+    """Registry key for a URL: its host"""
+    return urlparse(url).netloc or url
+
+def parse_retry_after(value: Optional[str], default: float = 60.0) -> float:
+    """Retry-After header in seconds (HTTP-date values fall back to `default`)"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
 
+# Process-wide instance shared by all collectors and scrapers
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,90 @@
+# src/utils/request_cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from src.config.settings import settings
+
+class ResponseCache:
+    """
+    Single-flight layer over a small TTL + LRU cache of decoded responses.
+
+    Concurrent calls for the same key share one fetch and its result; a
+    finished result is then served for `ttl` seconds. Only successful results
+    are cached. Cached values are shared between callers, so treat them as
+    read-only.
+    """
+    def __init__(self, max_entries: int = 256, ttl: float = 10.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None) -> Any:
+        """Cached value for `key`, joining an in-flight fetch or starting one"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The fetch runs in its own task, so no caller's cancellation reaches the shared request
+            task = asyncio.get_running_loop().create_task(self._fetch(key, fetch, self.ttl if ttl is None else ttl))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        # Shielded so one caller giving up doesn't cancel the others' fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            del self._in_flight[key]
+        self._store(key, value, ttl)
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'entries': len(self._entries)
+        }
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """Marks a failed fetch's exception as retrieved, so no warning is logged when every caller gave up"""
+    if not task.cancelled():
+        task.exception()
+
+def request_key(url: str, params: Optional[dict] = None, *extra: Hashable) -> Tuple:
+    """Cache key for a GET request; `extra` distinguishes how the body is decoded"""
+    return (url, tuple(sorted((params or {}).items())), *extra)
+
+# Process-wide instance shared by all collectors and scrapers
+response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL)
@@ -1,12 +1,17 @@
 # src/utils/scheduler.py
 import asyncio
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, Optional
+from src.config.settings import settings
 from src.utils.logger import logger
 from src.utils.task_monitor import TaskMonitor
 from src.utils.dashboard import Dashboard
 import os
 
+# Id of the scheduled run the current task belongs to; retries of a failed run keep it
+current_run_id: ContextVar[Optional[str]] = ContextVar('current_run_id', default=None)
+
 class Task:
     def __init__(self, name: str, func: Callable, interval_minutes: int):
         self.name = name
@@ -14,6 +19,9 @@ class Task:
         self.interval_minutes = interval_minutes
         self.last_run: datetime | None = None
         self.is_running = False
+        self.runs_started = 0
+        self.run_id: str | None = None
+        self.attempts = 0  # tries of the current run id
     
 class Scheduler:
     def __init__(self, dashboard_path: str = "dashboard.html"):
@@ -21,6 +29,8 @@ class Scheduler:
         self.running = True
         self.monitor = TaskMonitor()
         self.dashboard_path = dashboard_path
+        # Under Airflow the process restarts on a retry, so run ids are prefixed with Airflow's run_id
+        self.run_prefix = settings.PIPELINE_RUN_ID or datetime.now().strftime('%Y%m%dT%H%M%S')
     
     def stop(self):
         """Stop the scheduler"""
@@ -41,9 +51,20 @@ class Scheduler:
                 if (not task.last_run or (now - task.last_run).total_seconds() >= task.interval_minutes * 60):
                     logger.info(f"Running task: {task.name}")
                     task.is_running = True
+                    if task.run_id is not None and task.attempts >= settings.PIPELINE_MAX_ATTEMPTS:
+                        # A run that keeps failing would otherwise replay its checkpointed data forever
+                        logger.warning(f"Run {task.run_id} failed {task.attempts} times, starting a new run")
+                        task.run_id = None
+                    if task.run_id is None:
+                        task.runs_started += 1
+                        task.run_id = f"{self.run_prefix}:{task.name}:{task.runs_started}"
+                        task.attempts = 0
+                    task.attempts += 1
+                    current_run_id.set(task.run_id)
                     await task.func()
                     task.last_run = now
                     task.is_running = False
+                    task.run_id = None
 
                     self.monitor.update_status(task.name, success=True)
                     logger.info(f"Completed task: {task.name}")
@@ -0,0 +1,199 @@
+# src/utils/source_health.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import numpy as np
+from src.config.settings import settings
+from src.utils.exceptions import CircuitOpenError
+from src.utils.logger import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class SourceHealth:
+    """
+    Health of one data source: latency/error statistics, a circuit breaker and
+    an AIMD in-flight limit.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests fail fast with CircuitOpenError. Once `reset_timeout` seconds have
+    passed a single probe request is let through; its outcome closes the
+    circuit or opens it again.
+
+    The in-flight limit grows by roughly one per round of fast responses and
+    halves on a failure, a throttle response or a response slower than
+    `target_latency`.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, target_latency: float,
+                 min_limit: int = 1, max_limit: int = 8, initial_limit: Optional[int] = None,
+                 window: int = 200) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.target_latency = target_latency
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit if initial_limit is not None else min_limit)
+
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._last_decrease = 0.0
+        self.in_flight = 0
+        self._changed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def is_open(self) -> bool:
+        """True while requests would be rejected without being sent"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at < self.reset_timeout
+        return self.state == HALF_OPEN and self._probing
+
+    def _admit(self) -> None:
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, sending a probe")
+        if self.state == OPEN or (self.state == HALF_OPEN and self._probing):
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+        if self.state == HALF_OPEN:
+            self._probing = True
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one loop; the registry outlives loops (e.g. asyncio.run per task)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._changed = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._changed
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the source's in-flight slots; raises CircuitOpenError when the circuit is open"""
+        changed = self._condition()
+        async with changed:
+            await changed.wait_for(lambda: self.in_flight < int(self.limit) or self.state != CLOSED)
+            self._admit()
+            probe = self.state == HALF_OPEN
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with changed:
+                self.in_flight -= 1
+                if probe and self.state == HALF_OPEN:
+                    # The probe ended without a verdict (e.g. throttled); let the next one through
+                    self._probing = False
+                changed.notify_all()
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+            self.state = CLOSED
+            self._probing = False
+        if latency > self.target_latency:
+            self._decrease()
+        else:
+            # Additive increase: about +1 once a full window of requests came back fast
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        self.requests += 1
+        self.failures += 1
+        if latency is not None:
+            self.latencies.append(latency)
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self._decrease()
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_client_error(self, latency: float) -> None:
+        """The source answered but rejected the request (HTTP 4xx): it is up, so this isn't a failure"""
+        self.record_success(latency)
+
+    def record_throttle(self) -> None:
+        """The source asked us to slow down (HTTP 429): back off without counting a failure"""
+        self._decrease()
+
+    def record_retry(self) -> None:
+        self.retries += 1
+
+    def _decrease(self) -> None:
+        # Concurrent responses to the same overload shouldn't each halve the limit
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self.limit = max(float(self.min_limit), self.limit / 2)
+            self._last_decrease = now
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile in seconds over the recent window"""
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'state': self.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'error_rate': self.error_rate,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'limit': int(self.limit)
+        }
+
+class SourceHealthRegistry:
+    """Process-wide SourceHealth per source name, shared by all collectors of that source"""
+    def __init__(self) -> None:
+        self._sources: Dict[str, SourceHealth] = {}
+
+    def get(self, name: str) -> SourceHealth:
+        health = self._sources.get(name)
+        if health is None:
+            health = SourceHealth(
+                name,
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+                target_latency=settings.SOURCE_TARGET_LATENCY,
+                min_limit=settings.SOURCE_MIN_CONCURRENCY,
+                max_limit=settings.SOURCE_MAX_CONCURRENCY,
+                initial_limit=settings.SOURCE_INITIAL_CONCURRENCY
+            )
+            self._sources[name] = health
+        return health
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: health.stats() for name, health in self._sources.items()}
+
+# Process-wide instance shared by all collectors
+source_health = SourceHealthRegistry()
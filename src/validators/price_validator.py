@@ -1,14 +1,25 @@
 # src/validators/price_validator.py
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
 from datetime import datetime, timedelta
 import numpy as np
+from src.collectors.price_batch import PriceBatch, to_ms
 
 @dataclass
 class ValidationResult:
     is_valid: bool
     errors: List[str]
     warnings: List[str]
+    # Positions (in the validated series) of the points that end a large gap / price change
+    gap_indices: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.intp))
+    change_indices: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.intp))
+
+@dataclass
+class ValidationState:
+    """Last point of one (source, currency) series, carried from one batch to the next"""
+    last_timestamp: Optional[int] = None  # epoch ms
+    last_price: Optional[float] = None
+    points: int = 0
 
 @dataclass
 class ValidationThresholds:
@@ -17,6 +28,7 @@ class ValidationThresholds:
     max_price_change: float = 0.20  # 20%
     min_data_points: int = 10
     max_time_gap: timedelta = timedelta(hours=1)
+    max_messages: int = 20  # warnings built per kind of issue; the rest are only counted
 
 class PriceValidator:
     def __init__(self, thresholds: Optional[ValidationThresholds] = None):
@@ -26,32 +38,97 @@ class PriceValidator:
         self.max_price_change = self.thresholds.max_price_change
     
     def validate_price_data(self, prices: List[float], timestamps: List[datetime]) -> ValidationResult:
-        errors = []
-        warnings = []
+        result = self._check(np.asarray(prices, dtype=np.float64), timestamps_ms(timestamps))
+        if len(prices) < self.thresholds.min_data_points:
+            result.errors.append(f"Insufficient data points: {len(prices)}")
+            result.is_valid = False
+        return result
 
-        # Check for negative prices
-        if any(p <= self.min_price for p in prices):
+    def validate_batch(self, batch: PriceBatch) -> ValidationResult:
+        """Validate one currency's columnar batch"""
+        result = self._check(batch.prices, batch.timestamps)
+        if len(batch) < self.thresholds.min_data_points:
+            result.errors.append(f"Insufficient data points: {len(batch)}")
+            result.is_valid = False
+        return result
+
+    def validate_chunk(self, batch: PriceBatch, state: ValidationState) -> ValidationResult:
+        """
+        Validate one batch of a longer series (a single source and currency,
+        sorted by time). Gaps and price changes are also checked against the
+        last point of the previous batch; the minimum number of points is left
+        to finish(), once the whole series has been seen.
+        """
+        if not len(batch):
+            return ValidationResult(is_valid=True, errors=[], warnings=[])
+        result = self._check(batch.prices, batch.timestamps, state)
+        state.last_timestamp = int(batch.timestamps[-1])
+        state.last_price = float(batch.prices[-1])
+        state.points += len(batch)
+        return result
+
+    def _check(self, prices: np.ndarray, timestamps: np.ndarray,
+               state: Optional[ValidationState] = None) -> ValidationResult:
+        """
+        Range, gap and jump checks over whole arrays (epoch-ms timestamps).
+        Offending points are returned as index arrays; warning messages are
+        only built for the first `max_messages` of each kind.
+        """
+        errors = []
+        if np.any(prices <= self.min_price):
             errors.append("Negative or zero prices found")
-        
-        if len(prices) < self.thresholds.min_data_points:
-            errors.append(f"Insufficient data points: {len(prices)}")
-        
-        for i in range(1, len(timestamps)):
-            time_diff = timestamps[i] - timestamps[i-1]
-            if time_diff > self.thresholds.max_time_gap:
-                warnings.append(f"Large time gap detected: {time_diff} at {timestamps[i]}")
-
-        # Check for sudden price changes
-        for i in range(1, len(prices)):
-            change = abs(prices[i] - prices[i-1]) / prices[i-1]
-            if change > self.max_price_change:
-                warnings.append(f"Large price change detected: {change*100:.2f}% at {timestamps[i]}")
-        
-        if any(p > self.thresholds.max_price for p in prices):
+        if np.any(prices > self.thresholds.max_price):
             errors.append(f"Price above maximum threshold ({self.thresholds.max_price})")
-        
+
+        # Diff i compares point i+1 with point i; prepending the previous batch's last point shifts that by one
+        offset = 1
+        if state is not None and state.last_timestamp is not None:
+            timestamps = np.concatenate(([state.last_timestamp], timestamps))
+            prices = np.concatenate(([state.last_price], prices))
+            offset = 0
+
+        gaps = np.diff(timestamps)
+        gap_at = np.flatnonzero(gaps > self.thresholds.max_time_gap.total_seconds() * 1000)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes = np.abs(np.diff(prices)) / prices[:-1]
+        change_at = np.flatnonzero(changes > self.max_price_change)
+
+        warnings = self._messages(
+            gap_at, "time gaps",
+            lambda i: f"Large time gap detected: {timedelta(milliseconds=int(gaps[i]))} at {naive_datetime(timestamps[i + 1])}"
+        )
+        warnings += self._messages(
+            change_at, "price changes",
+            lambda i: f"Large price change detected: {changes[i]*100:.2f}% at {naive_datetime(timestamps[i + 1])}"
+        )
         return ValidationResult(
             is_valid=len(errors) == 0,
             errors=errors,
-            warnings=warnings
-        )
\ No newline at end of file
+            warnings=warnings,
+            gap_indices=gap_at + offset,
+            change_indices=change_at + offset
+        )
+
+    def _messages(self, indices: np.ndarray, kind: str, describe: Callable[[int], str]) -> List[str]:
+        limit = self.thresholds.max_messages
+        messages = [describe(i) for i in indices[:limit]]
+        if len(indices) > limit:
+            messages.append(f"... and {len(indices) - limit} more large {kind}")
+        return messages
+
+    def finish(self, state: ValidationState) -> ValidationResult:
+        """Checks that need the whole series, after its last validate_chunk()"""
+        errors = []
+        if state.points < self.thresholds.min_data_points:
+            errors.append(f"Insufficient data points: {state.points}")
+        return ValidationResult(is_valid=len(errors) == 0, errors=errors, warnings=[])
+
+def timestamps_ms(timestamps: Sequence[datetime]) -> np.ndarray:
+    """Epoch-ms array for a list of datetimes (naive ones are taken as UTC)"""
+    if len(timestamps) and timestamps[0].tzinfo is not None:
+        return np.fromiter((to_ms(timestamp) for timestamp in timestamps), dtype=np.int64, count=len(timestamps))
+    return np.array(timestamps, dtype='datetime64[ms]').astype(np.int64)
+
+def naive_datetime(timestamp_ms: int) -> datetime:
+    """Naive UTC datetime, as in the messages built from PriceBatch.datetimes()"""
+    return np.datetime64(int(timestamp_ms), 'ms').astype(datetime)
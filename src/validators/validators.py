@@ -1,9 +1,12 @@
 # src/quality/validators.py
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 from src.utils.logger import logger
+from src.collectors.price_batch import PriceBatch
+from src.validators.price_validator import naive_datetime, timestamps_ms
 
 @dataclass
 class QualityCheck:
@@ -18,6 +21,7 @@ class QualityReport:
     source: str
     checks: List[QualityCheck]
     data_sample: Optional[Dict] = None
+    issues: Dict[str, np.ndarray] = field(default_factory=dict)  # check name -> indices of offending points
 
     @property
     def passed(self) -> bool:
@@ -36,7 +40,8 @@ class DataQualityValidator:
             'max_price': 500000,  # Maximum reasonable BTC price
             'max_price_change': 0.20,  # 20% max change between points
             'min_data_points': 10,  # Minimum points expected
-            'max_time_gap': timedelta(minutes=10)  # Maximum gap between points
+            'max_time_gap': timedelta(minutes=10),  # Maximum gap between points
+            'max_samples': 20  # Points described in a failed check's details
         }
     
     def validate_price_data(self, prices: List[float], timestamps: List[datetime]) -> QualityReport:
@@ -53,57 +58,70 @@ class DataQualityValidator:
                 )],
                 data_sample=None
             )
+        return self._validate(np.asarray(prices, dtype=np.float64), timestamps_ms(timestamps))
 
+    def validate_batch(self, batch: PriceBatch) -> QualityReport:
+        """Run the price checks on one currency's columnar batch"""
+        if not len(batch):
+            return self.validate_price_data([], [])
+        return self._validate(batch.prices, batch.timestamps)
+
+    def _validate(self, prices: np.ndarray, timestamps: np.ndarray) -> QualityReport:
+        """
+        All price checks over whole arrays (epoch-ms timestamps). Each kind of
+        issue becomes one check whose details hold the number of occurrences
+        and a sample of at most `max_samples` points; the report's `issues`
+        keeps the full index arrays.
+        """
         try:
+            thresholds = self.price_thresholds
             checks = []
 
             # Check data volume
-            volume_check = QualityCheck(
+            checks.append(QualityCheck(
                 name="data_volume",
-                passed=len(prices) >= self.price_thresholds['min_data_points'],
-                message=f"Expected at least {self.price_thresholds['min_data_points']} points, got {len(prices)}"
-            )
-            checks.append(volume_check)
+                passed=len(prices) >= thresholds['min_data_points'],
+                message=f"Expected at least {thresholds['min_data_points']} points, got {len(prices)}"
+            ))
 
             # Check price range
-            price_range_check = QualityCheck(
+            out_of_range = np.flatnonzero((prices < thresholds['min_price']) | (prices > thresholds['max_price']))
+            checks.append(QualityCheck(
                 name="price_range",
-                passed=all(self.price_thresholds['min_price'] <= p <= self.price_thresholds['max_price'] 
-                          for p in prices),
-                message=f"Prices should be between {self.price_thresholds['min_price']} and {self.price_thresholds['max_price']}"
-            )
-            checks.append(price_range_check)
-
-            # Check for sudden changes
-            for i in range(1, len(prices)):
-                change = abs(prices[i] - prices[i-1]) / prices[i-1]
-                if change > self.price_thresholds['max_price_change']:
-                    checks.append(QualityCheck(
-                        name="price_change",
-                        passed=False,
-                        message=f"Suspicious price change of {change*100:.1f}% at {timestamps[i]}",
-                        details={
-                            'timestamp': timestamps[i],
-                            'previous_price': prices[i-1],
-                            'current_price': prices[i],
-                            'change_percentage': change * 100
-                        }
-                    ))
+                passed=not len(out_of_range),
+                message=f"Prices should be between {thresholds['min_price']} and {thresholds['max_price']}",
+                details={'occurrences': len(out_of_range)} if len(out_of_range) else None
+            ))
+
+            # Check for sudden changes; a diff index i is about point i + 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                changes = np.abs(np.diff(prices)) / prices[:-1]
+            change_at = np.flatnonzero(changes > thresholds['max_price_change']) + 1
+            if len(change_at):
+                checks.append(self._issue_check(
+                    "price_change", change_at, timestamps,
+                    lambda i: f"Suspicious price change of {changes[i - 1]*100:.1f}% at {naive_datetime(timestamps[i])}",
+                    lambda i: {
+                        'timestamp': naive_datetime(timestamps[i]),
+                        'previous_price': float(prices[i - 1]),
+                        'current_price': float(prices[i]),
+                        'change_percentage': float(changes[i - 1] * 100)
+                    }
+                ))
 
             # Check time gaps
-            for i in range(1, len(timestamps)):
-                gap = timestamps[i] - timestamps[i-1]
-                if gap > self.price_thresholds['max_time_gap']:
-                    checks.append(QualityCheck(
-                        name="time_gap",
-                        passed=False,
-                        message=f"Large time gap of {gap} at {timestamps[i]}",
-                        details={
-                            'timestamp': timestamps[i],
-                            'previous_time': timestamps[i-1],
-                            'gap': str(gap)
-                        }
-                    ))
+            gaps = np.diff(timestamps)
+            gap_at = np.flatnonzero(gaps > thresholds['max_time_gap'].total_seconds() * 1000) + 1
+            if len(gap_at):
+                checks.append(self._issue_check(
+                    "time_gap", gap_at, timestamps,
+                    lambda i: f"Large time gap of {timedelta(milliseconds=int(gaps[i - 1]))} at {naive_datetime(timestamps[i])}",
+                    lambda i: {
+                        'timestamp': naive_datetime(timestamps[i]),
+                        'previous_time': naive_datetime(timestamps[i - 1]),
+                        'gap': str(timedelta(milliseconds=int(gaps[i - 1])))
+                    }
+                ))
 
             # Always return a QualityReport
             return QualityReport(
@@ -111,10 +129,11 @@ class DataQualityValidator:
                 source="price_data",
                 checks=checks,
                 data_sample={
-                    'first_timestamp': timestamps[0] if timestamps else None,
-                    'last_timestamp': timestamps[-1] if timestamps else None,
-                    'price_range': [min(prices), max(prices)] if prices else None
-                }
+                    'first_timestamp': naive_datetime(timestamps[0]),
+                    'last_timestamp': naive_datetime(timestamps[-1]),
+                    'price_range': [float(prices.min()), float(prices.max())]
+                },
+                issues={'price_range': out_of_range, 'price_change': change_at, 'time_gap': gap_at}
             )
 
         except Exception as e:
@@ -130,7 +149,25 @@ class DataQualityValidator:
                 )],
                 data_sample=None
             )
-    
+
+    def _issue_check(self, name: str, indices: np.ndarray, timestamps: np.ndarray,
+                     describe: Callable[[int], str], detail: Callable[[int], Dict]) -> QualityCheck:
+        """One failed check for every point in `indices`; messages and details only for the sample"""
+        if len(indices) == 1:
+            return QualityCheck(name=name, passed=False, message=describe(indices[0]), details=detail(indices[0]))
+        sample = indices[:self.price_thresholds['max_samples']]
+        return QualityCheck(
+            name=name,
+            passed=False,
+            message=f"{len(indices)} failed {name} checks, first: {describe(indices[0])}",
+            details={
+                'occurrences': len(indices),
+                'first_timestamp': naive_datetime(timestamps[indices[0]]),
+                'last_timestamp': naive_datetime(timestamps[indices[-1]]),
+                'sample': [detail(i) for i in sample]
+            }
+        )
+
     def validate_news_data(self, news_items: List[Dict]) -> QualityReport:
         checks = []
         
@@ -1,5 +1,34 @@
 import os
 import sys
+import pytest
+import pytest_asyncio
+from aiohttp import web
 
 # Add the project root directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture(autouse=True, scope='session')
+def local_spool_dir(tmp_path_factory):
+    """Keep the shared backend's spool out of the working tree"""
+    from src.config.settings import settings
+    default = settings.SPOOL_DIR
+    settings.SPOOL_DIR = str(tmp_path_factory.mktemp('spool'))
+    yield settings.SPOOL_DIR
+    settings.SPOOL_DIR = default
+
+@pytest_asyncio.fixture
+async def serve_app():
+    """Factory that serves an aiohttp app on a free local port and returns its base URL"""
+    runners = []
+
+    async def serve(app: web.Application) -> str:
+        runner = web.AppRunner(app)
+        await runner.setup()
+        runners.append(runner)
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        host, port = runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    yield serve
+    for runner in runners:
+        await runner.cleanup()
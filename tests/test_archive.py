@@ -0,0 +1,112 @@
+# tests/test_archive.py
+import os
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+import pyarrow.parquet as pq
+from src.collectors.price_batch import PriceBatch, to_ms
+from src.pipelines.archive_pipeline import ArchivePipeline
+from src.storage.archive import PriceArchive, read_price_history
+from src.storage.sqlite_backend import SQLiteBackend
+
+START = datetime(2024, 1, 15)
+
+def hourly(hours: int, currency: str = 'usd') -> PriceBatch:
+    timestamps = [to_ms(START + timedelta(hours=h)) for h in range(hours)]
+    return PriceBatch.from_arrays(timestamps, [40_000.0 + h for h in range(hours)], currency=currency, source='binance')
+
+@pytest_asyncio.fixture
+async def storage(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "platform.sqlite3"))
+    await backend.ensure_schema()
+    await backend.write_prices(hourly(24 * 40))  # 2024-01-15 .. 2024-02-24
+    yield backend
+    await backend.dispose()
+
+@pytest.mark.asyncio
+async def test_archive_month_partitions_and_drop(storage, tmp_path):
+    archive = PriceArchive(str(tmp_path / "archive"), row_group_size=100)
+    stats = ArchivePipeline(storage, archive, currencies=['usd']).run(datetime(2024, 2, 10), drop=True)
+
+    assert stats.ranges_exported == 2
+    assert stats.rows_exported == stats.rows_dropped == 24 * 26
+    assert archive.boundary('usd') == datetime(2024, 2, 10)
+    assert storage.oldest_price_time('usd') == datetime(2024, 2, 10)
+
+    january = os.listdir(tmp_path / "archive" / "currency=usd" / "month=2024-01")
+    assert len(january) == 1
+    metadata = pq.ParquetFile(tmp_path / "archive" / "currency=usd" / "month=2024-01" / january[0]).metadata
+    assert metadata.row_group(0).column(0).compression == 'ZSTD'
+    assert metadata.num_row_groups > 1
+    assert metadata.row_group(0).column(1).statistics.has_min_max
+
+    # Hot and cold together, without gaps or duplicates at the boundary
+    history = read_price_history(storage, archive, 'usd', since=datetime(2024, 2, 1), until=datetime(2024, 2, 20))
+    assert len(history) == 24 * 19
+    assert history['price_timestamp'].is_monotonic_increasing
+    assert history['price_timestamp'].is_unique
+
+@pytest.mark.asyncio
+async def test_second_run_appends_and_compacts(storage, tmp_path):
+    archive = PriceArchive(str(tmp_path / "archive"))
+    pipeline = ArchivePipeline(storage, archive, currencies=['usd'])
+    pipeline.run(datetime(2024, 2, 5), compact=False)
+    stats = pipeline.run(datetime(2024, 2, 12))
+
+    assert stats.ranges_exported == 1
+    assert stats.partitions_compacted == 1
+    february = tmp_path / "archive" / "currency=usd" / "month=2024-02"
+    assert len(os.listdir(february)) == 1
+    cold = archive.read('usd', since=datetime(2024, 2, 1))
+    assert len(cold) == 24 * 11
+    # Rows were not dropped, so the hot table still has everything
+    assert len(storage.read_prices('usd')) == 24 * 40
+
+@pytest.mark.asyncio
+async def test_history_spans_tiers(storage, tmp_path):
+    archive = PriceArchive(str(tmp_path / "archive"))
+    ArchivePipeline(storage, archive, currencies=['usd']).run(datetime(2024, 2, 1), drop=True)
+
+    history = read_price_history(storage, archive, 'usd')
+    assert len(history) == 24 * 40
+    assert history['price'].iloc[-1] == 40_000.0 + 24 * 40 - 1
+
+def backfilled(hours: int, currency: str = 'usd') -> PriceBatch:
+    """Rows right before START, as a backfill would add them after the export"""
+    timestamps = [to_ms(START - timedelta(hours=hours - h)) for h in range(hours)]
+    return PriceBatch.from_arrays(timestamps, [39_000.0] * hours, currency=currency, source='binance')
+
+@pytest.mark.asyncio
+async def test_rows_below_boundary_are_merged_before_drop(storage, tmp_path):
+    archive = PriceArchive(str(tmp_path / "archive"))
+    pipeline = ArchivePipeline(storage, archive, currencies=['usd'])
+    pipeline.run(datetime(2024, 2, 1), drop=True)
+    await storage.write_prices(backfilled(48))
+
+    # Until the next run they are read from the hot table
+    history = read_price_history(storage, archive, 'usd', until=datetime(2024, 1, 20))
+    assert len(history) == 48 + 24 * 5
+    assert history['price_timestamp'].is_monotonic_increasing
+
+    stats = pipeline.run(datetime(2024, 2, 1), drop=True)
+    assert stats.rows_exported == stats.rows_dropped == 48
+    assert storage.oldest_price_time('usd') == datetime(2024, 2, 1)
+    cold = archive.read('usd', until=datetime(2024, 2, 1))
+    assert len(cold) == 48 + 24 * 17
+    assert cold['price_timestamp'].is_unique
+
+@pytest.mark.asyncio
+async def test_history_includes_unarchived_rows_without_drop(storage, tmp_path):
+    archive = PriceArchive(str(tmp_path / "archive"))
+    ArchivePipeline(storage, archive, currencies=['usd']).run(datetime(2024, 2, 1))
+    await storage.write_prices(backfilled(24))
+
+    history = read_price_history(storage, archive, 'usd', until=datetime(2024, 2, 1))
+    assert len(history) == 24 + 24 * 17
+    assert history['price_timestamp'].is_unique
+
+    # Dropping later only adds what the archive is missing
+    stats = ArchivePipeline(storage, archive, currencies=['usd']).run(datetime(2024, 2, 1), drop=True)
+    assert stats.rows_exported == 24
+    assert stats.rows_dropped == 24 + 24 * 17
+    assert len(archive.read('usd')) == 24 + 24 * 17
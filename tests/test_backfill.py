@@ -0,0 +1,38 @@
+# tests/test_backfill.py
+from datetime import datetime, timedelta, timezone
+from src.backfill import parse_args
+from src.pipelines.backfill_pipeline import BackfillPipeline, BackfillCheckpoint
+
+def test_backfill_windows_and_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "backfill.jsonl")
+    pipeline = BackfillPipeline(
+        sources=['binance', 'kraken'],
+        currencies=['usd'],
+        interval='1h',
+        checkpoint_path=checkpoint_path
+    )
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=90)
+
+    windows = list(pipeline.plan_windows(start, end))
+    binance = [w for w in windows if w.source == 'binance']
+    kraken = [w for w in windows if w.source == 'kraken']
+
+    # 1000 hourly klines per Binance request, 720 candles per Kraken request
+    assert all(w.end - w.start <= timedelta(hours=1000) for w in binance)
+    assert all(w.end - w.start <= timedelta(hours=720) for w in kraken)
+    assert binance[0].start == start and binance[-1].end == end
+    assert kraken[0].start == start and kraken[-1].end == end
+    # Sources are interleaved so they can be fetched side by side
+    assert windows[0].source != windows[1].source
+
+    # Finished windows survive a restart
+    pipeline.checkpoint.mark_done(windows[0], rows=1000)
+    resumed = BackfillCheckpoint(checkpoint_path)
+    assert resumed.is_done(windows[0])
+    assert not resumed.is_done(windows[1])
+
+def test_streaming_flag():
+    args = parse_args(['--start', '2023-01-01', '--end', '2024-01-01', '--streaming'])
+    assert args.streaming
+    assert not parse_args(['--start', '2023-01-01']).streaming
@@ -0,0 +1,72 @@
+# tests/test_browser_pool.py
+import asyncio
+import time
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
+from src.collectors.browser_pool import BrowserPool
+
+class _FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def get(self, url):
+        time.sleep(0.2)  # blocking, like a real page load
+
+    def quit(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_pool_reuses_drivers_and_bounds_size():
+    pool = BrowserPool(_FakeDriver, size=2)
+
+    async def scrape(url):
+        async with pool.acquire() as driver:
+            await pool.run(driver.get, url)
+
+    # Four page loads on two browsers run off the event loop, two at a time
+    started = time.perf_counter()
+    await asyncio.gather(*(scrape(f"https://exchange{i}.com") for i in range(4)))
+    elapsed = time.perf_counter() - started
+    assert pool.created == 2
+    assert elapsed < 0.7
+
+    # A later run reuses the warm drivers
+    await scrape("https://exchange1.com")
+    assert pool.created == 2
+
+    await pool.close()
+    assert not pool._drivers
+
+@pytest.mark.asyncio
+async def test_pool_replaces_broken_driver():
+    pool = BrowserPool(_FakeDriver, size=1)
+
+    with pytest.raises(WebDriverException):
+        async with pool.acquire() as driver:
+            broken = driver
+            raise WebDriverException("chrome not reachable")
+    assert broken.closed
+
+    async with pool.acquire() as driver:
+        assert driver is not broken
+    assert pool.created == 2
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_keeps_driver_after_command_error():
+    pool = BrowserPool(_FakeDriver, size=1)
+
+    # A slow selector is the page's problem, not the browser's
+    with pytest.raises(TimeoutException):
+        async with pool.acquire() as driver:
+            warm = driver
+            raise TimeoutException("element not found in time")
+    assert not warm.closed
+
+    with pytest.raises(InvalidSessionIdException):
+        async with pool.acquire() as driver:
+            assert driver is warm
+            raise InvalidSessionIdException("invalid session id")
+    assert warm.closed
+    assert pool.created == 1
+    await pool.close()
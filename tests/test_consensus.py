@@ -0,0 +1,69 @@
+# tests/test_consensus.py
+import numpy as np
+import pytest
+from src.collectors.price_batch import PriceBatch, SOURCES
+from src.processors.btc_processor import BTCProcessor
+from src.processors.consensus import ConsensusEngine
+
+MINUTE = 60_000
+
+def sources_batch():
+    binance = PriceBatch.from_arrays([0, MINUTE, 5 * MINUTE], [100.0, 101.0, 105.0], 'usd', 'binance',
+                                     volumes=[1.0, 3.0, 1.0])
+    kraken = PriceBatch.from_arrays([2 * MINUTE, 6 * MINUTE], [104.0, 106.0], 'usd', 'kraken',
+                                    volumes=[1.0, 0.0])
+    coingecko = PriceBatch.from_arrays([3 * MINUTE, 9 * MINUTE], [103.0, 110.0], 'usd', 'coingecko')
+    eur = PriceBatch.from_arrays([0], [90.0], 'eur', 'kraken', volumes=[2.0])
+    return PriceBatch.concat([binance, kraken, coingecko, eur])
+
+def test_median_consensus_one_row_per_bucket():
+    result = ConsensusEngine(interval='5m').reconcile(sources_batch())
+
+    assert result.timestamps.tolist() == [0, 0, 5 * MINUTE]
+    assert (result.sources == SOURCES.code('consensus')).all()
+
+    usd = result.for_currency('usd')
+    # Bucket 0: binance 101 (last before 5m), kraken 104, coingecko 103
+    # Bucket 5m: binance 105, kraken 106, coingecko 110
+    assert usd.prices.tolist() == [103.0, 106.0]
+    assert usd.spreads.tolist() == [3.0, 5.0]
+    assert usd.source_counts.tolist() == [3, 3]
+
+    eur = result.for_currency('eur')
+    assert eur.prices.tolist() == [90.0]
+    assert eur.source_counts.tolist() == [1]
+
+def test_vwap_consensus_falls_back_to_median():
+    result = ConsensusEngine(interval='5m', method='vwap').reconcile(sources_batch()).for_currency('usd')
+    # Bucket 0: only binance and kraken report volume -> (101*3 + 104*1) / 4
+    assert result.prices[0] == pytest.approx((101.0 * 3 + 104.0) / 4)
+    # Bucket 5m: binance volume 1, kraken volume 0 -> binance only
+    assert result.prices[1] == pytest.approx(105.0)
+
+def test_as_of_join_respects_tolerance():
+    binance = PriceBatch.from_arrays([0], [100.0], 'usd', 'binance')
+    kraken = PriceBatch.from_arrays([0, 7 * MINUTE], [102.0, 120.0], 'usd', 'kraken')
+    batch = PriceBatch.concat([binance, kraken])
+
+    # Binance's price is 10 minutes old by the end of the 5m bucket, too old for
+    # a 5 minute tolerance, so that bucket lacks a second source and is dropped
+    strict = ConsensusEngine(interval='5m', min_sources=2).reconcile(batch)
+    assert strict.timestamps.tolist() == [0]
+    assert strict.prices.tolist() == [101.0]
+
+    # A 15 minute tolerance carries it forward and fills the bucket
+    loose = ConsensusEngine(interval='5m', tolerance='15m', min_sources=2).reconcile(batch)
+    assert loose.timestamps.tolist() == [0, 5 * MINUTE]
+    assert loose.source_counts.tolist() == [2, 2]
+    assert loose.prices.tolist() == [101.0, 110.0]
+
+def test_processor_reconciles_only_mixed_batches():
+    processor = BTCProcessor(consensus=ConsensusEngine(interval='5m'))
+    single = PriceBatch.from_arrays([0, MINUTE], [1.0, 2.0], 'usd', 'binance')
+    assert processor.process_batch(single).prices.tolist() == [1.0, 2.0]
+
+    mixed = processor.process_batch(sources_batch())
+    assert len(mixed) == 3
+    rows = mixed.to_rows()
+    assert rows[0]['source_count'] == 3
+    assert np.isclose(rows[0]['spread'], 3.0)
@@ -0,0 +1,32 @@
+# tests/test_decoders.py
+import pytest
+from src.collectors.decoders import decode_market_chart, decode_klines, decode_ohlc
+from src.utils.exceptions import DecodeError
+
+def test_decode_exchange_payloads():
+    chart = decode_market_chart(b'{"prices": [[1700000000000, 35000.5], [1700000300000, 35010.0]], '
+                                b'"total_volumes": [[1700000000000, 1.0], [1700000300000, 2.0]]}')
+    assert chart.timestamps.tolist() == [1700000000000, 1700000300000]
+    assert chart.prices.tolist() == [35000.5, 35010.0]
+    assert chart.volumes.tolist() == [1.0, 2.0]
+
+    klines = decode_klines(b'[[1700000000000, "35000.0", "35100.0", "34900.0", "35050.0", "12.5", '
+                           b'1700003599999, "0", 10, "0", "0", "0"]]')
+    assert klines.timestamps.tolist() == [1700000000000]
+    assert klines.prices.tolist() == [35050.0]  # close price
+
+    ohlc = decode_ohlc(b'{"error": [], "result": {"XXBTZUSD": [[1700000000, "35000.0", "35100.0", '
+                       b'"34900.0", "35075.0", "35020.0", "3.2", 42]], "last": 1700000000}}')
+    assert ohlc.timestamps.tolist() == [1700000000000]
+    assert ohlc.prices.tolist() == [35075.0]
+    assert ohlc.cursor == 1700000000
+
+def test_decode_rejects_bad_schema():
+    with pytest.raises(DecodeError):
+        decode_klines(b'[[1700000000000, "35000.0"]]')  # too few fields
+    with pytest.raises(DecodeError):
+        decode_klines(b'[[1700000000000, "a", "b", "c", "not-a-price", "1"]]')
+    with pytest.raises(DecodeError):
+        decode_ohlc(b'{"error": ["EQuery:Unknown asset pair"], "result": {}}')
+    with pytest.raises(DecodeError):
+        decode_market_chart(b'{"error": "rate limited"}')
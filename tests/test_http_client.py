@@ -0,0 +1,54 @@
+# tests/test_http_client.py
+import asyncio
+import pytest
+from src.utils.http_client import SharedHTTPClient
+
+@pytest.mark.asyncio
+async def test_shared_session_reused_and_released():
+    client = SharedHTTPClient()
+    client.register()
+    client.register()
+
+    # Every caller gets the same pooled session
+    first = await client.get_session()
+    second = await client.get_session()
+    assert first is second
+
+    # Session stays open until the last user releases it
+    await client.release()
+    assert not first.closed
+    await client.release()
+    assert first.closed
+
+    # A later request transparently opens a new session
+    third = await client.get_session()
+    assert third is not first
+    await client.close()
+
+def test_session_of_previous_loop_is_closed():
+    client = SharedHTTPClient()
+    first = asyncio.run(client.get_session())
+    connector = first.connector
+
+    # A fresh asyncio.run gets its own session; the old one doesn't leak its connector
+    second = asyncio.run(client.get_session())
+    assert second is not first
+    assert first.closed
+    assert connector.closed
+    second.detach()
+
+def test_session_of_stopped_loop_is_closed_without_running_it():
+    client = SharedHTTPClient()
+    old_loop = asyncio.new_event_loop()
+    try:
+        first = old_loop.run_until_complete(client.get_session())
+        connector = first.connector
+
+        # The old loop is stopped but not closed; its session is closed from the new one
+        second = asyncio.run(client.get_session())
+        assert first.closed
+        assert connector.closed
+        assert not old_loop.is_running()
+        second.detach()
+    finally:
+        old_loop.close()
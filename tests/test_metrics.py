@@ -1,6 +1,8 @@
 # tests/test_metrics.py
 import pytest
-from src.utils.metrics import MetricsCollector
+import aiohttp
+from src.utils.metrics import MetricsCollector, MetricsRegistry
+from src.utils.metrics_server import MetricsServer
 from datetime import datetime
 
 def test_metrics():
@@ -16,3 +18,53 @@ def test_metrics():
     assert metrics.current_run.records_collected == 10
     assert metrics.current_run.retries == 2
     assert metrics.current_run.end_time > metrics.current_run.start_time
+
+def test_histogram_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('stage_seconds', 'Stage time', buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage='collect')
+    histogram.observe(0.5, stage='collect')
+    histogram.observe(5.0, stage='collect')
+
+    assert histogram.count(stage='collect') == 3
+    assert histogram.total(stage='collect') == pytest.approx(5.55)
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="collect",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="collect",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="collect",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="collect"} 3' in text
+
+def test_histogram_time_records_failures():
+    histogram = MetricsRegistry().histogram('stage_seconds', 'Stage time')
+    with pytest.raises(ValueError):
+        with histogram.time(stage='store'):
+            raise ValueError("boom")
+    assert histogram.count(stage='store') == 1
+
+def test_counter_gauge_and_textfile(tmp_path):
+    registry = MetricsRegistry()
+    rows = registry.counter('rows_written_total', 'Rows written')
+    rows.inc(5, outcome='inserted')
+    rows.inc(2, outcome='inserted')
+    registry.gauge('records_per_second', 'Throughput').set(12.5, pipeline='btc')
+
+    path = tmp_path / 'metrics' / 'platform.prom'
+    registry.write_textfile(str(path))
+    text = path.read_text()
+    assert 'rows_written_total{outcome="inserted"} 7' in text
+    assert 'records_per_second{pipeline="btc"} 12.5' in text
+
+@pytest.mark.asyncio
+async def test_metrics_server():
+    registry = MetricsRegistry()
+    registry.counter('runs_total', 'Runs').inc(status='success')
+    server = MetricsServer(registry, port=0)
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f'http://127.0.0.1:{server.port}/metrics') as response:
+                assert response.status == 200
+                assert 'runs_total{status="success"} 1' in await response.text()
+    finally:
+        await server.stop()
@@ -0,0 +1,70 @@
+# tests/test_pdf_reports.py
+import io
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from src.collectors.base import extract_pdf_text
+from src.collectors.rpa_collector import RPACollector
+from src.config.settings import settings
+
+def make_pdf(text: str) -> bytes:
+    """Smallest single-page PDF that PyPDF2 extracts `text` from"""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+@pytest_asyncio.fixture
+async def report_server(serve_app):
+    reports = {'/a.pdf': make_pdf("BTC volume 42"), '/b.pdf': make_pdf("BTC volume 42"), '/c.pdf': make_pdf("ETH")}
+
+    async def handler(request):
+        if request.path not in reports:
+            raise web.HTTPNotFound()
+        return web.Response(body=reports[request.path], content_type='application/pdf')
+
+    app = web.Application()
+    app.router.add_get('/{name}', handler)
+    return await serve_app(app)
+
+def test_extract_pdf_text():
+    assert extract_pdf_text(io.BytesIO(make_pdf("BTC volume 42"))) == "BTC volume 42"
+
+@pytest.mark.asyncio
+async def test_pdf_reports_cached_by_content(report_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'PDF_CACHE_DIR', str(tmp_path))
+    collector = RPACollector()
+    try:
+        first = await collector.collectPDFReports([f"{report_server}/a.pdf", f"{report_server}/c.pdf",
+                                                   f"{report_server}/missing.pdf"])
+        assert [r.data['status'] for r in first] == ['success', 'success', 'failed']
+        assert first[0].data['content'] == "BTC volume 42"
+        assert first[1].data['content'] == "ETH"
+
+        # Same bytes under another URL are served from the cache
+        second = await collector.collectPDFReports([f"{report_server}/b.pdf"])
+        assert second[0].data['cached']
+        assert second[0].data['content'] == "BTC volume 42"
+        assert second[0].data['content_hash'] == first[0].data['content_hash']
+    finally:
+        await collector.cleanup()
+
+    # Cache entries survive a restart
+    assert len(list(tmp_path.glob('*.txt'))) == 2
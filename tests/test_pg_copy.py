@@ -0,0 +1,160 @@
+# tests/test_pg_copy.py
+import struct
+from contextlib import asynccontextmanager
+import pytest
+from datetime import datetime, timezone
+from src.collectors.price_batch import PriceBatch
+from src.storage.bulk_writer import StagedCopyWriter
+from src.storage.models import BTCPrice
+from src.storage.pg_copy import HEADER, encode_price_batch, encode_rows, price_columns
+from src.storage.price_writer import PriceWriter
+
+PG_EPOCH = datetime(2000, 1, 1)
+
+def parse_copy(payload: bytes):
+    """Minimal reader for the binary COPY format: list of rows of raw field bytes (None for NULL)"""
+    assert payload.startswith(HEADER)
+    offset, rows = len(HEADER), []
+    while True:
+        (count,) = struct.unpack_from('>h', payload, offset)
+        offset += 2
+        if count == -1:
+            assert offset == len(payload)
+            return rows
+        row = []
+        for _ in range(count):
+            (length,) = struct.unpack_from('>i', payload, offset)
+            offset += 4
+            if length == -1:
+                row.append(None)
+                continue
+            row.append(payload[offset:offset + length])
+            offset += length
+        rows.append(row)
+
+def as_timestamp(field: bytes) -> int:
+    """Binary timestamp -> epoch milliseconds"""
+    (micros,) = struct.unpack('>q', field)
+    return micros // 1000 + 946_684_800_000
+
+def test_encode_price_batch():
+    usd = PriceBatch.from_arrays([1_700_000_000_000, 1_700_000_060_000], [50000.5, 50001.0], 'usd', 'binance',
+                                 collected_at=1_700_000_100_000)
+    eur = PriceBatch.from_arrays([1_700_000_000_000], [46000.0], 'eur', 'binance', collected_at=1_700_000_100_000)
+    batch = PriceBatch.concat([usd, eur])
+
+    assert price_columns(batch) == ['price', 'currency', 'price_timestamp', 'collected_at']
+    rows = parse_copy(encode_price_batch(batch))
+    decoded = sorted(
+        (row[1].decode(), as_timestamp(row[2]), struct.unpack('>d', row[0])[0], as_timestamp(row[3]))
+        for row in rows
+    )
+    assert decoded == [
+        ('eur', 1_700_000_000_000, 46000.0, 1_700_000_100_000),
+        ('usd', 1_700_000_000_000, 50000.5, 1_700_000_100_000),
+        ('usd', 1_700_000_060_000, 50001.0, 1_700_000_100_000),
+    ]
+
+def test_encode_consensus_columns():
+    batch = PriceBatch.from_arrays([0], [1.0], 'usd', 'consensus')
+    batch.spreads = batch.prices * 0 + 2.5
+    batch.source_counts = batch.currencies * 0 + 3
+
+    rows = parse_copy(encode_price_batch(batch))
+    assert len(rows[0]) == len(price_columns(batch)) == 6
+    assert struct.unpack('>d', rows[0][4])[0] == 2.5
+    assert struct.unpack('>i', rows[0][5])[0] == 3
+
+def test_encode_rows():
+    published = datetime(2024, 1, 2, 3, 4, 5, 600)
+    rows = parse_copy(encode_rows([
+        ['Title', None, 'https://x', published, 'feed', datetime(2024, 1, 2, 4, 4, 5, 600, tzinfo=timezone.utc)]
+    ]))
+    title, summary, link, published_at, source, collected_at = rows[0]
+    assert title == b'Title' and summary is None and source == b'feed'
+    expected = int((published - PG_EPOCH).total_seconds()) * 1_000_000 + 600
+    assert struct.unpack('>q', published_at)[0] == expected
+    assert struct.unpack('>q', collected_at)[0] == expected + 3_600_000_000
+
+class _RecordingCopyWriter:
+    def __init__(self):
+        self.chunks = []
+
+    def write_chunk(self, columns, payload, rows):
+        self.chunks.append(len(parse_copy(payload)))
+        return rows - 1, 1
+
+    async def write_chunk_async(self, columns, payload, rows):
+        return self.write_chunk(columns, payload, rows)
+
+def test_price_writer_chunks():
+    writer = PriceWriter(db=None, chunk_size=2)
+    writer.copy_writer = _RecordingCopyWriter()
+
+    batch = PriceBatch.from_arrays(list(range(0, 5000, 1000)), [1.0] * 5, 'usd', 'binance')
+    assert writer.write(batch) == (2, 3)
+    assert writer.copy_writer.chunks == [2, 2, 1]
+
+@pytest.mark.asyncio
+async def test_price_writer_chunks_async():
+    writer = PriceWriter(db=None, chunk_size=2)
+    writer.copy_writer = _RecordingCopyWriter()
+
+    batch = PriceBatch.from_arrays(list(range(0, 5000, 1000)), [1.0] * 5, 'usd', 'binance')
+    assert await writer.write_async(batch) == (2, 3)
+    assert writer.copy_writer.chunks == [2, 2, 1]
+
+class _FakeAsyncpg:
+    """asyncpg connection with an ON COMMIT DELETE ROWS staging table: outside a transaction every call commits"""
+    def __init__(self):
+        self.in_transaction = False
+        self.staged = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+            self.staged = 0
+
+    async def execute(self, sql):
+        if sql.startswith('INSERT'):
+            return f"INSERT 0 {self.staged}"
+        return "CREATE TABLE"
+
+    async def copy_to_table(self, table, source, columns, format):
+        if self.in_transaction:
+            self.staged += len(parse_copy(source.read()))
+
+class _FakeAsyncDb:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @asynccontextmanager
+    async def get_session(self):
+        driver = self.driver
+
+        class Raw:
+            driver_connection = driver
+
+        class Connection:
+            async def get_raw_connection(self):
+                return Raw()
+
+        class Session:
+            async def connection(self):
+                return Connection()
+
+            async def commit(self):
+                pass
+
+        yield Session()
+
+@pytest.mark.asyncio
+async def test_async_copy_merges_inside_one_transaction():
+    writer = StagedCopyWriter(None, BTCPrice.__table__, ['price_timestamp', 'currency'],
+                              async_db=_FakeAsyncDb(_FakeAsyncpg()))
+    batch = PriceBatch.from_arrays([0, 1000, 2000], [1.0] * 3, 'usd', 'binance')
+    assert await writer.write_chunk_async(price_columns(batch), encode_price_batch(batch), 3) == (3, 0)
@@ -2,8 +2,13 @@
 import asyncio
 import pytest
 import os
+import time
+from datetime import datetime, timedelta, timezone
+from src.collectors.price_batch import PriceBatch, to_ms
+from src.collectors.btc_collector import PriceCollector
 from src.pipelines.btc_pipeline import BTCPipeline
 from src.config.settings import settings
+from src.utils.metrics import RUNS_TOTAL
 
 @pytest.mark.asyncio
 async def test_btc_pipeline():
@@ -37,6 +42,120 @@ async def test_btc_pipeline():
     for record in records[:5]:
         print(f"{record}")
 
+
+class _SlowCollector(PriceCollector):
+    def __init__(self, name: str, fail: bool = False) -> None:
+        super().__init__(name=name)
+        self.fail = fail
+
+    async def fetch_currency(self, currency: str, days: int = 14, since=None):
+        await asyncio.sleep(0.2)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return PriceBatch.from_arrays([1_700_000_000_000], [50_000.0], currency=currency, source=self.name)
+
+@pytest.mark.asyncio
+async def test_concurrent_collection():
+    pipeline = BTCPipeline()
+    pipeline.collectors = {
+        'a': _SlowCollector('a'),
+        'b': _SlowCollector('b'),
+        'broken': _SlowCollector('broken', fail=True)
+    }
+
+    start = time.monotonic()
+    records = await pipeline.collect_concurrently(['a', 'b', 'broken'], days=1)
+    elapsed = time.monotonic() - start
+
+    # All fetches overlap, and the broken source doesn't cancel the others
+    assert elapsed < 0.6, f"Fetches were not concurrent ({elapsed:.2f}s)"
+    assert len(records) == 2 * len(settings.SUPPORTED_CURRENCIES)
+    assert pipeline.error_tracker.get_error_summary()['collection_broken'] == len(settings.SUPPORTED_CURRENCIES)
+    await pipeline.close()
+
+class _WindowCollector(PriceCollector):
+    """Hourly prices, 24 per window, with one missing day"""
+    max_window_points = 24
+
+    def __init__(self) -> None:
+        super().__init__(name='binance')
+        self.fetched = 0
+
+    async def fetch_window(self, currency, start, end, interval='1h'):
+        self.fetched += 1
+        hours = int((end - start) / timedelta(hours=1))
+        timestamps = [to_ms(start + timedelta(hours=h)) for h in range(hours) if (start + timedelta(hours=h)).day != 3]
+        return PriceBatch.from_arrays(timestamps, [50_000.0] * len(timestamps), currency=currency, source=self.name)
+
+class _RecordingStorage:
+    def __init__(self):
+        self.batches = []
+
+    async def ensure_schema(self):
+        pass
+
+    async def write_prices(self, batch):
+        self.batches.append(len(batch))
+        return len(batch), 0
+
+    async def update_watermarks(self, watermarks):
+        pass
+
+class _QualityStub:
+    def __init__(self):
+        self.reports = []
+
+    def submit(self, report, source):
+        self.reports.append((source, len(report.checks)))
+
+    def stats(self):
+        return {}
+
+    async def close(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_streaming_run():
+    pipeline = BTCPipeline()
+    collector = _WindowCollector()
+    pipeline.collectors = {'binance': collector}
+    pipeline.storage = _RecordingStorage()
+    pipeline.quality_writer = _QualityStub()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    stats = await pipeline.run_streaming(start, start + timedelta(days=5), sources=['binance'], interval='1h')
+
+    currencies = len(settings.SUPPORTED_CURRENCIES)
+    # Day 3 comes back empty and is never queued
+    assert collector.fetched == 5 * currencies
+    assert stats.batches_written == 4 * currencies
+    assert stats.rows_inserted == sum(pipeline.storage.batches) == 4 * 24 * currencies
+    assert stats.first_write_seconds is not None
+    # Every batch is quality-checked and its results submitted
+    assert len(pipeline.quality_writer.reports) == 4 * currencies
+    assert {source for source, _ in pipeline.quality_writer.reports} == {
+        f"btc_price_{currency}" for currency in settings.SUPPORTED_CURRENCIES
+    }
+    await pipeline.close()
+
+class _BrokenStorage(_RecordingStorage):
+    async def write_prices(self, batch):
+        raise ValueError("rejected by the database")
+
+@pytest.mark.asyncio
+async def test_failed_streaming_run_is_recorded():
+    pipeline = BTCPipeline()
+    pipeline.collectors = {'binance': _WindowCollector()}
+    pipeline.storage = _BrokenStorage()
+    pipeline.quality_writer = _QualityStub()
+    failures = RUNS_TOTAL.get(pipeline='btc_streaming', status='failure')
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        await pipeline.run_streaming(start, start + timedelta(days=2), sources=['binance'], interval='1h')
+    assert RUNS_TOTAL.get(pipeline='btc_streaming', status='failure') == failures + 1
+    assert pipeline.error_tracker.get_error_summary()['pipeline'] == 1
+    await pipeline.close()
+
 if __name__ == "__main__":
     asyncio.run(test_btc_pipeline())
-    
@@ -0,0 +1,45 @@
+# tests/test_price_batch.py
+import numpy as np
+from datetime import datetime, timezone
+from src.collectors.price_batch import PriceBatch
+
+def test_price_batch_columns():
+    usd = PriceBatch.from_arrays([1000, 2000, 3000], [50000.0, 50100.0, 50200.0], currency='usd', source='binance')
+    eur = PriceBatch.from_arrays([1000, 2000], [46000.0, 46100.0], currency='eur', source='kraken')
+    batch = PriceBatch.concat([usd, eur])
+
+    assert len(batch) == 5
+    assert batch.timestamps.dtype == np.int64
+    assert batch.prices.dtype == np.float64
+    # 8 + 8 + 1 + 1 bytes per point
+    assert batch.nbytes == 5 * 18
+
+    eur_only = batch.for_currency('eur')
+    assert eur_only.prices.tolist() == [46000.0, 46100.0]
+    assert len(batch.newer_than(1500)) == 3
+
+    latest = batch.latest_by_key()
+    assert latest[('binance', 'usd')] == datetime.fromtimestamp(3, timezone.utc)
+    assert latest[('kraken', 'eur')] == datetime.fromtimestamp(2, timezone.utc)
+
+    rows = batch.to_rows()
+    assert rows[0]['currency'] == 'usd'
+    assert rows[0]['price_timestamp'] == datetime(1970, 1, 1, 0, 0, 1)
+
+    points = list(batch[:2])
+    assert points[0].source == 'binance'
+    assert points[1].price == 50100.0
+
+def test_price_batch_bytes_roundtrip():
+    batch = PriceBatch.concat([
+        PriceBatch.from_arrays([1000, 2000], [50000.0, 50100.0], currency='usd', source='binance', volumes=[1.5, 2.5]),
+        PriceBatch.from_arrays([1000], [46000.0], currency='eur', source='kraken', collected_at=5000)
+    ])
+    restored = PriceBatch.from_bytes(batch.to_bytes())
+
+    assert restored.collected_at == batch.collected_at
+    assert restored.timestamps.tolist() == batch.timestamps.tolist()
+    assert restored.prices.tolist() == batch.prices.tolist()
+    assert [point.currency for point in restored] == ["usd", "usd", "eur"]
+    assert np.array_equal(restored.volumes, batch.volumes, equal_nan=True)
+    assert restored.spreads is None
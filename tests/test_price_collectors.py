@@ -0,0 +1,78 @@
+# tests/test_price_collectors.py
+from datetime import datetime, timezone
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from src.collectors.btc_collector import BinanceCollector, CoinGeckoCollector, KrakenCollector
+from src.utils.request_cache import response_cache
+from src.utils.source_health import SourceHealthRegistry
+
+SINCE = datetime(2024, 1, 10, tzinfo=timezone.utc)
+SINCE_S = int(SINCE.timestamp())
+NEXT_S = SINCE_S + 86400
+
+@pytest_asyncio.fixture
+async def exchange(serve_app):
+    """Fake exchange APIs that record the query of every request and return one candle at and one after SINCE"""
+    queries = []
+
+    async def klines(request):
+        queries.append(dict(request.query))
+        return web.json_response([
+            [SINCE_S * 1000, "1", "1", "1", "42000.0", "10"],
+            [NEXT_S * 1000, "1", "1", "1", "43000.0", "12"]
+        ])
+
+    async def ohlc(request):
+        queries.append(dict(request.query))
+        return web.json_response({"error": [], "result": {
+            "XXBTZUSD": [
+                [SINCE_S, "1", "1", "1", "42000.0", "1", "10", 5],
+                [NEXT_S, "1", "1", "1", "43000.0", "1", "12", 5]
+            ],
+            "last": NEXT_S
+        }})
+
+    async def market_chart(request):
+        queries.append(dict(request.query))
+        return web.json_response({"prices": [[SINCE_S * 1000, 42000.0], [NEXT_S * 1000, 43000.0]]})
+
+    app = web.Application()
+    app.router.add_get('/klines', klines)
+    app.router.add_get('/OHLC', ohlc)
+    app.router.add_get('/coins/bitcoin/market_chart/range', market_chart)
+    url = await serve_app(app)
+    yield url, queries
+    response_cache.clear()
+
+async def fetch_since(collector, url):
+    collector.base_url = url
+    collector.health = SourceHealthRegistry().get(collector.name)  # other tests may have opened the shared circuit
+    try:
+        return await collector.fetch_currency('usd', since=SINCE)
+    finally:
+        await collector.cleanup()
+
+@pytest.mark.asyncio
+async def test_binance_resumes_after_watermark(exchange):
+    url, queries = exchange
+    batch = await fetch_since(BinanceCollector(), url)
+    assert queries == [{'symbol': 'BTCUSD', 'interval': '1d', 'limit': '1000', 'startTime': str(SINCE_S * 1000 + 1)}]
+    assert batch.timestamps.tolist() == [NEXT_S * 1000]
+
+@pytest.mark.asyncio
+async def test_kraken_resumes_after_watermark(exchange):
+    url, queries = exchange
+    batch = await fetch_since(KrakenCollector(), url)
+    assert queries == [{'pair': 'XBTUSD', 'interval': '1440', 'since': str(SINCE_S)}]
+    assert batch.timestamps.tolist() == [NEXT_S * 1000]
+
+@pytest.mark.asyncio
+async def test_coingecko_resumes_after_watermark(exchange):
+    url, queries = exchange
+    batch = await fetch_since(CoinGeckoCollector(), url)
+    assert len(queries) == 1
+    assert queries[0]['vs_currency'] == 'usd'
+    assert queries[0]['from'] == str(SINCE_S + 1)
+    assert int(queries[0]['to']) >= NEXT_S
+    assert batch.timestamps.tolist() == [NEXT_S * 1000]
@@ -0,0 +1,44 @@
+# tests/test_processor.py
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from src.collectors.base import DataRecord
+from src.collectors.price_batch import PriceBatch
+from src.processors.btc_processor import BTCProcessor
+
+def test_process_batch_sorts_and_drops_duplicates():
+    processor = BTCProcessor()
+    binance = PriceBatch.from_arrays([3000, 1000, 2000], [3.0, 1.0, 2.0], currency='usd', source='binance')
+    kraken = PriceBatch.from_arrays([2000, 4000], [20.0, 4.0], currency='usd', source='kraken')
+    eur = PriceBatch.from_arrays([2000], [9.0], currency='eur', source='kraken')
+    raw = PriceBatch.concat([binance, kraken, eur])
+    raw_timestamps = raw.timestamps.copy()
+
+    batch = processor.process_batch(raw)
+
+    assert batch.timestamps.tolist() == [1000, 2000, 2000, 3000, 4000]
+    # The first source in the batch wins a (timestamp, currency) clash
+    assert batch.for_currency('usd').prices.tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert batch.for_currency('eur').prices.tolist() == [9.0]
+    assert processor.duplicates_dropped == 1
+    assert all(column.flags['C_CONTIGUOUS'] for column in (batch.timestamps, batch.prices, batch.currencies))
+    # Input left untouched
+    assert np.array_equal(raw.timestamps, raw_timestamps)
+
+def test_process_records_normalizes_to_utc():
+    processor = BTCProcessor()
+    cet = timezone(timedelta(hours=1))
+    records = [
+        DataRecord(source='rpa', data={'price': 2.0, 'currency': 'usd',
+                                       'timestamp': datetime(2024, 1, 1, 1, 0, tzinfo=cet)},
+                   timestamp=datetime.now(timezone.utc)),
+        DataRecord(source='rpa', data={'price': 1.0, 'currency': 'usd', 'timestamp': datetime(2024, 1, 1, 0, 0)},
+                   timestamp=datetime.now(timezone.utc)),
+        DataRecord(source='rpa', data={'type': 'pdf_report'}, timestamp=datetime.now(timezone.utc)),
+    ]
+
+    batch = processor.process_records(records)
+
+    # Both name the same instant in UTC, so only the first one is kept
+    assert len(batch) == 1
+    assert batch.prices.tolist() == [2.0]
+    assert batch.datetimes() == [datetime(2024, 1, 1, 0, 0)]
@@ -0,0 +1,66 @@
+# tests/test_quality_writer.py
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from src.storage.quality_writer import QualityResultWriter, quality_rows
+from src.validators.validators import QualityCheck, QualityReport
+
+START = datetime(2024, 1, 1)
+
+def gap_check(minute: int) -> QualityCheck:
+    return QualityCheck(
+        name='time_gap', passed=False, message=f"Large time gap at {minute}",
+        details={'timestamp': START + timedelta(minutes=minute), 'gap': '0:15:00'}
+    )
+
+def make_report(gaps: int) -> QualityReport:
+    checks = [QualityCheck(name='data_volume', passed=True, message="ok")]
+    checks += [gap_check(15 * i) for i in range(gaps)]
+    checks.append(QualityCheck(name='price_range', passed=True, message="ok"))
+    return QualityReport(timestamp=START, source='price_data', checks=checks)
+
+def test_runs_of_failures_are_compressed():
+    rows = quality_rows(make_report(gaps=40), source='btc_price_usd')
+    assert [row['check_name'] for row in rows] == ['data_volume', 'time_gap', 'price_range']
+
+    gaps = rows[1]
+    assert not gaps['passed']
+    assert gaps['message'].startswith("40 failed time_gap checks")
+    assert gaps['details']['occurrences'] == 40
+    assert gaps['details']['first_timestamp'] == START.isoformat()
+    assert gaps['details']['last_timestamp'] == (START + timedelta(minutes=15 * 39)).isoformat()
+
+def test_single_failure_keeps_its_details():
+    rows = quality_rows(make_report(gaps=1), source='btc_price_usd')
+    assert rows[1]['message'] == "Large time gap at 0"
+    assert rows[1]['details'] == {'timestamp': START.isoformat(), 'gap': '0:15:00'}
+
+class _RecordingWriter(QualityResultWriter):
+    def __init__(self, **kwargs):
+        super().__init__(storage=None, **kwargs)
+        self.batches = []
+
+    async def _write(self, rows):
+        await asyncio.sleep(0.01)
+        self.batches.append(len(rows))
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_batches():
+    writer = _RecordingWriter(batch_size=4, flush_interval=0.05)
+    for _ in range(3):
+        assert writer.submit(make_report(gaps=5), source='btc_price_usd') == 3
+
+    await writer.close()
+    assert sum(writer.batches) == 9
+    assert max(writer.batches) <= 4
+    assert writer.stats()['written'] == 9
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking():
+    writer = _RecordingWriter(max_queue=2, flush_interval=0.05)
+    assert writer.submit(make_report(gaps=0), source='btc_price_usd') == 2
+    assert writer.submit(make_report(gaps=0), source='btc_price_usd') == 0
+    assert writer.dropped == 2
+
+    await writer.close()
+    assert writer.written == 2
@@ -1,7 +1,8 @@
 # tests/test_rate_limiter.py
 import pytest
 import asyncio
-from src.utils.rate_limiter import RateLimiter
+import time
+from src.utils.rate_limiter import RateLimiter, TokenBucket, RateLimiterRegistry, host_key
 from datetime import datetime, timedelta
 
 @pytest.mark.asyncio
@@ -18,4 +19,42 @@ async def test_rate_limiter():
     # Third call should wait
     await limiter.wait_if_needed()
     duration = datetime.now() - start
-    assert duration.total_seconds() >= 60, "Rate limit not enforced"
\ No newline at end of file
+    assert duration.total_seconds() >= 60, "Rate limit not enforced"
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst_and_spacing():
+    # 600 calls/minute = one token every 0.1s, burst of 3
+    bucket = TokenBucket(calls_per_minute=600, capacity=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.wait_if_needed()
+    assert time.monotonic() - start < 0.05, "Burst should not wait"
+
+    await bucket.wait_if_needed()
+    await bucket.wait_if_needed()
+    elapsed = time.monotonic() - start
+    assert 0.15 <= elapsed < 0.4, f"Calls past the burst should be spaced ({elapsed:.2f}s)"
+    assert bucket.stats()['calls'] == 5
+    assert bucket.total_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_holds_back_all_waiters():
+    bucket = TokenBucket(calls_per_minute=6000, capacity=1)
+    await bucket.wait_if_needed()
+
+    # A 429 seen by one caller delays everybody using the bucket
+    bucket.penalize(0.3)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.wait_if_needed() for _ in range(3)))
+    assert time.monotonic() - start >= 0.3, "Retry-After not respected"
+
+
+def test_registry_shares_limiter_per_host():
+    registry = RateLimiterRegistry()
+    first = registry.get(host_key("https://api.binance.com/api/v3/klines"), calls_per_minute=10)
+    second = registry.get(host_key("https://api.binance.com/api/v3/ticker"), calls_per_minute=10)
+    other = registry.get(host_key("https://api.kraken.com/0/public/OHLC"), calls_per_minute=10)
+    assert first is second
+    assert first is not other
@@ -0,0 +1,122 @@
+# tests/test_request_cache.py
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from src.collectors.base import BaseCollector
+from src.utils.request_cache import ResponseCache, request_key, response_cache
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_fetch():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {'price': 1}
+
+    results = await asyncio.gather(*(cache.get_or_fetch('key', fetch) for _ in range(5)))
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()['coalesced'] == 4
+
+    # Served from cache while fresh
+    await cache.get_or_fetch('key', fetch)
+    assert calls == 1
+    assert cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_but_not_cached():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(cache.get_or_fetch('key', fetch) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+
+    with pytest.raises(ValueError):
+        await cache.get_or_fetch('key', fetch)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_cancelling_first_caller_keeps_shared_fetch():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {'price': 1}
+
+    first = asyncio.create_task(cache.get_or_fetch('key', fetch))
+    await asyncio.sleep(0)  # the first caller starts the fetch
+    second = asyncio.create_task(cache.get_or_fetch('key', fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == {'price': 1}
+    assert first.cancelled()
+    assert calls == 1
+    # The fetch finished without its starter and was cached
+    assert await cache.get_or_fetch('key', fetch) == {'price': 1}
+    assert cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+
+    async def value(v):
+        return v
+
+    await cache.get_or_fetch('a', lambda: value(1))
+    await cache.get_or_fetch('b', lambda: value(2))
+    await cache.get_or_fetch('a', lambda: value(0))  # refreshes 'a'
+    await cache.get_or_fetch('c', lambda: value(3))  # evicts 'b', the least recently used
+    assert cache.evictions == 1
+    assert await cache.get_or_fetch('b', lambda: value(20)) == 20
+
+    await asyncio.sleep(0.06)
+    assert await cache.get_or_fetch('a', lambda: value(10)) == 10
+
+def test_request_key_ignores_param_order():
+    assert request_key('u', {'a': 1, 'b': 2}, 'json') == request_key('u', {'b': 2, 'a': 1}, 'json')
+    assert request_key('u', {'a': 1}, 'json') != request_key('u', {'a': 1}, 'decode_klines')
+
+@pytest_asyncio.fixture
+async def counting_server(serve_app):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.query_string)
+        await asyncio.sleep(0.05)
+        return web.json_response({'price': 42})
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    return (await serve_app(app)) + "/", calls
+
+@pytest.mark.asyncio
+async def test_make_request_coalesces(counting_server):
+    url, calls = counting_server
+    first, second = BaseCollector(name='coalesce_a'), BaseCollector(name='coalesce_b')
+    try:
+        results = await asyncio.gather(
+            first._make_request(url, params={'days': 1}),
+            second._make_request(url, params={'days': 1}),
+            first._make_request(url, params={'days': 2})
+        )
+        assert [r['price'] for r in results] == [42, 42, 42]
+        assert len(calls) == 2
+    finally:
+        response_cache.clear()
+        await first.cleanup()
+        await second.cleanup()
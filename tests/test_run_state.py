@@ -0,0 +1,146 @@
+# tests/test_run_state.py
+import pytest
+from src.collectors.btc_collector import PriceCollector
+from src.collectors.price_batch import PriceBatch
+from src.pipelines.btc_pipeline import BTCPipeline
+from src.storage.run_state import RunStateStore
+from src.validators.price_validator import PriceValidator, ValidationThresholds
+from src.config.settings import settings
+
+def test_store_roundtrip(tmp_path):
+    store = RunStateStore(str(tmp_path / "runs.sqlite3"))
+    assert store.get('run-1', 'binance:usd', 'raw') is None
+
+    store.put('run-1', 'binance:usd', 'raw', b'payload')
+    store.put('run-1', 'usd', 'validated')
+    assert store.get('run-1', 'binance:usd', 'raw') == b'payload'
+    assert store.get('run-1', 'usd', 'validated') == b''
+    assert store.get('run-2', 'binance:usd', 'raw') is None
+
+    # Checkpoints survive reopening, until the run is cleared
+    reopened = RunStateStore(str(tmp_path / "runs.sqlite3"))
+    assert reopened.get('run-1', 'binance:usd', 'raw') == b'payload'
+    reopened.clear('run-1')
+    assert reopened.get('run-1', 'binance:usd', 'raw') is None
+
+def test_stale_checkpoints_pruned(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    RunStateStore(path).put('old', 'all', 'written')
+    assert RunStateStore(path, ttl=-1).get('old', 'all', 'written') is None
+
+class _CountingCollector(PriceCollector):
+    def __init__(self):
+        super().__init__(name='binance')
+        self.calls = 0
+
+    async def fetch_currency(self, currency, days=14, since=None):
+        self.calls += 1
+        return PriceBatch.from_arrays([1_700_000_000_000, 1_700_000_060_000], [50_000.0, 50_010.0],
+                                      currency=currency, source=self.name)
+
+class _FlakyStorage:
+    def __init__(self):
+        self.attempts = 0
+
+    async def ensure_schema(self):
+        pass
+
+    async def write_prices(self, batch):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise ConnectionError("database went away")
+        return len(batch), 0
+
+    async def update_watermarks(self, watermarks):
+        pass
+
+class _Stub:
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, report, source):
+        self.calls += 1
+
+    def stats(self):
+        return {}
+
+    async def close(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_retry_resumes_after_failed_write(tmp_path):
+    pipeline = BTCPipeline()
+    collector = _CountingCollector()
+    pipeline.collectors = {'binance': collector}
+    pipeline.storage = _FlakyStorage()
+    pipeline.quality_writer = _Stub()
+    pipeline._run_state = RunStateStore(str(tmp_path / "runs.sqlite3"))
+
+    with pytest.raises(ConnectionError):
+        await pipeline.run(sources=['binance'], concurrent=True, run_id='run-1')
+    currencies = len(settings.SUPPORTED_CURRENCIES)
+    assert collector.calls == currencies
+    assert pipeline.quality_writer.calls == currencies
+
+    # The retry only repeats the write
+    records = await pipeline.run(sources=['binance'], concurrent=True, run_id='run-1')
+    assert len(records) == 2 * currencies
+    assert collector.calls == currencies
+    assert pipeline.quality_writer.calls == currencies
+    assert pipeline.storage.attempts == 2
+
+    # A finished run leaves nothing behind
+    assert pipeline.run_state.get('run-1', 'all', 'processed') is None
+
+class _FlakyCurrencyCollector(_CountingCollector):
+    """Fails 'eur' on its first fetch"""
+    async def fetch_currency(self, currency, days=14, since=None):
+        if currency == 'eur' and not getattr(self, 'eur_failed', False):
+            self.eur_failed = True
+            raise ConnectionError("exchange went away")
+        return await super().fetch_currency(currency, days, since)
+
+class _RecordingStorage(_FlakyStorage):
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+        self.watermarks = {}
+
+    async def write_prices(self, batch):
+        written = await super().write_prices(batch)
+        self.rows += len(batch)
+        return written
+
+    async def update_watermarks(self, watermarks):
+        self.watermarks.update(watermarks)
+
+@pytest.mark.asyncio
+async def test_retry_writes_refetched_data(tmp_path):
+    pipeline = BTCPipeline()
+    pipeline.collectors = {'binance': _FlakyCurrencyCollector()}
+    pipeline.storage = _RecordingStorage()
+    pipeline.validator = PriceValidator(ValidationThresholds(min_data_points=2))
+    pipeline.quality_writer = _Stub()
+    pipeline._run_state = RunStateStore(str(tmp_path / "runs.sqlite3"))
+
+    with pytest.raises(ConnectionError):
+        await pipeline.run(sources=['binance'], concurrent=True, run_id='run-1')
+
+    # The retry fetches eur again, and that data is processed and written rather than replayed away
+    await pipeline.run(sources=['binance'], concurrent=True, run_id='run-1')
+    assert pipeline.storage.rows == 2 * len(settings.SUPPORTED_CURRENCIES)
+    assert {currency for _, currency, _ in pipeline.storage.watermarks} == set(settings.SUPPORTED_CURRENCIES)
+
+@pytest.mark.asyncio
+async def test_invalid_currencies_keep_their_watermarks(tmp_path):
+    pipeline = BTCPipeline()
+    pipeline.collectors = {'binance': _CountingCollector()}
+    pipeline.storage = _RecordingStorage()
+    pipeline.storage.attempts = 1  # no failed write
+    pipeline.quality_writer = _Stub()
+    pipeline.validator = PriceValidator(ValidationThresholds(min_data_points=3))
+
+    # Not strict, so two points per currency are still stored, but the next run fetches them again
+    await pipeline.run(sources=['binance'], concurrent=True)
+    assert pipeline.storage.rows == 2 * len(settings.SUPPORTED_CURRENCIES)
+    assert pipeline.storage.watermarks == {}
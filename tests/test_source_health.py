@@ -0,0 +1,119 @@
+# tests/test_source_health.py
+import asyncio
+import pytest
+import aiohttp
+import pytest_asyncio
+from aiohttp import web
+from src.collectors.base import BaseCollector
+from src.utils.exceptions import CircuitOpenError
+from src.utils.source_health import SourceHealth, CLOSED, OPEN, HALF_OPEN
+
+def make_health(**kwargs):
+    options = dict(failure_threshold=3, reset_timeout=0.1, target_latency=1.0, min_limit=1, max_limit=4,
+                   initial_limit=1)
+    options.update(kwargs)
+    return SourceHealth('test', **options)
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_recovers_through_probe():
+    health = make_health()
+    for _ in range(3):
+        async with health.slot():
+            health.record_failure(0.01)
+    assert health.state == OPEN
+
+    # Open circuit rejects immediately
+    with pytest.raises(CircuitOpenError):
+        async with health.slot():
+            pass
+    assert health.rejected == 1
+
+    # After the reset timeout one probe is allowed; its success closes the circuit
+    await asyncio.sleep(0.15)
+    async with health.slot():
+        assert health.state == HALF_OPEN
+        assert health.is_open()  # only the probe gets through
+        health.record_success(0.01)
+    assert health.state == CLOSED
+
+def test_aimd_limit():
+    health = make_health()
+    for _ in range(20):
+        health.record_success(0.01)
+    assert health.limit == 4  # capped at max_limit
+
+    health.record_success(5.0)  # slower than target
+    assert health.limit == 2
+    health.record_failure(0.01)  # within the decrease cooldown: no second halving
+    assert health.limit == 2
+
+    assert health.percentile(50) == pytest.approx(0.01)
+    assert health.error_rate == pytest.approx(1 / 22)
+
+@pytest.mark.asyncio
+async def test_slot_limits_in_flight():
+    health = make_health(initial_limit=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with health.slot():
+            peak = max(peak, health.in_flight)
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
+
+@pytest_asyncio.fixture
+async def failing_server(serve_app):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    return (await serve_app(app)) + "/", calls
+
+@pytest.mark.asyncio
+async def test_make_request_fails_fast_once_circuit_opens(failing_server):
+    url, calls = failing_server
+    collector = BaseCollector(name='degraded_source')
+    collector.health.failure_threshold = 2
+    try:
+        with pytest.raises(Exception):
+            await collector._make_request(url)
+        assert collector.health.state == OPEN
+        assert collector.retries == 1
+        assert len(calls) == 2  # stopped retrying as soon as the circuit opened
+
+        with pytest.raises(CircuitOpenError):
+            await collector._make_request(url)
+        assert len(calls) == 2
+    finally:
+        await collector.cleanup()
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_circuit(serve_app):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    url = (await serve_app(app)) + "/"
+    collector = BaseCollector(name='missing_symbol_source')
+    collector.health.failure_threshold = 2
+    try:
+        for _ in range(3):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await collector._make_request(url)
+        # A 404 isn't retried and says nothing about the source being down
+        assert len(calls) == 3
+        assert collector.health.state == CLOSED
+        assert collector.health.failures == 0
+    finally:
+        await collector.cleanup()
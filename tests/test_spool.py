@@ -0,0 +1,146 @@
+# tests/test_spool.py
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.collectors.price_batch import PriceBatch, to_ms
+from src.storage.spool import BatchSpool, SpooledStorage
+from src.storage.watermarks import batch_watermarks
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def hourly(first_hour: int, hours: int = 24) -> PriceBatch:
+    timestamps = [to_ms(START + timedelta(hours=h)) for h in range(first_hour, first_hour + hours)]
+    return PriceBatch.from_arrays(timestamps, [50_000.0] * hours, currency='usd', source='binance')
+
+def test_spool_round_trip_and_torn_tail(tmp_path):
+    spool = BatchSpool(str(tmp_path), segment_bytes=1)  # one record per segment
+    spool.append(b'first')
+    spool.append(b'second')
+    segments = spool.rotate()
+    assert [list(spool.read_segment(path)) for path in segments] == [[b'first'], [b'second']]
+
+    # A crash in the middle of an append leaves a torn record behind
+    with open(segments[1], 'ab') as f:
+        f.write(b'BSP1\x00\x00')
+    assert list(spool.read_segment(segments[1])) == [b'second']
+
+    # A restarted spool starts a new segment after the old ones
+    restarted = BatchSpool(str(tmp_path))
+    restarted.append(b'third')
+    assert restarted.rotate()[-1].endswith('segment-000000000002.spool')
+
+def test_directory_created_on_first_append(tmp_path):
+    spool = BatchSpool(str(tmp_path / "spool"))
+    assert not spool.pending()
+    assert not os.path.exists(tmp_path / "spool")
+    spool.append(b'payload')
+    assert spool.pending()
+    assert len(spool.rotate()) == 1
+
+def test_corrupt_record_is_set_aside(tmp_path):
+    spool = BatchSpool(str(tmp_path))
+    spool.append(b'payload')
+    path = spool.rotate()[0]
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'X')
+    assert list(spool.read_segment(path)) == []
+    assert os.path.exists(path + '.corrupt')
+    assert spool.rotate() == []
+
+class _FlakyBackend:
+    name = 'flaky'
+    db = None
+
+    def __init__(self):
+        self.down = True
+        self.delay = 0.0
+        self.rows = {}
+        self.watermarks = {}
+
+    async def ensure_schema(self):
+        pass
+
+    async def write_prices(self, batch):
+        if self.down:
+            raise ConnectionRefusedError("database is down")
+        await asyncio.sleep(self.delay)
+        new = [timestamp for timestamp in batch.timestamps.tolist() if timestamp not in self.rows]
+        self.rows.update((timestamp, True) for timestamp in new)
+        return len(new), len(batch) - len(new)
+
+    async def update_watermarks(self, watermarks):
+        if self.down:
+            raise ConnectionRefusedError("database is down")
+        for key, timestamp in watermarks.items():
+            self.watermarks[key] = max(timestamp, self.watermarks.get(key, timestamp))
+
+    async def get_watermarks(self):
+        if self.down:
+            raise ConnectionRefusedError("database is down")
+        return dict(self.watermarks)
+
+    async def dispose(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_writes_spool_while_down_and_replay_in_order(tmp_path):
+    inner = _FlakyBackend()
+    storage = SpooledStorage(inner, BatchSpool(str(tmp_path)), write_timeout=1.0, retry_interval=0.01)
+
+    for day in range(3):
+        batch = hourly(24 * day)
+        assert await storage.write_prices(batch) == (0, 0)
+        await storage.update_watermarks(batch_watermarks(batch, '1h'))
+    assert storage.spooled_batches == 3
+    # Incremental runs continue from the spooled data instead of re-fetching it
+    assert (await storage.get_watermarks())[('binance', 'usd', '1h')] == START + timedelta(hours=71)
+
+    inner.down = False
+    # Overlaps the spooled data; queued behind it rather than written first
+    batch = hourly(60)
+    assert await storage.write_prices(batch) == (0, 0)
+    await storage.update_watermarks(batch_watermarks(batch, '1h'))
+    await storage.drained()
+
+    assert storage.replayed_batches == 4
+    assert len(inner.rows) == 84
+    assert inner.watermarks[('binance', 'usd', '1h')] == START + timedelta(hours=83)
+    assert not storage.spool.pending()
+    # Back to direct writes
+    assert await storage.write_prices(hourly(84)) == (24, 0)
+    await storage.dispose()
+
+@pytest.mark.asyncio
+async def test_slow_write_goes_to_spool(tmp_path):
+    inner = _FlakyBackend()
+    inner.down = False
+    inner.delay = 0.5
+    storage = SpooledStorage(inner, BatchSpool(str(tmp_path)), write_timeout=0.05, retry_interval=0.01)
+
+    assert await storage.write_prices(hourly(0)) == (0, 0)
+    inner.delay = 0.0
+    await storage.drained()
+    assert len(inner.rows) == 24
+    await storage.dispose()
+
+@pytest.mark.asyncio
+async def test_unreplayable_segment_is_set_aside(tmp_path):
+    spool = BatchSpool(str(tmp_path))
+    for payload in (hourly(0).to_bytes(), b'not a batch', hourly(24).to_bytes()):
+        spool.append(payload)
+        spool.rotate()
+    inner = _FlakyBackend()
+    inner.down = False
+    storage = SpooledStorage(inner, spool, write_timeout=1.0, retry_interval=0.01)
+
+    await storage.ensure_schema()
+    await storage.drained()
+    # The drain logs the bad segment, keeps it aside and replays the rest
+    assert storage.failed_segments == 1
+    assert storage.replayed_batches == 2
+    assert len(inner.rows) == 48
+    assert not spool.pending()
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.failed')]) == 1
+    await storage.dispose()
@@ -0,0 +1,81 @@
+# tests/test_storage_backends.py
+from datetime import datetime, timedelta, timezone
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.analysis.price_analyzer import PriceAnalyzer
+from src.collectors.price_batch import PriceBatch, to_ms
+from src.storage.sqlite_backend import SQLiteBackend
+
+NOW = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def make_batch(hours: int, currency: str = 'usd', price: float = 50_000.0) -> PriceBatch:
+    timestamps = [to_ms(NOW - timedelta(hours=hours - h)) for h in range(hours)]
+    return PriceBatch.from_arrays(timestamps, [price + h for h in range(hours)], currency=currency, source='binance')
+
+@pytest_asyncio.fixture
+async def storage(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "platform.sqlite3"))
+    await backend.ensure_schema()
+    yield backend
+    await backend.dispose()
+
+@pytest.mark.asyncio
+async def test_prices_skip_existing_rows(storage):
+    assert await storage.write_prices(make_batch(24)) == (24, 0)
+    # Overlapping batch: the first 24 hours are already stored
+    assert await storage.write_prices(make_batch(30)) == (6, 24)
+    assert await storage.write_prices(make_batch(10, currency='eur')) == (10, 0)
+
+    history = storage.read_prices('usd', since=(NOW - timedelta(hours=12)).replace(tzinfo=None))
+    assert len(history) == 12
+    assert history['price_timestamp'].is_monotonic_increasing
+
+@pytest.mark.asyncio
+async def test_watermarks_only_move_forward(storage):
+    key = ('binance', 'usd', '1d')
+    await storage.update_watermarks({key: NOW})
+    await storage.update_watermarks({key: NOW - timedelta(days=1)})
+    assert (await storage.get_watermarks())[key] == NOW
+
+    await storage.update_watermarks({key: NOW + timedelta(hours=1)})
+    assert (await storage.get_watermarks())[key] == NOW + timedelta(hours=1)
+
+    # Writers at another interval keep their own mark
+    await storage.update_watermarks({('binance', 'usd', '1h'): NOW + timedelta(days=1)})
+    assert (await storage.get_watermarks())[key] == NOW + timedelta(hours=1)
+
+@pytest.mark.asyncio
+async def test_news_and_quality_rows(storage):
+    article = {
+        'title': 'Bitcoin moves', 'summary': '...', 'link': 'https://example.com/a',
+        'published_at': NOW, 'source': 'example', 'collected_at': datetime.now()
+    }
+    assert await storage.write_news([article]) == (1, 0)
+    assert await storage.write_news([article]) == (0, 1)
+
+    await storage.write_quality([{
+        'timestamp': datetime.now(), 'source': 'btc_price_usd', 'check_name': 'time_gaps',
+        'passed': False, 'message': 'gap', 'details': {'occurrences': 2}
+    }])
+    with storage.db.get_session() as session:
+        assert session.execute(text("SELECT count(*) FROM quality_checks")).scalar() == 1
+
+@pytest.mark.asyncio
+async def test_price_analyzer_reads_from_backend(storage):
+    await storage.write_prices(make_batch(48))
+    stats = PriceAnalyzer(storage).calculate_daily_stats('usd')
+    assert stats['last_price'] == 50_047.0
+    assert stats['min'] == 50_000.0
+
+def test_sqlite_runs_in_wal_mode_without_sslmode(tmp_path):
+    # sqlite3.connect() would reject an sslmode argument
+    storage = SQLiteBackend(str(tmp_path / "db.sqlite3"))
+    with storage.db.engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+    storage.db.engine.dispose()
+
+def test_price_analyzer_rejects_a_session():
+    with pytest.raises(TypeError, match="StorageBackend"):
+        PriceAnalyzer(Session())
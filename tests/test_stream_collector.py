@@ -0,0 +1,153 @@
+# tests/test_stream_collector.py
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from src.collectors.price_batch import PriceBatch
+from src.collectors.stream_collector import BinanceStreamCollector, KrakenStreamCollector, MicroBatcher
+
+MINUTE = 60_000
+START = 1_700_000_040_000  # a minute boundary
+
+def kline_frame(open_ms, close, closed=True, symbol="BTCUSD"):
+    return json.dumps({
+        "stream": f"{symbol.lower()}@kline_1m",
+        "data": {"e": "kline", "s": symbol, "k": {"t": open_ms, "c": str(close), "x": closed}}
+    })
+
+class _GapFiller:
+    def __init__(self):
+        self.windows = []
+
+    async def fetch_window(self, currency, start, end, interval='1h'):
+        self.windows.append((currency, start, end))
+        start_ms = int(start.timestamp() * 1000)
+        end_ms = int(end.timestamp() * 1000)
+        timestamps = list(range(start_ms, end_ms, MINUTE))
+        return PriceBatch.from_arrays(timestamps, [1.0] * len(timestamps), currency, 'binance')
+
+@pytest_asyncio.fixture
+async def replay_server(serve_app):
+    """Local WebSocket server that replays recorded kline frames, then hangs up"""
+    frames = [
+        kline_frame(START, 100, closed=False),  # open candle update, ignored
+        kline_frame(START, 101),
+        kline_frame(START + MINUTE, 102),
+        kline_frame(START + MINUTE, 102),  # replayed candle
+        kline_frame(START + 4 * MINUTE, 105),  # two candles missed
+    ]
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for frame in frames:
+            await ws.send_str(frame)
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', handler)
+    return (await serve_app(app)) + "/stream"
+
+@pytest.mark.asyncio
+async def test_binance_stream_batches_and_fills_gaps(replay_server):
+    gap_filler = _GapFiller()
+    collector = BinanceStreamCollector(currencies=['usd'], interval='1m', gap_filler=gap_filler, url=replay_server)
+    batches = []
+
+    async def sink(batch):
+        batches.append(batch)
+        if sum(len(b) for b in batches) >= 5:
+            collector.stop()
+
+    try:
+        await asyncio.wait_for(collector.stream(sink), timeout=10)
+    finally:
+        await collector.cleanup()
+
+    # The gap between START+1m and START+4m was detected and filled over REST
+    assert collector.gaps[0]['missing'] == 2
+    currency, start, end = gap_filler.windows[0]
+    assert currency == 'usd'
+    assert int(start.timestamp() * 1000) == START + 2 * MINUTE
+
+    rows = PriceBatch.concat(batches)
+    assert sorted(rows.timestamps.tolist()) == [START + i * MINUTE for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_malformed_frames_are_skipped(serve_app):
+    frames = [
+        "not json",
+        json.dumps({"data": {"e": "kline", "s": "BTCUSD"}}),  # no "k"
+        kline_frame(START, 101),
+    ]
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for frame in frames:
+            await ws.send_str(frame)
+        await asyncio.sleep(1)
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', handler)
+    collector = BinanceStreamCollector(currencies=['usd'], interval='1m', url=(await serve_app(app)) + "/stream")
+    batches = []
+
+    async def sink(batch):
+        batches.append(batch)
+        collector.stop()
+
+    try:
+        await asyncio.wait_for(collector.stream(sink), timeout=10)
+    finally:
+        await collector.cleanup()
+
+    # Both bad frames were counted and skipped on the same connection
+    assert collector.frame_errors == 2
+    assert collector.reconnects == 0
+    assert PriceBatch.concat(batches).prices.tolist() == [101.0]
+
+@pytest.mark.asyncio
+async def test_failed_sink_batches_are_retried_in_order():
+    delivered = []
+    failures = 1
+
+    async def sink(batch):
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise ConnectionError("database unavailable")
+        delivered.append(batch.timestamps.tolist())
+
+    batcher = MicroBatcher(sink, source='binance', max_records=1, flush_interval_ms=1000, max_pending_records=2)
+    await batcher.add_batch(PriceBatch.from_arrays([1], [1.0], 'usd', 'binance'))
+    assert batcher.sink_failures == 1
+    assert batcher.pending_rows == 1
+
+    await batcher.add_batch(PriceBatch.from_arrays([2], [2.0], 'usd', 'binance'))
+    assert delivered == [[1], [2]]
+    assert batcher.pending_rows == 0
+
+    # While the sink keeps failing, only `max_pending_records` rows are held
+    failures = 3
+    for timestamp in (3, 4, 5):
+        await batcher.add_batch(PriceBatch.from_arrays([timestamp], [1.0], 'usd', 'binance'))
+    assert batcher.pending_rows == 2
+    assert batcher.dropped_rows == 1
+
+def test_kraken_emits_candle_when_next_begins():
+    collector = KrakenStreamCollector(currencies=['usd'], interval='1m')
+
+    def frame(begin, close):
+        return {"channel": "ohlc", "type": "update",
+                "data": [{"symbol": "BTC/USD", "close": close, "interval_begin": begin}]}
+
+    assert collector.parse(frame("2023-11-14T22:14:00.000000000Z", 1.0)) == []
+    assert collector.parse(frame("2023-11-14T22:14:00.000000000Z", 2.0)) == []
+    ticks = collector.parse(frame("2023-11-14T22:15:00.000000000Z", 3.0))
+    assert len(ticks) == 1
+    assert ticks[0].price == 2.0
+    assert ticks[0].timestamp == START
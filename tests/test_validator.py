@@ -1,7 +1,10 @@
 # tests/test_validator.py
 import pytest
+import numpy as np
 from datetime import datetime, timedelta
-from src.validators.price_validator import PriceValidator
+from src.collectors.price_batch import PriceBatch
+from src.validators.price_validator import PriceValidator, ValidationState
+from src.validators.validators import DataQualityValidator
 
 def test_validator():
     validator = PriceValidator()
@@ -20,4 +23,59 @@ def test_validator():
     # Test negative prices
     prices = [-100, -200]
     result = validator.validate_price_data(prices, timestamps)
-    assert not result.is_valid, "Negative prices not caught"
\ No newline at end of file
+    assert not result.is_valid, "Negative prices not caught"
+
+def test_validation_state_spans_batches():
+    validator = PriceValidator()
+    state = ValidationState()
+    hour = 3_600_000
+
+    first = PriceBatch.from_arrays([0, hour, 2 * hour], [50000.0, 50100.0, 50200.0], 'usd', 'binance')
+    result = validator.validate_chunk(first, state)
+    assert result.is_valid and not result.warnings
+
+    # The gap and the jump are only visible against the previous batch's last point
+    second = PriceBatch.from_arrays([5 * hour, 6 * hour], [70000.0, 70100.0], 'usd', 'binance')
+    result = validator.validate_chunk(second, state)
+    assert result.is_valid
+    assert [warning.split(':')[0] for warning in result.warnings] == ["Large time gap detected", "Large price change detected"]
+
+    assert state.points == 5
+    assert not validator.finish(state).is_valid  # fewer than min_data_points overall
+
+def minute_series(points: int):
+    timestamps = np.arange(points, dtype=np.int64) * 60_000
+    prices = np.full(points, 50_000.0)
+    return timestamps, prices
+
+def test_issues_come_back_as_index_arrays():
+    validator = PriceValidator()
+    timestamps, prices = minute_series(525_600)  # a year of minute data
+    timestamps[1000:] += 2 * 3_600_000  # one gap, before point 1000
+    prices[::1000] = 80_000.0  # a jump into and out of every 1000th point
+    batch = PriceBatch.from_arrays(timestamps, prices, 'usd', 'binance')
+
+    result = validator.validate_batch(batch)
+    assert result.is_valid
+    assert result.gap_indices.tolist() == [1000]
+    assert len(result.change_indices) == 2 * 526 - 1  # point 0 has nothing before it
+    assert result.change_indices[:3].tolist() == [1, 1000, 1001]
+
+    # Messages only for a sample of each kind, plus a count of the rest
+    assert len(result.warnings) == 1 + validator.thresholds.max_messages + 1
+    assert result.warnings[-1] == f"... and {len(result.change_indices) - 20} more large price changes"
+
+def test_quality_checks_are_aggregated_per_kind():
+    validator = DataQualityValidator()
+    timestamps, prices = minute_series(10_000)
+    prices[5000:5010] = 100_000.0
+    report = validator.validate_batch(PriceBatch.from_arrays(timestamps, prices, 'usd', 'binance'))
+
+    assert report.issues['price_change'].tolist() == [5000, 5010]
+    assert report.issues['price_range'].tolist() == []
+    assert not report.issues['time_gap'].size
+    change = [check for check in report.checks if check.name == 'price_change']
+    assert len(change) == 1
+    assert change[0].details['occurrences'] == 2
+    assert change[0].details['sample'][0]['current_price'] == 100_000.0
+    assert change[0].message.startswith("2 failed price_change checks, first: Suspicious price change of 100.0%")